@@ -0,0 +1,179 @@
+# backup.py
+# Usage: python backup.py export [--out backups/game.jsonl.gz]
+#        python backup.py restore backups/game_backup_20250101-000000.jsonl.gz --confirm
+# Game DB တစ်ခုလုံးကို gzip JSONL File တစ်ခုအဖြစ် Stream လုပ်ပြီး သိမ်း / ပြန်ထည့်ပါ။
+# Line တစ်ကြောင်း = Document တစ်ခု ({"c": collection, "d": doc}) မို့ DB ဘယ်လောက်ကြီးကြီး Memory မတက်ပါ။
+# (ပထမ Line က Header၊ နောက်ဆုံး Line က Collection အလိုက် Count - File ပြတ်နေရင် Restore မလုပ်ပါ)
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+try:
+    from bson import ObjectId # (pymongo နဲ့ ပါလာပါတယ် - Mongo _id အတွက်)
+except ImportError:
+    ObjectId = None
+
+BACKUP_FORMAT = "game_bot_backup"
+BACKUP_VERSION = 1
+
+
+class BackupError(Exception):
+    """Backup File ဖတ်လို့ မရ / ဒီ DB ထဲ ပြန်ထည့်လို့ မရတဲ့ Error"""
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if ObjectId is not None and isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    raise TypeError(f"Backup မလုပ်နိုင်တဲ့ Type: {type(value).__name__}")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if "$oid" in obj:
+            if ObjectId is None:
+                raise BackupError("Mongo Backup ကို ပြန်ထည့်ဖို့ pymongo (bson) လိုပါတယ်။")
+            return ObjectId(obj["$oid"])
+    return obj
+
+
+def _dumps(obj):
+    return json.dumps(obj, default=_encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def _iter_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line, object_hook=_decode)
+                except ValueError as e:
+                    raise BackupError(f"Line {line_number} ဖတ်မရပါ: {e}")
+
+
+def write_backup(store, path, batch_size=1000, progress=None):
+    """
+    store ထဲက Collection အားလုံးကို path (gzip JSONL) ထဲ ရေးပြီး {collection: count} ပြန်ပေးပါ။
+    (.part File ထဲ အရင်ရေးပြီးမှ နာမည်ပြောင်းလို့ ရေးနေတုန်း ပျက်သွားရင် File အပြည့်အစုံလို မမြင်ရပါ)
+    progress(collection, count) ကို Collection တစ်ခု ပြီးတိုင်း ခေါ်ပါ။
+    """
+    collections = store.backup_collections()
+    counts = {}
+    temp_path = path + ".part"
+    with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(_dumps({
+            "format": BACKUP_FORMAT, "version": BACKUP_VERSION, "backend": store.name,
+            "created_at": datetime.now(timezone.utc), "collections": collections,
+        }) + "\n")
+        for collection_name in collections:
+            count = 0
+            for batch in store.iter_documents(collection_name, batch_size):
+                f.write("".join(_dumps({"c": collection_name, "d": doc}) + "\n" for doc in batch))
+                count += len(batch)
+            counts[collection_name] = count
+            if progress:
+                progress(collection_name, count)
+        f.write(_dumps({"end": True, "counts": counts}) + "\n")
+    os.replace(temp_path, path)
+    return counts
+
+
+def read_header(path):
+    """File တစ်ခုလုံး ဖတ်ပြီး (Header, counts) ကို စစ်ပါ။ (Restore မလုပ်ခင် - DB ကို မဖျက်ခင်)"""
+    header, trailer, seen = None, None, {}
+    for _, obj in _iter_lines(path):
+        if header is None:
+            if obj.get("format") != BACKUP_FORMAT:
+                raise BackupError("Game Bot Backup File မဟုတ်ပါ။")
+            if obj.get("version") != BACKUP_VERSION:
+                raise BackupError(f"Backup Version {obj.get('version')} ကို မသိပါ။")
+            header = obj
+        elif obj.get("end"):
+            trailer = obj
+        else:
+            seen[obj["c"]] = seen.get(obj["c"], 0) + 1
+    if header is None or trailer is None:
+        raise BackupError("Backup File မပြည့်စုံပါ (ရေးနေတုန်း ရပ်သွားပုံရပါတယ်)။")
+    counts = trailer["counts"]
+    if any(seen.get(name, 0) != count for name, count in counts.items()):
+        raise BackupError("Backup File ထဲက Document အရေအတွက် မကိုက်ပါ။")
+    return header, counts
+
+
+def restore_backup(store, path, chunk_size=1000, progress=None):
+    """
+    store ကို ဖျက်ပြီး path ထဲက Data ကို chunk_size ခုစီ ပြန်ထည့်ပါ။ ပြီးရင် Index တွေ ပြန်ဆောက်ပါ။
+    Backup လုပ်ခဲ့တဲ့ Backend နဲ့ မတူရင် (Document ပုံစံ မတူလို့) BackupError
+    """
+    header, _ = read_header(path)
+    if header["backend"] != store.name:
+        raise BackupError(f"'{header['backend']}' Backup ကို '{store.name}' Backend ထဲ ပြန်ထည့်လို့ မရပါ။")
+
+    store.wipe()
+    counts = {}
+    current, chunk = None, []
+
+    def flush():
+        if chunk:
+            counts[current] = counts.get(current, 0) + store.restore_documents(current, chunk)
+            if progress:
+                progress(current, counts[current])
+
+    for _, obj in _iter_lines(path):
+        if "c" not in obj:
+            continue # (Header / Trailer)
+        if obj["c"] != current or len(chunk) >= chunk_size:
+            flush()
+            current, chunk = obj["c"], []
+        chunk.append(obj["d"])
+    flush()
+    store.finish_restore()
+    return counts
+
+
+def main():
+    import game_database as gamedb
+
+    parser = argparse.ArgumentParser(description="Export / restore the game database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("--out", help=f"မပေးရင် {gamedb.BACKUP_DIR}/ ထဲမှာ အချိန်နဲ့ နာမည်ပေးပါမည်")
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument("path")
+    restore_parser.add_argument("--confirm", action="store_true", help="DB ထဲက Data အားလုံးကို ဖျက်ပြီး အစားထိုးရန်")
+    args = parser.parse_args()
+
+    if not gamedb.store:
+        print("❌ Database နှင့် ချိတ်ဆက်မရပါ။")
+        return 1
+
+    def progress(collection_name, count):
+        print(f"⏳ {collection_name}: {count}")
+
+    if args.command == "export":
+        path, counts = gamedb.export_backup(args.out, progress=progress)
+        print(f"✅ Backup: {path} ({os.path.getsize(path)} bytes, Document {sum(counts.values())} ခု)")
+        return 0
+
+    if not args.confirm:
+        print("🚨 Restore က DB ထဲက Data အားလုံးကို ဖျက်ပြီး Backup နဲ့ အစားထိုးပါမည်။ သေချာရင် --confirm ထည့်ပါ။")
+        print("⚠️ Bot ကို ရပ်ထားပြီးမှ Restore လုပ်ပါ။")
+        return 1
+    try:
+        counts = gamedb.restore_backup(args.path, progress=progress)
+    except gamedb.backup.BackupError as e: # (ဒီ File က __main__ အဖြစ် run နေလို့ game_database import လုပ်ထားတဲ့ Class)
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Restore ပြီးပါပြီ (Document {sum(counts.values())} ခု)။")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+# benchmark.py
+#
+# Handler တွေ (handle_group_message / catch_command / harem_command) ကို Synthetic Update တွေနဲ့
+# Load ပေးပြီး Latency၊ DB call အရေအတွက်၊ Spawn rate၊ Peak RSS ကို တိုင်းပါ။
+# Telegram ကို မချိတ်ပါ (Fake Bot)။ Default က In-memory Backend (External service မလို)။
+#
+# Usage:
+#   python benchmark.py --groups 200 --rate 500 --duration 30 --catalog 5000 --harem 2000 --output bench.json
+#   python benchmark.py --backend sqlite ...  (SQLite file - bench ပြီးရင် ဖျက်ပါမည်)
+#   python benchmark.py --backend mongo ...   (Local Mongo server - Mongo operation တွေပါ ရေတွက်ပါမည်)
+#   python benchmark.py --backend mongo --mongomock ...
+#
+# ⚠️ (--backend mongo) GAME_DB_NAME (default: game_bot_bench) DB ကို အစမှာ ရှင်းပစ်ပါမည်။ Production DB ကို မသုံးပါနဲ့။
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import metrics
+
+
+# --- Fake Telegram Objects ---
+
+class FakeUser:
+    def __init__(self, user_id, first_name=None, is_bot=False, username=None):
+        self.id = user_id
+        self.first_name = first_name or f"user{user_id}"
+        self.is_bot = is_bot
+        self.username = username
+
+
+class FakeChat:
+    def __init__(self, chat_id, chat_type="supergroup", title=None):
+        self.id = chat_id
+        self.type = chat_type
+        self.title = title or f"group{chat_id}"
+
+
+class FakePhoto:
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+
+class FakeMessage:
+    def __init__(self, bot, chat, from_user=None, text=None, photo=None):
+        bot.message_seq += 1
+        self.message_id = bot.message_seq
+        self._bot = bot
+        self.chat = chat
+        self.from_user = from_user
+        self.text = text
+        self.photo = photo or []
+        self.reply_to_message = None
+        self.new_chat_members = []
+        self.left_chat_member = None
+
+    async def reply_text(self, text, **kwargs):
+        return await self._bot.send_message(chat_id=self.chat.id, text=text, **kwargs)
+
+    async def reply_photo(self, photo, **kwargs):
+        return await self._bot.send_photo(chat_id=self.chat.id, photo=photo, **kwargs)
+
+    async def edit_text(self, text, **kwargs):
+        return self
+
+    async def delete(self):
+        return True
+
+
+class FakeBot:
+    """Telegram API call တွေကို latency (စက္ကန့်) စောင့်ပြီး အောင်မြင်ကြောင်း ပြန်ပေးပါ။"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.message_seq = 0
+        self.calls = defaultdict(int)
+        self.bot = FakeUser(1, "BenchBot", is_bot=True, username="bench_bot")
+        self.id = self.bot.id
+
+    async def _call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await self._call("send_message")
+        return FakeMessage(self, FakeChat(chat_id), self.bot, text)
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        await self._call("send_photo")
+        return FakeMessage(self, FakeChat(chat_id), self.bot, photo=[FakePhoto(f"file-{hash(photo) & 0xffffffff:x}")])
+
+    async def get_chat_member_count(self, chat_id):
+        await self._call("get_chat_member_count")
+        return 500
+
+    async def leave_chat(self, chat_id):
+        await self._call("leave_chat")
+        return True
+
+
+class FakeUpdate:
+    def __init__(self, message):
+        self.message = message
+        self.effective_chat = message.chat
+        self.effective_user = message.from_user
+        self.callback_query = None
+
+
+class FakeContext:
+    def __init__(self, bot, bot_data, chat_data, args=None):
+        self.bot = bot
+        self.bot_data = bot_data
+        self.chat_data = chat_data
+        self.user_data = {}
+        self.args = args or []
+
+
+# --- Mongo Operation Counter ---
+
+class CommandCounter:
+    """pymongo command monitoring နဲ့ DB round-trip အရေအတွက်ကို ရေတွက်ပါ။"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_command = defaultdict(int)
+
+    def started(self, event):
+        self.total += 1
+        self.by_command[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def peak_rss_mb():
+    # Linux မှာ ru_maxrss က KB၊ macOS မှာ bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+# --- Setup ---
+
+def prepare_environment(args):
+    """character.py import မလုပ်ခင် Environment နဲ့ Storage Backend ကို ပြင်ဆင်ပါ။"""
+    os.environ.setdefault("GAME_BOT_TOKEN", "123456:BENCHMARK")
+    os.environ.setdefault("OWNER_ID", "1")
+    os.environ["GAME_DB_BACKEND"] = args.backend
+    os.environ["SPAWN_CACHE_TTL"] = str(args.spawn_cache_ttl)
+
+    counter = None
+    if args.backend == "sqlite":
+        os.environ["SQLITE_PATH"] = args.sqlite_path
+    elif args.backend == "mongo":
+        os.environ.setdefault("MONGO_URL", args.mongo_url)
+        os.environ["GAME_DB_NAME"] = args.db_name
+        if args.mongomock:
+            import mongomock
+            import pymongo
+            pymongo.MongoClient = mongomock.MongoClient
+        else:
+            from pymongo import monitoring
+            counter = CommandCounter()
+            monitoring.register(counter)
+    return counter
+
+
+def seed_database(gamedb, args, rng):
+    """Benchmark DB ကို ရှင်းပြီး Catalog နဲ့ Harem တွေ ဖြည့်ပါ။"""
+    gamedb.wipe_game_data()
+    gamedb.ensure_indexes()
+
+    rarities = list(gamedb.RARITY_WEIGHTS)
+    animes = [f"Anime {i}" for i in range(max(1, args.catalog // 25))]
+    catalog = [{
+        "name": f"Character {i}",
+        "image_url": f"https://img.example/{i}.jpg",
+        "rarity": rng.choice(rarities).title(),
+        "anime": rng.choice(animes),
+        "emoji": "✨",
+    } for i in range(args.catalog)]
+    for i in range(0, len(catalog), gamedb.IMPORT_CHUNK_SIZE):
+        gamedb.bulk_upsert_characters(catalog[i:i + gamedb.IMPORT_CHUNK_SIZE])
+
+    # Harem: User တစ်ယောက်ချင်းစီကို args.harem ကောင် ဖမ်းထားသလို ဖြည့်ပါ (benchmark user များ - ထပ်ရင် count)
+    if args.harem:
+        character_ids = gamedb.get_catalog().by_name_lower
+        base = datetime.now(timezone.utc) - timedelta(days=30)
+        for user_id in range(1000, 1000 + args.harem_users):
+            entries = {}
+            for j in range(args.harem):
+                char = catalog[rng.randrange(len(catalog))]
+                caught_at = base + timedelta(seconds=j)
+                entry = entries.get(char["name"])
+                if entry is None:
+                    entries[char["name"]] = {
+                        "user_id": user_id,
+                        "user_name": f"user{user_id}",
+                        "character_id": character_ids[char["name"].lower()],
+                        "count": 1,
+                        "caught_at": caught_at,
+                        "first_caught_at": caught_at
+                    }
+                else:
+                    entry["count"] += 1
+                    entry["caught_at"] = caught_at
+            gamedb.insert_harem_records(list(entries.values()))
+        gamedb.rebuild_collection_counters()
+    return catalog
+
+
+# --- Load Generation ---
+
+async def run_load(bot_module, gamedb, args, rng, counter):
+    bot = FakeBot(latency=args.telegram_latency)
+    bot_data = {"me": bot.bot}
+    chat_data = defaultdict(dict)
+    chat_locks = defaultdict(asyncio.Lock) # (Production ကလို Chat တစ်ခုချင်း အစဉ်လိုက်)
+
+    # Flood control ကို Benchmark မှာ မတိုင်းပါ (Handler ကိုပဲ တိုင်းရန်)
+    outbox = bot_module.outbox
+    outbox.global_bucket.rate = outbox.global_bucket.capacity = 1e9
+    outbox.group_rate = outbox.private_rate = 1e9
+    outbox.group_burst = outbox.private_burst = 1e9
+    await outbox.start()
+
+    groups = [FakeChat(-1000000000000 - i) for i in range(args.groups)]
+    users = [FakeUser(1000 + i) for i in range(max(args.harem_users, args.users))]
+    latencies = defaultdict(list)
+    stats = defaultdict(int)
+
+    async def run_handler(name, handler, chat, user, text=None, cmd_args=None):
+        async with chat_locks[chat.id]:
+            update = FakeUpdate(FakeMessage(bot, chat, user, text))
+            context = FakeContext(bot, bot_data, chat_data[chat.id], cmd_args)
+            started = time.perf_counter()
+            try:
+                await handler(update, context)
+            except Exception as e:
+                stats[f"{name}_errors"] += 1
+                if stats[f"{name}_errors"] <= 3:
+                    print(f"{name} error: {e}")
+            latencies[name].append(time.perf_counter() - started)
+
+    total_messages = int(args.rate * args.duration)
+    ops_before = counter.total if counter else None
+    spawns_before = bot.calls["send_photo"]
+    tasks = set()
+    started = time.perf_counter()
+
+    for i in range(total_messages):
+        # Open-loop: အချိန်ဇယားအတိုင်း Message ပို့ပါ (Handler နှေးရင် Queue ဖြစ်ပြီး Latency ထဲ ပါလာပါမည်)
+        delay = started + i / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        chat = groups[rng.randrange(len(groups))]
+        user = users[rng.randrange(len(users))]
+
+        roll = rng.random()
+        if roll < args.catch_ratio:
+            spawn = gamedb.spawn_cache.get(chat.id)
+            if spawn and spawn is not gamedb.MISS:
+                guess = spawn.get("name", "") if rng.random() < 0.7 else "wrong name"
+                stats["catch_attempts"] += 1
+                task = run_handler("catch_command", bot_module.catch_command, chat, user, cmd_args=guess.split())
+            else:
+                task = run_handler("handle_group_message", bot_module.handle_group_message, chat, user, "hello")
+        elif roll < args.catch_ratio + args.harem_ratio:
+            task = run_handler("harem_command", bot_module.harem_command, chat, user, cmd_args=[])
+        else:
+            task = run_handler("handle_group_message", bot_module.handle_group_message, chat, user, "hello")
+        stats["messages"] += 1
+        t = asyncio.create_task(task)
+        tasks.add(t)
+        t.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+    await outbox.stop()
+    elapsed = time.perf_counter() - started
+
+    spawns = bot.calls["send_photo"] - spawns_before
+    result = {
+        "elapsed_s": round(elapsed, 3),
+        "messages": stats["messages"],
+        "achieved_rate": round(stats["messages"] / elapsed, 2),
+        "handlers": {name: summarize(values) for name, values in latencies.items()},
+        "spawns": spawns,
+        "spawns_per_sec": round(spawns / elapsed, 3),
+        "catch_attempts": stats["catch_attempts"],
+        "errors": {k: v for k, v in stats.items() if k.endswith("_errors")},
+        "telegram_calls": dict(bot.calls),
+        "send_queue": outbox.metrics(),
+        "bot_metrics": metrics.snapshot(), # (metrics.py: DB function တစ်ခုချင်းစီရဲ့ ကြာချိန် စသည်)
+    }
+    db_calls = sum(h.count for _, h in metrics.histograms_by_total("gamedb_call_seconds", limit=None))
+    result["db_calls_per_message"] = round(db_calls / max(1, stats["messages"]), 3)
+    if counter:
+        ops = counter.total - ops_before
+        result["mongo_ops"] = ops
+        result["mongo_ops_per_message"] = round(ops / max(1, stats["messages"]), 3)
+        result["mongo_ops_by_command"] = dict(counter.by_command)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game Bot handler load benchmark")
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200, help="Message/sec (Group အားလုံး ပေါင်း)")
+    parser.add_argument("--duration", type=float, default=20, help="စက္ကန့်")
+    parser.add_argument("--catalog", type=int, default=1000, help="Character အရေအတွက်")
+    parser.add_argument("--harem", type=int, default=200, help="Benchmark user တစ်ယောက်ချင်း Harem size")
+    parser.add_argument("--harem-users", type=int, default=20)
+    parser.add_argument("--catch-ratio", type=float, default=0.05)
+    parser.add_argument("--harem-ratio", type=float, default=0.01)
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Fake Telegram API latency (စက္ကန့်)")
+    parser.add_argument("--spawn-cache-ttl", type=float, default=60)
+    parser.add_argument("--backend", choices=["memory", "sqlite", "mongo"], default="memory",
+                        help="Storage backend (memory: External service မလို)")
+    parser.add_argument("--sqlite-path", default="bench_game_bot.db")
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCH_MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="game_bot_bench")
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    if args.backend == "mongo" and args.db_name == "game_bot_db":
+        print("❌ Production DB (game_bot_db) ကို Benchmark မှာ မသုံးပါနဲ့။")
+        return 1
+
+    counter = prepare_environment(args)
+    import character as bot_module
+    import game_database as gamedb
+
+    if not gamedb.store:
+        print("❌ Benchmark DB နှင့် ချိတ်ဆက်မရပါ။")
+        return 1
+
+    rng = random.Random(args.seed)
+    seed_started = time.perf_counter()
+    seed_database(gamedb, args, rng)
+    seed_seconds = time.perf_counter() - seed_started
+    print(f"🌱 Seeded {args.catalog} characters / {args.harem_users}x{args.harem} harem catches in {seed_seconds:.1f}s")
+
+    result = asyncio.run(run_load(bot_module, gamedb, args, rng, counter))
+    report = {
+        "version": git_revision(),
+        "timestamp": datetime.now().isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output",)},
+        "seed_seconds": round(seed_seconds, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        **result,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for name, summary in report["handlers"].items():
+        print(f"{name:22} n={summary['count']:<7} p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms")
+    print(f"spawns/sec={report['spawns_per_sec']} db_calls/msg={report['db_calls_per_message']} mongo_ops/msg={report.get('mongo_ops_per_message')} peak_rss={report['peak_rss_mb']}MB")
+    print(f"📄 Results saved to {args.output}")
+    gamedb.wipe_game_data()
+    if args.backend == "sqlite":
+        gamedb.store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.sqlite_path + suffix):
+                os.remove(args.sqlite_path + suffix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
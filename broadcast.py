@@ -0,0 +1,128 @@
+# broadcast.py
+
+import asyncio
+import time
+
+from telegram.error import BadRequest, Forbidden
+
+from send_queue import TokenBucket
+
+# ဒီ Error တွေ ရရင် Bot က အဲဒီ Group ထဲ မရှိတော့ပါ (DB ထဲက ဖျက်ပါ)
+DEAD_CHAT_ERRORS = (
+    "chat not found",
+    "bot was kicked",
+    "bot is not a member",
+    "bot was blocked",
+    "group chat was deactivated",
+    "chat was deleted",
+    "peer_id_invalid",
+)
+
+
+def is_dead_chat_error(error):
+    """Group ပျောက်သွားတာ / Bot ကို ထုတ်လိုက်တာ ကြောင့် ပို့မရတာလား"""
+    if not isinstance(error, (BadRequest, Forbidden)):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in DEAD_CHAT_ERRORS)
+
+
+class Broadcaster:
+    """
+    Group အားလုံးကို Message တစ်ခု ပို့ပါ။
+    - Group ID တွေကို DB ကနေ Page လိုက် (page_size ခုစီ) ဆွဲလို့ List တစ်ခုလုံး Memory ထဲ မထည့်ပါ
+    - တပြိုင်နက် concurrency ခုထိ ပို့ပြီး rate (Message/စက္ကန့်) ထက် မကျော်ပါ
+      (Send Queue ရဲ့ Global Limit ကို ဂိမ်းအတွက် ချန်ထားရအောင် rate ကို အဲဒီထက် နည်းအောင် ထားပါ)
+    - ပို့မရတဲ့ Dead Chat တွေကို remove_chat နဲ့ ဖျက်ပါ
+    fetch_page(after, limit) / send(chat_id) / remove_chat(chat_id) က Coroutine function တွေ ဖြစ်ရမည်။
+    """
+
+    def __init__(self, fetch_page, send, remove_chat, concurrency=20, rate=20.0, page_size=500):
+        self.fetch_page = fetch_page
+        self.send = send
+        self.remove_chat = remove_chat
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.page_size = page_size
+        self.stats = {"sent": 0, "failed": 0, "removed": 0}
+        self.started_at = None
+        self.finished = False
+        self._cancelled = False
+
+    @property
+    def processed(self):
+        return self.stats["sent"] + self.stats["failed"] + self.stats["removed"]
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at if self.started_at else 0.0
+
+    def cancel(self):
+        """ပို့ပြီးသား / ပို့နေဆဲ Message တွေ ပြီးမှ ရပ်ပါ။ (Queue ထဲ ကျန်တာ ဆက်မပို့ပါ)"""
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    async def run(self, on_progress=None, progress_every=5.0):
+        """
+        ပြီးတဲ့အထိ ပို့ပြီး stats ကို ပြန်ပေးပါ။
+        on_progress(broadcaster) ကို progress_every စက္ကန့်တိုင်း ခေါ်ပါ။ (Error တက်ရင်လည်း ဆက်ပို့ပါ)
+        """
+        self.started_at = time.monotonic()
+        bucket = TokenBucket(self.rate, self.concurrency)
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        reporter = asyncio.create_task(self._report(on_progress, progress_every)) if on_progress else None
+        try:
+            after = None
+            while not self._cancelled:
+                chat_ids = await self.fetch_page(after, self.page_size)
+                if not chat_ids:
+                    break
+                after = chat_ids[-1]
+                for chat_id in chat_ids:
+                    await slots.acquire()
+                    if self._cancelled:
+                        slots.release()
+                        break
+                    wait = bucket.wait_time()
+                    while wait > 0:
+                        await asyncio.sleep(wait)
+                        wait = bucket.wait_time()
+                    bucket.consume()
+                    task = asyncio.create_task(self._deliver(chat_id, slots))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        finally:
+            self.finished = True
+            if reporter:
+                reporter.cancel()
+        return self.stats
+
+    async def _deliver(self, chat_id, slots):
+        try:
+            await self.send(chat_id)
+            self.stats["sent"] += 1
+        except Exception as e:
+            if is_dead_chat_error(e):
+                try:
+                    await self.remove_chat(chat_id)
+                    self.stats["removed"] += 1
+                except Exception as remove_error:
+                    print(f"Broadcast: error removing dead chat {chat_id}: {remove_error}")
+                    self.stats["failed"] += 1
+            else:
+                self.stats["failed"] += 1
+        finally:
+            slots.release()
+
+    async def _report(self, on_progress, every):
+        while True:
+            await asyncio.sleep(every)
+            try:
+                await on_progress(self)
+            except Exception as e:
+                print(f"Broadcast: error reporting progress: {e}")
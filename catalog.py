@@ -0,0 +1,170 @@
+# catalog.py
+
+import bisect
+import string
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+
+# Character တစ်ကောင်အတွက် Compact record (tuple - dict ထက် Memory သက်သာ)
+CharacterRecord = namedtuple(
+    "CharacterRecord", ("id", "name", "name_lower", "image_url", "rarity", "anime", "emoji", "file_id")
+)
+
+
+SEARCH_CACHE_SIZE = 256 # Snapshot တစ်ခုမှာ သိမ်းထားမယ့် Search ရလဒ် အရေအတွက်
+
+
+def _intern(value):
+    # Rarity / Anime နာမည်တွေက Character အများကြီးမှာ ထပ်နေလို့ String တစ်ခုတည်းကို မျှသုံးပါ
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_ASCII_SEPARATORS = str.maketrans(string.punctuation, " " * len(string.punctuation))
+
+
+def normalize_name(text):
+    """
+    Search အတွက် နာမည်ကို ညှိပါ။ (အကြီး/အသေး၊ Latin Accent၊ သင်္ကေတ၊ Space အများကြီး မခွဲပါ)
+    "Rem (Re:Zero)" -> "rem re zero"၊ "Émilia" -> "emilia" (မြန်မာ စာလုံး/သရ တွေကို မထိပါ)
+    """
+    text = text or ""
+    if text.isascii(): # (နာမည် အများစု - Character တစ်လုံးချင်း မစစ်ဘဲ မြန်မြန်)
+        return " ".join(text.lower().translate(_ASCII_SEPARATORS).split())
+    text = unicodedata.normalize("NFKD", text).casefold()
+    chars = []
+    for ch in text:
+        if "\u0300" <= ch <= "\u036f": # (Latin Combining Accent)
+            continue
+        chars.append(" " if unicodedata.category(ch)[0] in "PSZC" else ch)
+    return " ".join("".join(chars).split())
+
+
+def record_from_doc(doc):
+    return CharacterRecord(
+        doc["_id"], doc.get("name"), doc.get("name_lower"), doc.get("image_url"),
+        _intern(doc.get("rarity")), _intern(doc.get("anime")), doc.get("emoji"), doc.get("file_id")
+    )
+
+
+def record_to_object(record, file_id=None):
+    """Character Object (DB document ပုံစံ dict) အဖြစ် ပြန်ပြောင်းပါ။ (Spawn / Catch အတွက်)"""
+    doc = {
+        "_id": record.id,
+        "name": record.name,
+        "name_lower": record.name_lower,
+        "image_url": record.image_url,
+        "rarity": record.rarity,
+        "anime": record.anime,
+        "emoji": record.emoji,
+    }
+    file_id = file_id if file_id is not None else record.file_id
+    if file_id:
+        doc["file_id"] = file_id
+    return doc
+
+
+class CatalogSnapshot:
+    """
+    Character Catalog တစ်ခုလုံးရဲ့ မပြောင်းလဲတဲ့ (immutable) Snapshot
+    Catalog ပြောင်းရင် Snapshot အသစ် တစ်ခုလုံး ဆောက်ပြီး Reference ကိုပဲ လဲပါ။ (Reader တွေ Lock မလို)
+    """
+
+    __slots__ = (
+        "version", "loaded_at", "by_id", "by_name_lower", "names_sorted", "by_anime", "by_rarity", "rarity_rows",
+        "ids_sorted", "anime_names", "rarity_names", "search_keys", "search_ids", "_search_cache",
+    )
+
+    def __init__(self, docs, version):
+        records = [record_from_doc(doc) for doc in docs]
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.by_id = {record.id: record for record in records}
+        self.by_name_lower = {record.name_lower: record.id for record in records}
+        self.names_sorted = tuple(sorted(record.name for record in records if record.name))
+        # Postings (Anime / Rarity အလိုက် _id - နာမည်အစဉ်လိုက်၊ Browse မှာ ဒီအတိုင်း Page ခွဲရုံပဲ)
+        records.sort(key=lambda record: (record.name_lower or "", record.id))
+        self.ids_sorted = tuple(record.id for record in records)
+        by_anime, by_rarity = {}, {}
+        for record in records:
+            by_anime.setdefault(record.anime, []).append(record.id)
+            by_rarity.setdefault(record.rarity, []).append(record.id)
+        self.by_anime = {anime: tuple(ids) for anime, ids in by_anime.items()}
+        self.by_rarity = {rarity: tuple(ids) for rarity, ids in by_rarity.items()}
+        self.anime_names = tuple(sorted((a for a in self.by_anime if a), key=str.casefold))
+        self.rarity_names = tuple(sorted((r for r in self.by_rarity if r), key=str.casefold))
+        # Prefix Index: Normalize လုပ်ထားတဲ့ နာမည်ကို စကားလုံး တစ်လုံးချင်းကနေ စတဲ့ Key တွေ (အစဉ်လိုက်)
+        # "uzumaki naruto" -> "uzumaki naruto", "naruto" (ဒါမှ "/search naruto" နဲ့လည်း တွေ့ပါမည်)
+        # Prefix တစ်ခုနဲ့ စတဲ့ Key တွေက ဆက်တိုက် ရှိနေလို့ bisect နဲ့ ရှာပါ။
+        keys, key_ids = [], []
+        for record in records:
+            words = normalize_name(record.name).split()
+            for i in range(len(words)):
+                keys.append(" ".join(words[i:]))
+                key_ids.append(record.id)
+        order = sorted(range(len(keys)), key=keys.__getitem__) # (Stable - Key တူရင် နာမည်အစဉ်)
+        self.search_keys = tuple(keys[i] for i in order)
+        self.search_ids = tuple(key_ids[i] for i in order)
+        self._search_cache = {}
+        # Spawn Sampler အတွက် (_id, rarity)
+        self.rarity_rows = tuple({"_id": record.id, "rarity": record.rarity} for record in records)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, char_id):
+        return self.by_id.get(char_id)
+
+    def find_by_name(self, name):
+        char_id = self.by_name_lower.get(name.lower())
+        return self.by_id.get(char_id) if char_id is not None else None
+
+    def anime_count(self, anime):
+        return len(self.by_anime.get(anime, ()))
+
+    def character_ids(self, anime=None, rarity=None):
+        """anime / rarity နှစ်ခုလုံး ကိုက်တဲ့ Character _id များ (Harem Filter အတွက်)"""
+        if anime is not None and rarity is not None:
+            rarity_ids = set(self.by_rarity.get(rarity, ()))
+            return tuple(char_id for char_id in self.by_anime.get(anime, ()) if char_id in rarity_ids)
+        if anime is not None:
+            return self.by_anime.get(anime, ())
+        return self.by_rarity.get(rarity, ())
+
+    def search(self, query):
+        """
+        query (Normalize လုပ်ပြီးသား) နဲ့ စတဲ့ နာမည် (ဒါမှမဟုတ် နာမည်ထဲက စကားလုံး) ရှိတဲ့ Character _id များ
+        (Page ပြောင်းတိုင်း ပြန်မရှာရအောင် ရလဒ်ကို Snapshot ထဲ ခဏ သိမ်းထားပါ)
+        """
+        if not query:
+            return ()
+        cached = self._search_cache.get(query)
+        if cached is not None:
+            return cached
+        start = bisect.bisect_left(self.search_keys, query)
+        end = bisect.bisect_left(self.search_keys, query + "\U0010ffff", lo=start)
+        result = tuple(dict.fromkeys(self.search_ids[start:end])) # (စကားလုံး နှစ်လုံးနဲ့ ကိုက်ရင် တစ်ခါပဲ)
+        if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+            self._search_cache.clear() # (Thread တွေကြားမှာ Lock မလိုအောင် ရိုးရိုးပဲ ရှင်းပါ)
+        self._search_cache[query] = result
+        return result
+
+    def harem_fields(self, char_id):
+        """Harem Document နဲ့ Join မယ့် Character Field များ (Catalog မှာ မရှိတော့ရင် {})"""
+        record = self.by_id.get(char_id)
+        if record is None:
+            return {}
+        return {
+            "character_name": record.name,
+            "character_image": record.image_url,
+            "character_rarity": record.rarity,
+            "character_anime": record.anime,
+            "character_emoji": record.emoji,
+        }
+
+    def age(self):
+        return time.monotonic() - self.loaded_at
+
+
+EMPTY_CATALOG = CatalogSnapshot([], version=0)
@@ -1,14 +1,24 @@
 # character.py
 
-import asyncio, os, re, random
+import asyncio, functools, io, os, re, random, signal, time
 from datetime import datetime
 from telegram import Update, Bot
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+from message_counter import MessageCounterStore
+from character_import import iter_rows, validate_row, check_image_urls, ImportFormatError
+from update_processing import PerChatUpdateProcessor
+from webhook_server import HTTPServer, telegram_webhook_route
+from send_queue import SendScheduler, PRIORITY_CATCH, PRIORITY_SPAWN, PRIORITY_BULK
+from broadcast import Broadcaster
+from catalog import normalize_name
+import metrics
 
 # Database module (Game Bot အတွက်) ကို import လုပ်ပါ
 try:
-    import game_database as gamedb
+    import game_database_async as gamedb
 except ImportError:
     print("Error: game_database.py [Response 101] file ကို မတွေ့ပါ။")
     exit()
@@ -17,30 +27,110 @@ except ImportError:
 try:
     GAME_BOT_TOKEN = os.environ.get("GAME_BOT_TOKEN") 
     OWNER_ID = int(os.environ.get("OWNER_ID")) # (Response 110 မှာ ပြင်ထား)
-    MONGO_URL = os.environ.get("MONGO_URL") 
+    # (MONGO_URL ကို game_database.py က GAME_DB_BACKEND=mongo ဖြစ်မှ စစ်ပါ)
     
-    if not all([GAME_BOT_TOKEN, OWNER_ID, MONGO_URL]):
-        print("Error: Game Bot Environment variables များ (GAME_BOT_TOKEN, OWNER_ID, MONGO_URL) မပြည့်စုံပါ။")
+    if not all([GAME_BOT_TOKEN, OWNER_ID]):
+        print("Error: Game Bot Environment variables များ (GAME_BOT_TOKEN, OWNER_ID) မပြည့်စုံပါ။")
         exit()
 
 except Exception as e:
     print(f"Error: Environment variables များ load လုပ်ရာတွင် အမှားဖြစ်နေပါသည်: {e}")
     exit()
 
+# --- Update Mode (polling / webhook) ---
+BOT_MODE = os.environ.get("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL") # Public base URL (ဥပမာ https://bot.example.com)
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/telegram")
+WEBHOOK_LISTEN = os.environ.get("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("PORT", "8443"))
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+CONCURRENT_UPDATES = int(os.environ.get("CONCURRENT_UPDATES", "32"))
+
+# --- Metrics (Prometheus text: GET /metrics / Structured log) ---
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0")) # 0 ဆိုရင် သီးသန့် Server မဖွင့်ပါ (Webhook mode မှာ /metrics ပါပြီးသား)
+METRICS_LISTEN = os.environ.get("METRICS_LISTEN", "0.0.0.0")
+METRICS_LOG_SECONDS = float(os.environ.get("METRICS_LOG_SECONDS", "0")) # 0 ဆိုရင် Log မထုတ်ပါ
+
+# --- Leaderboards (Catch တိုင်း Counter +1 / LEADERBOARD_RECONCILE_SECONDS တိုင်း Harem ကနေ ပြန်တွက်) ---
+LEADERBOARD_RECONCILE_SECONDS = float(os.environ.get("LEADERBOARD_RECONCILE_SECONDS", "21600")) # 0 ဆိုရင် မလုပ်ပါ
+
+# --- Broadcast (/broadcast - Send Queue ရဲ့ Global Limit ထက် နည်းအောင်ထားပြီး ကျန်တာကို ဂိမ်းအတွက် ချန်ပါ) ---
+BROADCAST_CONCURRENCY = int(os.environ.get("BROADCAST_CONCURRENCY", "20"))
+BROADCAST_RATE = float(os.environ.get("BROADCAST_RATE", "20")) # Message / စက္ကန့်
+BROADCAST_PROGRESS_SECONDS = 5
+
 # --- Global Settings ---
 SPAWN_MESSAGE_COUNT = 10 # 100 messages to spawn
+SPAWN_EXPIRY_CHECK_SECONDS = float(os.environ.get("SPAWN_EXPIRY_CHECK_SECONDS", "10")) # ထွက်ပြေးရမယ့် Spawn တွေ စစ်တဲ့ Interval (0 ဆိုရင် မစစ်ပါ)
 ANTI_SPAM_LIMIT = 5 # 10 consecutive messages
 
-# In-memory tracking
-group_message_counts = {}
-last_user_tracker = {}
+# In-memory tracking (Bounded + DB ထဲ Write-behind နဲ့ သိမ်း)
+COUNTER_MAX_CHATS = int(os.environ.get("COUNTER_MAX_CHATS", "50000"))
+COUNTER_FLUSH_SECONDS = float(os.environ.get("COUNTER_FLUSH_SECONDS", "30"))
+message_counters = MessageCounterStore(max_chats=COUNTER_MAX_CHATS, anti_spam_limit=ANTI_SPAM_LIMIT)
+
+# Outbound Send Queue (Flood Limit မထိအောင် Message အားလုံး ဒီကနေ ပို့ပါ)
+outbox = SendScheduler(
+    global_rate=float(os.environ.get("SEND_GLOBAL_RATE", "25")),
+    group_rate=float(os.environ.get("SEND_GROUP_RATE_PER_MIN", "20")) / 60,
+    workers=int(os.environ.get("SEND_WORKERS", "8"))
+)
+
 
+# --- Bot Identity / Member Count Cache (Event တိုင်း Telegram API မခေါ်ရအောင်) ---
+MEMBER_COUNT_TTL = 60 # စက္ကန့်
+MEMBER_COUNT_CACHE_MAX = 5000
+_member_count_cache = {} # chat_id -> (expires_at, count)
+
+def get_bot_me(context: ContextTypes.DEFAULT_TYPE):
+    """Bot စတက်ချိန်မှာ ယူထားတဲ့ Bot User ကို ပြန်ပေးပါ။ (get_me ထပ်မခေါ်ပါ)"""
+    return context.bot_data.get("me") or context.bot.bot
+
+async def get_member_count(bot, chat_id):
+    """Group member အရေအတွက်ကို TTL Cache နဲ့ ယူပါ။"""
+    now = time.monotonic()
+    cached = _member_count_cache.get(chat_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    count = await bot.get_chat_member_count(chat_id)
+    if len(_member_count_cache) >= MEMBER_COUNT_CACHE_MAX:
+        for key in [k for k, (expires_at, _) in _member_count_cache.items() if expires_at <= now]:
+            del _member_count_cache[key]
+        if len(_member_count_cache) >= MEMBER_COUNT_CACHE_MAX:
+            _member_count_cache.clear()
+    _member_count_cache[chat_id] = (now + MEMBER_COUNT_TTL, count)
+    return count
+
+# --- Character Photo (Telegram file_id Cache) ---
+
+async def send_character_photo(bot, chat_id, character_obj, caption, **kwargs):
+    """
+    Character ပုံကို ပို့ပါ။ file_id ရှိရင် အဲဒါကို သုံးပြီး (URL ကို Telegram က ပြန်မဆွဲရ)၊
+    မရှိရင် (ဒါမှမဟုတ် Telegram က လက်မခံရင်) image_url နဲ့ ပို့ပြီး file_id အသစ်ကို မှတ်ပါ။
+    """
+    char_id = character_obj.get("_id")
+    file_id = character_obj.get("file_id")
+    if file_id:
+        try:
+            return await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption, **kwargs)
+        except BadRequest as e:
+            print(f"Stale file_id for character '{character_obj.get('name')}', re-uploading from URL: {e}")
+            if char_id is not None:
+                await gamedb.clear_character_file_id(char_id)
+
+    message = await bot.send_photo(chat_id=chat_id, photo=character_obj.get("image_url", ""), caption=caption, **kwargs)
+    if message.photo and char_id is not None:
+        new_file_id = message.photo[-1].file_id # (အကြီးဆုံး size)
+        character_obj["file_id"] = new_file_id
+        await gamedb.set_character_file_id(char_id, new_file_id)
+    return message
 
 # --- Group Management Handlers ---
 
+@metrics.timed_handler
 async def on_new_chat_members(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bot က Group အသစ်ထဲ ဝင်လာရင် Member 100 ရှိမရှိ စစ်ပါ။"""
-    me = await context.bot.get_me()
+    me = get_bot_me(context)
     chat = update.effective_chat
     
     if chat.type in ["group", "supergroup"]:
@@ -48,27 +138,27 @@ async def on_new_chat_members(update: Update, context: ContextTypes.DEFAULT_TYPE
             if new_member.id == me.id:
                 try:
                     # (Response 107 Logic) Member အရေအတွက်ကို စစ်ပါ
-                    member_count = await context.bot.get_chat_member_count(chat.id)
+                    member_count = await get_member_count(context.bot, chat.id)
                     
                     if member_count < 100: #
-                        await context.bot.send_message(
+                        await outbox.send(chat.id, lambda: context.bot.send_message(
                             chat_id=chat.id,
                             text=f"❌ ဤ Group တွင် Member {member_count} ယောက်သာ ရှိပါသည်။\n"
                                  f"Member 100 ပြည့်သော Group များတွင်သာ ဤ Bot ကို အသုံးပြုနိုင်ပါသည်။\n\n"
                                  f"Bot မှ ယခု Group မှ ပြန်လည် ထွက်ခွာပါမည်။"
-                        )
+                        ))
                         await context.bot.leave_chat(chat.id)
                         print(f"Game Bot left group '{chat.title}' (ID: {chat.id}) due to insufficient members (Count: {member_count}).")
                     
                     else:
                         print(f"Game Bot joined a new group: {chat.title} (ID: {chat.id}) (Count: {member_count})")
-                        gamedb.add_group(chat.id, chat.title) 
-                        await context.bot.send_message(
+                        await gamedb.add_group(chat.id, chat.title) 
+                        outbox.submit(chat.id, lambda: context.bot.send_message(
                             chat_id=chat.id,
                             text=f"👋 မင်္ဂလာပါ! {me.first_name} ပါရှင့်။\n"
                                  f"ဒီ Group မှာ Message 100 ပြည့်တိုင်း Character တွေ ပေါ်လာပါမယ်။\n"
                                  f"/catch [name] နဲ့ ဖမ်းနိုင်ပါပြီ။"
-                        )
+                        ))
                         
                 except Exception as e:
                     print(f"Error checking member count in new group: {e}")
@@ -77,18 +167,21 @@ async def on_new_chat_members(update: Update, context: ContextTypes.DEFAULT_TYPE
                     except:
                         pass
 
+@metrics.timed_handler
 async def on_left_chat_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bot က Group ကနေ ထွက်သွားရင် DB ကနေ ဖြုတ်ပါ"""
-    me = await context.bot.get_me()
+    me = get_bot_me(context)
     chat = update.effective_chat
     
     if chat.type in ["group", "supergroup"]:
         if update.message.left_chat_member.id == me.id:
             print(f"Game Bot left/was kicked from group: (ID: {chat.id})")
-            gamedb.remove_group(chat.id)
+            message_counters.drop(chat.id)
+            await gamedb.remove_group(chat.id)
 
 # --- (Message 100 Logic) Handler ---
 
+@metrics.timed_handler
 async def handle_group_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Group ထဲက message အားလုံးကို ဖမ်းပြီး 100 ပြည့်မပြည့် စစ်ပါ"""
     if not update.message or not update.effective_user:
@@ -97,68 +190,63 @@ async def handle_group_message(update: Update, context: ContextTypes.DEFAULT_TYP
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id
     
-    if gamedb.get_active_spawn(chat_id):
+    if message_counters.is_spawn_pending(chat_id) or await gamedb.get_active_spawn(chat_id):
         return
         
-    can_count_message = False
-    
-    if chat_id not in last_user_tracker:
-        last_user_tracker[chat_id] = {"user_id": user_id, "count": 1}
-        can_count_message = True
-    elif last_user_tracker[chat_id]["user_id"] == user_id:
-        if last_user_tracker[chat_id]["count"] < ANTI_SPAM_LIMIT:
-            last_user_tracker[chat_id]["count"] += 1
-            can_count_message = True
-        else:
-            can_count_message = False
-    else: 
-        last_user_tracker[chat_id] = {"user_id": user_id, "count": 1}
-        can_count_message = True
+    # Memory ထဲ မရှိသေးရင် (Restart ပြီးစ / idle ဖြစ်လို့ ဖယ်ခံရ) DB ကနေ ပြန်ဖြည့်ပါ
+    if not message_counters.is_loaded(chat_id):
+        saved = await gamedb.load_group_counter(chat_id)
+        message_counters.load(chat_id, saved)
+
+    can_count_message, should_spawn = message_counters.register_message(chat_id, user_id, SPAWN_MESSAGE_COUNT)
         
     if not can_count_message:
+        metrics.inc("messages_total", label_key="result", label_value="spam_suppressed")
         return
-        
-    if chat_id not in group_message_counts:
-        group_message_counts[chat_id] = 1
-    else:
-        group_message_counts[chat_id] += 1
+    metrics.inc("messages_total", label_key="result", label_value="counted")
         
     # (Debug လုပ်ချင်ရင် ဒီ line ကို ဖွင့်ပါ)
-    # print(f"Group {chat_id} count: {group_message_counts[chat_id]} / {SPAWN_MESSAGE_COUNT}") 
+    # print(f"Group {chat_id} count: {message_counters.get_count(chat_id)} / {SPAWN_MESSAGE_COUNT}") 
 
-    if group_message_counts.get(chat_id, 0) >= SPAWN_MESSAGE_COUNT:
+    if should_spawn:
         print(f"Spawning character in Group {chat_id} (Message 100 reached)")
-        group_message_counts[chat_id] = 0
-        last_user_tracker[chat_id] = {}
+        # (ပုံ Queue ထဲ စောင့်နေတုန်း Active Spawn မရှိသေးလို့ ဒုတိယ Spawn မထွက်အောင် Pending မှတ်ပါ)
+        message_counters.start_spawn(chat_id)
         
         # --- (Spawn Logic အသစ်) ---
-        character_obj = gamedb.get_random_character() # Get the full object
+        character_obj = await gamedb.get_random_character(chat_id) # Get the full object
         if not character_obj:
+            message_counters.finish_spawn(chat_id)
             print("No characters found in DB. Admin က /addchar အရင် သုံးပေးပါ။")
             return
         
-        try:
-            char_name = character_obj.get("name", "Unknown")
-            char_image = character_obj.get("image_url", "")
-            
+        async def spawn_job():
             # --- (ပြင်ဆင်ပြီး) Hint ဖြုတ်ပြီး နာမည်အမှန် ပြန်ထည့် ---
-            await context.bot.send_photo(
-                chat_id=chat_id,
-                photo=char_image,
+            await send_character_photo(
+                context.bot, chat_id, character_obj,
                 caption=f"ᴀ ᴄʜᴀʀᴀᴄᴛᴇʀ ʜᴀꜱ ꜱᴘᴀᴡɴᴇᴅ! 😱\n\nᴀᴅᴅ ᴛʜɪꜱ ᴄʜᴀʀᴀᴄᴛᴇʀ ᴛᴏ ʏᴏᴜʀ ʜᴀʀᴇᴍ ᴜꜱɪɴɢ `/catch [Name]`"
             )
-            # DB ထဲမှာ Object တစ်ခုလုံးကို မှတ်ထား
-            gamedb.set_active_spawn(chat_id, character_obj) 
-            
-        except Exception as e:
-            print(f"Error spawning character in group {chat_id}: {e}")
+            # ပုံ ပို့ပြီးမှ DB ထဲမှာ Object တစ်ခုလုံးကို မှတ်ထား
+            await gamedb.set_active_spawn(chat_id, character_obj) 
+            metrics.inc("spawns_total")
+
+        def spawn_done(future):
+            if future.cancelled() or future.exception() is not None:
+                message_counters.fail_spawn(chat_id, SPAWN_MESSAGE_COUNT)
+            else:
+                message_counters.finish_spawn(chat_id)
+
+        # Handler ကို မစောင့်ခိုင်းဘဲ Queue ထဲ ထည့်ပါ (Error တွေကို Queue က print လုပ်ပါမည်)
+        # (TimedOut ဆိုရင် ပုံ နှစ်ခါ ထွက်နိုင်ပေမယ့် Character တူလို့ Spawn ပျောက်တာထက် ကောင်းပါတယ်)
+        outbox.submit(chat_id, spawn_job, PRIORITY_SPAWN, retry_timeouts=True).add_done_callback(spawn_done)
 
 # --- User Commands ---
 
+@metrics.timed_handler
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bot ကိုစဖွင့်ရင် (ပုံစံအသစ် နဲ့) ကြိုဆိုပါ။"""
     user_name = update.effective_user.first_name
-    me = await context.bot.get_me()
+    me = get_bot_me(context)
     bot_username = me.username
     
     # --- (အသစ်) Buttons ---
@@ -182,37 +270,43 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"ᴀᴅᴅ ᴍᴇ ᴛᴏ ʏᴏᴜʀ ɢʀᴏᴜᴘ ᴀɴᴅ ꜱᴛᴀʀᴛ ᴄᴀᴛᴄʜɪɴɢ!"
     )
     
-    await update.message.reply_text(start_msg, reply_markup=reply_markup, parse_mode="Markdown")
+    outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(start_msg, reply_markup=reply_markup, parse_mode="Markdown"))
 
+async def _reply_already_caught(update: Update, chat_id):
+    """ "Already Caught" message ကို ပြပါ။"""
+    # --- (ပြင်ဆင်ပြီး) "Already Caught" Logic ---
+    last_catcher_name = await gamedb.get_group_last_catcher(chat_id)
+    if last_catcher_name:
+        # နောက်ဆုံးဖမ်းထားသူ ရှိရင်၊ "Already Caught" message ပြပါ
+        outbox.submit(chat_id, lambda: update.message.reply_text(
+            f"🌸 Cʜᴀʀᴀᴄᴛᴇʀ ᴀʟʀᴇᴀᴅʏ ᴄᴀᴜɢʜᴛ ʙʏ\n**{last_catcher_name}**\n\n"
+            f"🥤 ᴡᴀɪᴛ ꜰᴏʀ ɴᴇᴡ ᴄʜᴀʀᴀᴄᴛᴇʀ ᴛᴏ ꜱᴘᴀᴡɴ",
+            parse_mode="Markdown"
+        ), PRIORITY_CATCH)
+    else:
+        # (ကိုကိုတောင်းဆိုထားသည့်အတိုင်း)
+        # Bot စဝင်လာပြီး ဘယ်သူမှ မဖမ်းရသေးရင် (ဒါမှမဟုတ်) Character မရှိသေးရင်
+        # ဘာမှ စာမပြန်ဘဲ (Silent) နေပါ
+        pass 
+    # --- (ပြီး) ---
+
+@metrics.timed_handler
 async def catch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Character ကို ဖမ်းမယ့် command (ပြင်ဆင်ပြီး)"""
     user = update.effective_user
     chat = update.effective_chat
     
     if chat.type == "private":
-        await update.message.reply_text("❌ /catch command ကို Group တွေထဲမှာပဲ သုံးလို့ရပါတယ်ရှင့်။")
+        outbox.submit(chat.id, lambda: update.message.reply_text("❌ /catch command ကို Group တွေထဲမှာပဲ သုံးလို့ရပါတယ်ရှင့်။"), PRIORITY_CATCH)
         return
 
     # (၁) DB ထဲက Character Object အပြည့်အစုံကို ယူပါ
-    active_char_obj = gamedb.get_active_spawn(chat.id) 
+    active_char_obj = await gamedb.get_active_spawn(chat.id) 
     
     if not active_char_obj:
-        # --- (ပြင်ဆင်ပြီး) "Already Caught" Logic ---
-        last_catcher_name = gamedb.get_group_last_catcher(chat.id)
-        if last_catcher_name:
-            # နောက်ဆုံးဖမ်းထားသူ ရှိရင်၊ "Already Caught" message ပြပါ
-            await update.message.reply_text(
-                f"🌸 Cʜᴀʀᴀᴄᴛᴇʀ ᴀʟʀᴇᴀᴅʏ ᴄᴀᴜɢʜᴛ ʙʏ\n**{last_catcher_name}**\n\n"
-                f"🥤 ᴡᴀɪᴛ ꜰᴏʀ ɴᴇᴡ ᴄʜᴀʀᴀᴄᴛᴇʀ ᴛᴏ ꜱᴘᴀᴡɴ",
-                parse_mode="Markdown"
-            )
-        else:
-            # (ကိုကိုတောင်းဆိုထားသည့်အတိုင်း)
-            # Bot စဝင်လာပြီး ဘယ်သူမှ မဖမ်းရသေးရင် (ဒါမှမဟုတ်) Character မရှိသေးရင်
-            # ဘာမှ စာမပြန်ဘဲ (Silent) နေပါ
-            pass 
+        metrics.inc("catch_attempts_total", label_key="result", label_value="no_spawn")
+        await _reply_already_caught(update, chat.id)
         return
-        # --- (ပြီး) ---
         
     active_char_name_lower = active_char_obj.get("name_lower", "")
     
@@ -223,13 +317,20 @@ async def catch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     if guessed_name.lower() != active_char_name_lower:
         # (Response 131 က Hint ဖြုတ်ထားတဲ့ Logic)
-        await update.message.reply_text(f"❌ နာမည် မှားနေပါတယ်ရှင့်။")
+        metrics.inc("catch_attempts_total", label_key="result", label_value="wrong_guess")
+        outbox.submit(chat.id, lambda: update.message.reply_text(f"❌ နာမည် မှားနေပါတယ်ရှင့်။"), PRIORITY_CATCH)
         return
         
+    # (Atomic) Spawn ကို DB ထဲမှာ တစ်ယောက်တည်းပဲ ယူနိုင်ပါတယ်။ တပြိုင်နက် ဖမ်းကြရင် ပထမဆုံး တစ်ယောက်ပဲ နိုင်ပါမယ်။
+    active_char_obj = await gamedb.claim_and_record_catch(chat.id, user.id, user.first_name, guessed_name)
+    if not active_char_obj:
+        # တခြားသူက အရင် ဖမ်းသွားပါပြီ
+        metrics.inc("catch_attempts_total", label_key="result", label_value="lost_race")
+        await _reply_already_caught(update, chat.id)
+        return
+
     # (အောင်မြင်သွားပြီ)
-    gamedb.catch_character(user.id, user.first_name, active_char_obj) # User DB ထဲ ထည့်
-    gamedb.set_active_spawn(chat.id, None) # Group DB ကနေ ရှင်း
-    gamedb.set_group_last_catcher(chat.id, user.first_name) # (အသစ်) နောက်ဆုံးဖမ်းသူကို မှတ်
+    metrics.inc("catch_attempts_total", label_key="result", label_value="caught")
     
     # --- ("Gotcha" Message -) ---
     char_name = active_char_obj.get("name", "Unknown")
@@ -237,8 +338,8 @@ async def catch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     char_anime = active_char_obj.get("anime", "Unknown Series")
     char_emoji = active_char_obj.get("emoji", "")
     
-    user_harem_count_in_anime = gamedb.get_user_anime_collection_count(user.id, char_anime)
-    total_in_anime = gamedb.get_total_anime_collection_count(char_anime)
+    # Counter Document တွေကနေ Lookup တစ်ခါတည်းနဲ့ ယူပါ
+    user_harem_count_in_anime, total_in_anime = await gamedb.get_anime_collection_progress(user.id, char_anime)
     
     gotcha_msg = (
         f"🌸 **{user.first_name}, Yᴏᴜ ɢᴏᴛ ᴀ ɴᴇᴡ ᴄʜᴀʀᴀᴄᴛᴇʀ!**\n\n"
@@ -248,61 +349,339 @@ async def catch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"❄️ ᴄʜᴇᴄᴋ ʏᴏᴜʀ /harem!"
     )
     
-    await update.message.reply_text(gotcha_msg, parse_mode="Markdown")
+    outbox.submit(chat.id, lambda: update.message.reply_text(gotcha_msg, parse_mode="Markdown"), PRIORITY_CATCH)
 
-async def harem_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """ဖမ်းမိထားတဲ့ Character တွေကို ကြည့်ရန် (ပြင်ဆင်ပြီး)"""
-    user_id = update.effective_user.id
-    my_harem = gamedb.get_user_harem(user_id)
-    
-    if not my_harem:
-        await update.message.reply_text("သင့်မှာ ဖမ်းမိထားတဲ့ Character တစ်ကောင်မှ မရှိသေးပါဘူးရှင့်။")
-        return
-        
-    msg = f"💖 **{update.effective_user.first_name} ၏ Harem Collection** 💖\n\n"
-    count = 0
-    for char in my_harem:
-        count += 1
+# --- Harem (Page နဲ့ ပြရန်) ---
+
+HAREM_VIEWS_PER_CHAT = 50 # Chat တစ်ခုမှာ Button နှိပ်လို့ရတဲ့ Harem message အရေအတွက်
+
+def _collapse_harem_page(docs):
+    """Page ထဲမှာ ထပ်နေတဲ့ Character တွေကို (×N) အဖြစ် ပေါင်းပါ။ (Legacy Document တွေအတွက် - အစီအစဉ် မပြောင်းပါ)"""
+    collapsed = {}
+    for doc in docs:
+        name = doc.get('character_name', 'N/A')
+        if name in collapsed:
+            collapsed[name]["count"] += doc.get("count", 1)
+        else:
+            collapsed[name] = {"doc": doc, "count": doc.get("count", 1)}
+    return list(collapsed.values())
+
+def _render_harem_view(view, docs, has_next):
+    """Harem message (text, keyboard) ကို တည်ဆောက်ပါ။"""
+    msg = f"💖 **{view['user_name']} ၏ Harem Collection** 💖\n"
+    if view["anime"] is not None:
+        msg += f"🏖️ Anime: *{view['anime']}*\n"
+    if view["rarity"] is not None:
+        msg += f"🟠 Rarity: *{view['rarity']}*\n"
+    msg += f"📄 Page {view['page'] + 1}\n\n"
+
+    for item in _collapse_harem_page(docs):
+        char = item["doc"]
         name = char.get('character_name', 'N/A')
         emoji = char.get('character_emoji', '')
         rarity = char.get('character_rarity', 'N/A')
         anime = char.get('character_anime', 'N/A')
-        
-        # (ပြင်ဆင်ပြီး) ပုံစံအလှ
-        msg += f"{count}. **{name}** {emoji} (Rarity: {rarity}) - *{anime}*\n"
-        
-    msg += f"\n**စုစုပေါင်း: {count} ကောင်**"
-    await update.message.reply_text(msg, parse_mode="Markdown")
+        dup = f" ×{item['count']}" if item["count"] > 1 else ""
+        msg += f"• **{name}** {emoji}{dup} (Rarity: {rarity}) - *{anime}*\n"
+
+    # Filter Button တွေအတွက် ဒီ page ထဲက Anime / Rarity တွေကို မှတ်ထားပါ
+    view["page_animes"] = list(dict.fromkeys(d.get("character_anime") for d in docs))[:3]
+    view["page_rarities"] = list(dict.fromkeys(d.get("character_rarity") for d in docs))[:4]
+
+    keyboard = []
+    nav = []
+    if view["page"] > 0:
+        nav.append(InlineKeyboardButton("◀️ Prev", callback_data="harem:prev"))
+    if has_next:
+        nav.append(InlineKeyboardButton("Next ▶️", callback_data="harem:next"))
+    if nav:
+        keyboard.append(nav)
+    if view["rarity"] is None and len(view["page_rarities"]) > 1:
+        keyboard.append([
+            InlineKeyboardButton(f"🟠 {r}", callback_data=f"harem:r:{i}")
+            for i, r in enumerate(view["page_rarities"])
+        ])
+    if view["anime"] is None and len(view["page_animes"]) > 1:
+        keyboard.append([
+            InlineKeyboardButton(f"🏖️ {a}"[:40], callback_data=f"harem:a:{i}")
+            for i, a in enumerate(view["page_animes"])
+        ])
+    if view["anime"] is not None or view["rarity"] is not None:
+        keyboard.append([InlineKeyboardButton("✖️ Filter ဖြုတ်ရန်", callback_data="harem:all")])
+
+    return msg, InlineKeyboardMarkup(keyboard) if keyboard else None
+
+async def _load_harem_page(view):
+    """View ရဲ့ လက်ရှိ page ကို DB ကနေ ယူပါ။"""
+    docs, next_cursor = await gamedb.get_user_harem_page(
+        view["user_id"],
+        after=view["cursors"][view["page"]],
+        anime=view["anime"],
+        rarity=view["rarity"]
+    )
+    if next_cursor is not None and len(view["cursors"]) == view["page"] + 1:
+        view["cursors"].append(next_cursor)
+    return docs, next_cursor is not None
+
+def _remember_harem_view(context, message_id, view):
+    views = context.chat_data.setdefault("harem_views", {})
+    views[message_id] = view
+    while len(views) > HAREM_VIEWS_PER_CHAT:
+        views.pop(next(iter(views)))
+
+@metrics.timed_handler
+async def harem_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """ဖမ်းမိထားတဲ့ Character တွေကို Page နဲ့ ကြည့်ရန် (/harem [Anime])"""
+    user = update.effective_user
+    anime = " ".join(context.args).strip() if context.args else ""
+    view = {
+        "user_id": user.id,
+        "user_name": user.first_name,
+        "anime": anime or None,
+        "rarity": None,
+        "page": 0,
+        "cursors": [None] # page တစ်ခုချင်းစီ စတဲ့ cursor
+    }
+    docs, has_next = await _load_harem_page(view)
+
+    if not docs:
+        if view["anime"]:
+            outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(f"သင့်မှာ *{anime}* ထဲက Character တစ်ကောင်မှ မရှိသေးပါဘူးရှင့်။", parse_mode="Markdown"))
+        else:
+            outbox.submit(update.effective_chat.id, lambda: update.message.reply_text("သင့်မှာ ဖမ်းမိထားတဲ့ Character တစ်ကောင်မှ မရှိသေးပါဘူးရှင့်။"))
+        return
 
+    msg, reply_markup = _render_harem_view(view, docs, has_next)
+
+    async def send_harem():
+        sent = await update.message.reply_text(msg, reply_markup=reply_markup, parse_mode="Markdown")
+        _remember_harem_view(context, sent.message_id, view)
+
+    outbox.submit(update.effective_chat.id, send_harem)
+
+@metrics.timed_handler
+async def harem_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Harem message ပေါ်က Button (Prev/Next/Filter) တွေကို ကိုင်တွယ်ပါ။"""
+    query = update.callback_query
+    views = context.chat_data.get("harem_views", {})
+    view = views.get(query.message.message_id)
+
+    if view is None:
+        await query.answer("⌛ ဒီ Harem message သက်တမ်းကုန်သွားပါပြီ။ /harem ကို ပြန်သုံးပါ။", show_alert=True)
+        return
+    if query.from_user.id != view["user_id"]:
+        await query.answer("❌ ဒါက သင့် Harem မဟုတ်ပါဘူးရှင့်။", show_alert=True)
+        return
+
+    action = query.data.split(":")[1:]
+    if action[0] == "next" and len(view["cursors"]) > view["page"] + 1:
+        view["page"] += 1
+    elif action[0] == "prev" and view["page"] > 0:
+        view["page"] -= 1
+    elif action[0] in ("r", "a", "all"):
+        if action[0] == "r":
+            view["rarity"] = view["page_rarities"][int(action[1])]
+        elif action[0] == "a":
+            view["anime"] = view["page_animes"][int(action[1])]
+        else:
+            view["anime"] = view["rarity"] = None
+        # Filter ပြောင်းရင် page 1 က ပြန်စပါ
+        view["page"] = 0
+        view["cursors"] = [None]
+    else:
+        await query.answer()
+        return
+
+    docs, has_next = await _load_harem_page(view)
+    msg, reply_markup = _render_harem_view(view, docs, has_next)
+    await query.answer()
+    outbox.submit(update.effective_chat.id, lambda: query.edit_message_text(msg, reply_markup=reply_markup, parse_mode="Markdown"), retry_timeouts=True)
+
+LEADERBOARD_MEDALS = ("🥇", "🥈", "🥉")
+
+def _render_leaderboard(title, rows):
+    lines = [title, ""]
+    for i, row in enumerate(rows):
+        rank = LEADERBOARD_MEDALS[i] if i < len(LEADERBOARD_MEDALS) else f"{i + 1}."
+        lines.append(f"{rank} {row.get('user_name') or row['user_id']} - {row['count']}")
+    return "\n".join(lines) # (User နာမည်ထဲမှာ _ * ပါနိုင်လို့ Markdown မသုံးပါ)
+
+@metrics.timed_handler
+async def top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Catch အများဆုံး User များ (/top - Global, /top [Rarity] - Rarity အလိုက်)"""
+    rarity = " ".join(context.args).strip() if context.args else ""
+    rows = await gamedb.get_leaderboard(rarity=rarity or None)
+    if not rows:
+        msg = f"ℹ️ {rarity} Character ဖမ်းထားသူ မရှိသေးပါဘူးရှင့်။" if rarity else "ℹ️ Character ဖမ်းထားသူ မရှိသေးပါဘူးရှင့်။"
+    else:
+        msg = _render_leaderboard(f"🏆 Top Catchers ({rarity})" if rarity else "🏆 Top Catchers", rows)
+    outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(msg))
+
+@metrics.timed_handler
+async def top_group_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """ဒီ Group ထဲမှာ Catch အများဆုံး User များ (/topgroup)"""
+    chat = update.effective_chat
+    if chat.type == "private":
+        outbox.submit(chat.id, lambda: update.message.reply_text("❌ /topgroup command ကို Group တွေထဲမှာပဲ သုံးလို့ရပါတယ်ရှင့်။"))
+        return
+    rows = await gamedb.get_leaderboard(group_id=chat.id)
+    if not rows:
+        msg = "ℹ️ ဒီ Group ထဲမှာ Character ဖမ်းထားသူ မရှိသေးပါဘူးရှင့်။"
+    else:
+        msg = _render_leaderboard(f"🏆 Top Catchers in {chat.title or 'this group'}", rows)
+    outbox.submit(chat.id, lambda: update.message.reply_text(msg))
+
+# --- Search / Browse (Catalog Snapshot ထဲက Index ကနေ - Message တစ်ခုတည်းကို Button နဲ့ Page လှန်ပါ) ---
+# callback_data: "cat:<kind>[:<arg>]:<page>" (State ကို Button ထဲမှာပဲ ထားလို့ Shard ဘယ်ခုကပဲ ကိုင်ကိုင် ရပါတယ်)
+#   s: Search (arg = Normalize လုပ်ထားတဲ့ query)   n: Character အားလုံး (/wang)
+#   a / r: Anime / Rarity (arg = Snapshot ထဲက anime_names / rarity_names Index)   A / R: Anime / Rarity Menu
+
+CATALOG_MENU_PAGE_SIZE = 8 # Menu တစ် Page မှာ ပြမယ့် Anime Button အရေအတွက်
+SEARCH_QUERY_MAX_BYTES = 40 # (callback_data က 64 bytes ထက် မကျော်ရလို့)
+
+def _page_count(total, size):
+    return max(1, -(-total // size))
+
+def _nav_row(prefix, page, pages):
+    """◀️ 2/5 ▶️ (Page တစ်ခုတည်းဆိုရင် [])"""
+    if pages <= 1:
+        return []
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("◀️", callback_data=f"{prefix}:{page - 1}"))
+    row.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data="cat:x"))
+    if page + 1 < pages:
+        row.append(InlineKeyboardButton("▶️", callback_data=f"{prefix}:{page + 1}"))
+    return row
+
+def _render_character_list(title, total, characters, page, prefix, extra_rows=()):
+    lines = [title, f"Character {total} ကောင်", ""]
+    for i, char in enumerate(characters, start=page * gamedb.CATALOG_PAGE_SIZE + 1):
+        lines.append(f"{i}. {char['name']} {char.get('emoji') or ''} - {char.get('rarity')} ({char.get('anime')})")
+    keyboard = [row for row in (_nav_row(prefix, page, _page_count(total, gamedb.CATALOG_PAGE_SIZE)), *extra_rows) if row]
+    # (Character နာမည်တွေမှာ _ * ပါနိုင်လို့ Markdown မသုံးပါ)
+    return "\n".join(lines), InlineKeyboardMarkup(keyboard) if keyboard else None
+
+def _render_menu(title, kind, names, counts, page, switch_row):
+    pages = _page_count(len(names), CATALOG_MENU_PAGE_SIZE)
+    start = page * CATALOG_MENU_PAGE_SIZE
+    keyboard = [
+        [InlineKeyboardButton(f"{name} ({counts[name]})"[:60], callback_data=f"cat:{kind}:{i}:0")]
+        for i, name in enumerate(names[start:start + CATALOG_MENU_PAGE_SIZE], start=start)
+    ]
+    keyboard.append(_nav_row(f"cat:{kind.upper()}", page, pages))
+    keyboard.append(switch_row)
+    return title, InlineKeyboardMarkup([row for row in keyboard if row])
+
+async def _catalog_view(kind, page, arg=None):
+    """(text, reply_markup) - Button က ညွှန်တဲ့ Anime / Rarity မရှိတော့ရင် (None, None)"""
+    offset = page * gamedb.CATALOG_PAGE_SIZE
+    if kind == "s":
+        total, characters = await gamedb.search_characters(arg, offset)
+        if not total:
+            return f"🔎 \"{arg}\" နဲ့ စတဲ့ Character မတွေ့ပါဘူးရှင့်။", None
+        return _render_character_list(f"🔎 Search: {arg}", total, characters, page, f"cat:s:{arg}")
+    if kind == "n":
+        total, characters = await gamedb.browse_characters(offset=offset)
+        return _render_character_list("📔 Character Database List", total, characters, page, "cat:n")
+
+    catalog = await gamedb.get_catalog()
+    if kind in ("a", "r"):
+        names = catalog.anime_names if kind == "a" else catalog.rarity_names
+        index = int(arg)
+        if index >= len(names):
+            return None, None
+        name = names[index]
+        if kind == "a":
+            total, characters = await gamedb.browse_characters(anime=name, offset=offset)
+            back = InlineKeyboardButton("⬅️ Anime List", callback_data=f"cat:A:{index // CATALOG_MENU_PAGE_SIZE}")
+            title = f"🏖️ {name}"
+        else:
+            total, characters = await gamedb.browse_characters(rarity=name, offset=offset)
+            back = InlineKeyboardButton("⬅️ Rarity List", callback_data="cat:R:0")
+            title = f"🟠 {name}"
+        return _render_character_list(title, total, characters, page, f"cat:{kind}:{index}", extra_rows=[[back]])
+    if kind == "A":
+        counts = {name: len(catalog.by_anime[name]) for name in catalog.anime_names}
+        return _render_menu(
+            f"📚 Anime {len(catalog.anime_names)} ခု - ကြည့်ချင်တဲ့ Anime ကို ရွေးပါ", "a",
+            catalog.anime_names, counts, page, [InlineKeyboardButton("🟠 Rarity အလိုက်", callback_data="cat:R:0")]
+        )
+    if kind == "R":
+        counts = {name: len(catalog.by_rarity[name]) for name in catalog.rarity_names}
+        return _render_menu(
+            "🟠 ကြည့်ချင်တဲ့ Rarity ကို ရွေးပါ", "r",
+            catalog.rarity_names, counts, page, [InlineKeyboardButton("🏖️ Anime အလိုက်", callback_data="cat:A:0")]
+        )
+    return None, None
+
+@metrics.timed_handler
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Character ကို နာမည်နဲ့ ရှာရန် (/search <နာမည်ရဲ့ အစ>)"""
+    query_text = normalize_name(" ".join(context.args or []))
+    query_text = query_text.encode("utf-8")[:SEARCH_QUERY_MAX_BYTES].decode("utf-8", "ignore").strip()
+    if not query_text:
+        outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(
+            "🔎 **Usage:** `/search <နာမည်>`\nဥပမာ: `/search naru`", parse_mode="Markdown"
+        ))
+        return
+    msg, reply_markup = await _catalog_view("s", 0, query_text)
+    outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(msg, reply_markup=reply_markup))
+
+@metrics.timed_handler
+async def browse_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Anime / Rarity အလိုက် Character တွေကို ကြည့်ရန် (/browse [Anime ဒါမှမဟုတ် Rarity])"""
+    wanted = " ".join(context.args or []).strip().casefold()
+    kind, arg = "A", None
+    if wanted:
+        catalog = await gamedb.get_catalog()
+        for list_kind, names in (("a", catalog.anime_names), ("r", catalog.rarity_names)):
+            index = next((i for i, name in enumerate(names) if name.casefold() == wanted), None)
+            if index is not None:
+                kind, arg = list_kind, str(index)
+                break
+    msg, reply_markup = await _catalog_view(kind, 0, arg)
+    outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(msg, reply_markup=reply_markup))
+
+@metrics.timed_handler
+async def catalog_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Search / Browse / Wang message ပေါ်က Button တွေ (Message ကိုပဲ ပြင်ပါ)"""
+    query = update.callback_query
+    parts = query.data.split(":", 2)
+    if len(parts) < 3: # ("cat:x" - Page နံပါတ်)
+        await query.answer()
+        return
+    kind = parts[1]
+    arg, _, page = parts[2].rpartition(":")
+    if kind == "n" and query.from_user.id != OWNER_ID:
+        await query.answer("❌ ဤ List ကို Owner သာ ကြည့်နိုင်ပါသည်။", show_alert=True)
+        return
+    try:
+        msg, reply_markup = await _catalog_view(kind, int(page), arg or None)
+    except (TypeError, ValueError): # (ပြင်ထားတဲ့ callback_data)
+        msg = None
+    if msg is None:
+        await query.answer("⌛ Character List ပြောင်းသွားပါပြီ။ /browse ကို ပြန်သုံးပါ။", show_alert=True)
+        return
+    await query.answer()
+    outbox.submit(update.effective_chat.id, lambda: query.edit_message_text(msg, reply_markup=reply_markup), retry_timeouts=True)
+
+@metrics.timed_handler
 async def wang_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """(Admin Only) DB ထဲက Character List အားလုံးကို ပြပါ။"""
+    """(Admin Only) DB ထဲက Character List အားလုံးကို (Message တစ်ခုတည်းမှာ Page နဲ့) ပြပါ။"""
     if update.effective_user.id != OWNER_ID:
         await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
         return
 
-    names_list = gamedb.get_all_character_names() # [Response 102]
-    
-    if not names_list:
+    if not len(await gamedb.get_catalog()):
         await update.message.reply_text("ℹ️ Character Database [Response 101] ထဲမှာ ဘာမှ မရှိသေးပါဘူး။\n`/addchar` [Response 101] ကို အရင် သုံးပါ။")
         return
-
-    msg = "📔 **Character Database List** 📔\n\n"
-    count = 0
-    for name in names_list:
-        count += 1
-        msg += f"{count}. `{name}`\n"
-        
-        if len(msg) > 3800:
-            await update.message.reply_text(msg, parse_mode="Markdown")
-            msg = "" 
-            
-    if msg: 
-        await update.message.reply_text(msg, parse_mode="Markdown")
-
-    await update.message.reply_text(f"✅ စုစုပေါင်း Character `{count}` ကောင် တွေ့ရှိပါသည်။")
+    msg, reply_markup = await _catalog_view("n", 0)
+    outbox.submit(update.effective_chat.id, lambda: update.message.reply_text(msg, reply_markup=reply_markup))
 
 # --- Owner Commands ---
 
+@metrics.timed_handler
 async def add_character_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """(Owner Only) Character အသစ် ထည့်ရန် (ပုံစံအသစ်)"""
     if update.effective_user.id != OWNER_ID:
@@ -330,10 +709,12 @@ async def add_character_command(update: Update, context: ContextTypes.DEFAULT_TY
         anime = parts[3].strip()
         emoji = parts[4].strip()
         
-        gamedb.add_character(name, image_url, rarity, anime, emoji)
+        char_id = await gamedb.add_character(name, image_url, rarity, anime, emoji)
         
-        await update.message.reply_photo(
-            photo=image_url,
+        await send_character_photo(
+            context.bot, update.effective_chat.id,
+            {"_id": char_id, "name": name, "image_url": image_url},
+            reply_to_message_id=update.message.message_id,
             caption=f"✅ **Character အသစ် ထည့်ပြီးပါပြီ!**\n\n"
                     f"**Name:** {name} {emoji}\n"
                     f"**Rarity:** {rarity}\n"
@@ -343,6 +724,136 @@ async def add_character_command(update: Update, context: ContextTypes.DEFAULT_TY
     except Exception as e:
         await update.message.reply_text(f"❌ Error: {e}")
 
+IMPORT_URL_WORKERS = 8 # image_url စစ်တဲ့အခါ တပြိုင်နက် ချိတ်မယ့် အရေအတွက်
+IMPORT_ERRORS_SHOWN = 15
+
+@metrics.timed_handler
+async def import_characters_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) CSV/JSON file ထဲက Character တွေကို တစ်ခါတည်း ထည့်ရန် (File ကို Reply ပြီး /importchars [checkurls])"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    replied = update.message.reply_to_message
+    document = replied.document if replied else None
+    if not document:
+        await update.message.reply_text(
+            "❌ **CSV / JSON file ကို Reply ပြီး သုံးပါ!**\n"
+            "`/importchars` - ထည့်ရန်\n"
+            "`/importchars checkurls` - image_url တွေကိုပါ စစ်ပြီး ထည့်ရန်\n\n"
+            "**Columns:** `name, image_url, rarity, anime, emoji`",
+            parse_mode="Markdown"
+        )
+        return
+
+    check_urls = bool(context.args) and context.args[0].lower() == "checkurls"
+    status = await update.message.reply_text(f"⏳ `{document.file_name}` ကို ဖတ်နေပါသည်...", parse_mode="Markdown")
+
+    tg_file = await document.get_file()
+    data = bytes(await tg_file.download_as_bytearray())
+
+    errors = [] # [(row_number, message), ...]
+    totals = {"inserted": 0, "updated": 0, "rows": 0}
+
+    async def flush(chunk):
+        if check_urls:
+            url_errors = await check_image_urls(chunk, workers=IMPORT_URL_WORKERS)
+            errors.extend(sorted(url_errors.items()))
+            chunk = [(n, row) for n, row in chunk if n not in url_errors]
+        inserted, updated = await gamedb.bulk_upsert_characters([row for _, row in chunk])
+        totals["inserted"] += inserted
+        totals["updated"] += updated
+        await status.edit_text(
+            f"⏳ Row {totals['rows']} ခု ဖတ်ပြီး... "
+            f"(➕ {totals['inserted']} / ♻️ {totals['updated']} / ❌ {len(errors)})"
+        )
+
+    try:
+        chunk = []
+        for row_number, raw in iter_rows(data, document.file_name):
+            totals["rows"] += 1
+            row, error = validate_row(raw)
+            if error:
+                errors.append((row_number, error))
+                continue
+            chunk.append((row_number, row))
+            if len(chunk) >= gamedb.IMPORT_CHUNK_SIZE:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+    except ImportFormatError as e:
+        await status.edit_text(f"❌ {e}")
+        return
+    except Exception as e:
+        await status.edit_text(f"❌ Import ရပ်သွားပါသည် (Row {totals['rows']}): {e}")
+        return
+
+    report = (
+        f"✅ Import ပြီးပါပြီ!\n\n"
+        f"📄 Row: {totals['rows']}\n"
+        f"➕ အသစ်: {totals['inserted']}\n"
+        f"♻️ ပြင်ဆင်: {totals['updated']}\n"
+        f"❌ Error: {len(errors)}"
+    )
+    if errors:
+        report += "\n\n" + "\n".join(f"Row {n}: {msg}" for n, msg in errors[:IMPORT_ERRORS_SHOWN])
+    await status.edit_text(report) # (Error message ထဲမှာ URL ပါနိုင်လို့ Markdown မသုံးပါ)
+
+    if len(errors) > IMPORT_ERRORS_SHOWN:
+        error_file = io.BytesIO("\n".join(f"Row {n}: {msg}" for n, msg in errors).encode("utf-8"))
+        await update.message.reply_document(document=error_file, filename="import_errors.txt")
+
+WARMUP_SEND_DELAY = 0.5 # Flood limit မထိအောင် ပုံတစ်ပုံချင်းကြား စောင့်ချိန် (စက္ကန့်)
+
+@metrics.timed_handler
+async def warm_images_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) file_id မရှိသေးတဲ့ Character ပုံတွေကို ကြိုတင် Upload လုပ်ပြီး file_id မှတ်ပါ။"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    pending = await gamedb.get_characters_without_file_id()
+    if not pending:
+        await update.message.reply_text("✅ Character ပုံအားလုံး file_id ရှိပြီးသားပါ။")
+        return
+
+    status = await update.message.reply_text(f"⏳ ပုံ {len(pending)} ပုံကို Upload လုပ်နေပါသည်...")
+    chat_id = update.effective_chat.id
+    done, failed = 0, 0
+    for i, character_obj in enumerate(pending, start=1):
+        try:
+            message = await send_character_photo(context.bot, chat_id, character_obj, caption=character_obj.get("name"), disable_notification=True)
+            done += 1
+            await message.delete() # file_id ပဲ လိုတာမို့ Chat ထဲမှာ မထားပါ
+        except Exception as e:
+            if not character_obj.get("file_id"):
+                failed += 1
+            print(f"Warm-up failed for '{character_obj.get('name')}': {e}")
+        if i % 25 == 0:
+            await status.edit_text(f"⏳ {i}/{len(pending)} (✅ {done} / ❌ {failed})")
+        await asyncio.sleep(WARMUP_SEND_DELAY)
+
+    await status.edit_text(f"✅ Warm-up ပြီးပါပြီ။ ✅ {done} / ❌ {failed}")
+
+@metrics.timed_handler
+async def rebuild_counters_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) Anime Collection Counter နဲ့ Leaderboard တွေကို ပြန်တွက်ပါ။"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    await update.message.reply_text("⏳ Counter တွေကို ပြန်တွက်နေပါသည်...")
+    try:
+        total = await gamedb.rebuild_collection_counters()
+        entries = await gamedb.rebuild_leaderboards()
+        await update.message.reply_text(
+            f"✅ Counter `{total}` ခု၊ Leaderboard Entry `{entries}` ခု ပြန်တွက်ပြီးပါပြီ။", parse_mode="Markdown"
+        )
+    except Exception as e:
+        await update.message.reply_text(f"❌ Error: {e}")
+
+@metrics.timed_handler
 async def clean_game_db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """(Owner Only) Game Bot DB [Response 108] အားလုံးကို ဖျက်ပါ။"""
     if update.effective_user.id != OWNER_ID:
@@ -356,7 +867,8 @@ async def clean_game_db_command(update: Update, context: ContextTypes.DEFAULT_TY
         await update.message.reply_text(
             "🚨 ***CONFIRMATION REQUIRED*** 🚨\n\n"
             "သင် Game Bot (`character.py`) ရဲ့ Database [Response 108] တစ်ခုလုံးကို ဖျက်ရန် ကြိုးစားနေပါသည်။\n\n"
-            "Character တွေ၊ User တွေ ဖမ်းထားတာ တွေ အားလုံး ပျက်စီးသွားပါမည်။\n\n"
+            "Character တွေ၊ User တွေ ဖမ်းထားတာ တွေ အားလုံး ပျက်စီးသွားပါမည်။\n"
+            f"(မဖျက်ခင် Backup ကို `{gamedb.BACKUP_DIR}/` ထဲ အလိုအလျောက် သိမ်းပါမည်)\n\n"
             "⚠️ **သေချာလျှင်၊ အောက်ပါ command ကို ထပ်မံရိုက်ထည့်ပါ**:\n"
             "`/cleanmongodb confirm`",
             parse_mode="Markdown"
@@ -367,12 +879,13 @@ async def clean_game_db_command(update: Update, context: ContextTypes.DEFAULT_TY
     await update.message.reply_text("⏳ ***Executing Game DB Wipe...***")
     
     try:
-        success = gamedb.wipe_game_data() # DB function အသစ်ကို ခေါ်ပါ
+        success = await gamedb.wipe_game_data() # DB function အသစ်ကို ခေါ်ပါ
         
         if success:
             await update.message.reply_text(
                 "✅ ***SUCCESS*** ✅\n\n"
-                "Game Bot Database (`game_bot_db`) [Response 108] တစ်ခုလုံးကို အောင်မြင်စွာ ဖျက်သိမ်းပြီးပါပြီ။\n\n"
+                "Game Bot Database (`game_bot_db`) [Response 108] တစ်ခုလုံးကို အောင်မြင်စွာ ဖျက်သိမ်းပြီးပါပြီ။\n"
+                f"📦 ပြန်လိုရင်: `python backup.py restore {gamedb.BACKUP_DIR}/<file> --confirm`\n\n"
                 "⚠️ **Bot ကို အခုချက်ချင်း RESTART လုပ်ပါ။**"
             )
         else:
@@ -381,12 +894,281 @@ async def clean_game_db_command(update: Update, context: ContextTypes.DEFAULT_TY
     except Exception as e:
         await update.message.reply_text(f"❌ ***CRITICAL ERROR***\n\nAn error occurred: {str(e)}")
 
+@metrics.timed_handler
+async def backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) Game DB တစ်ခုလုံးကို Server ပေါ်က BACKUP_DIR ထဲ Backup ယူပါ။"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    status = await update.message.reply_text("⏳ Backup ယူနေပါသည်...")
+    try:
+        started = time.perf_counter()
+        path, counts = await gamedb.export_backup()
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        lines = [f"✅ Backup ပြီးပါပြီ ({time.perf_counter() - started:.1f}s)", "", f"📦 {path} ({size_mb:.1f} MB)"]
+        lines += [f"  {name}: {count}" for name, count in counts.items()]
+        await status.edit_text("\n".join(lines)) # (Path / Collection နာမည်တွေမှာ _ ပါလို့ Markdown မသုံးပါ)
+    except Exception as e:
+        await status.edit_text(f"❌ Backup Error: {e}")
+
+@metrics.timed_handler
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) Hot path Latency / DB call / Counter အကျဉ်းချုပ်ကို ပြပါ။"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    def ms(histogram, q):
+        value = histogram.quantile(q)
+        return f"{value * 1000:.0f}" if value is not None else "-"
+
+    lines = [f"📊 Bot Stats (uptime {int(time.time() - metrics.started_at)}s)", ""]
+    lines.append("Counters:")
+    lines.append(f"  spawns: {metrics.counter_value('spawns_total')}")
+    for result in ("caught", "wrong_guess", "lost_race", "no_spawn"):
+        lines.append(f"  catch {result}: {metrics.counter_value('catch_attempts_total', result)}")
+    lines.append(f"  messages counted: {metrics.counter_value('messages_total', 'counted')}")
+    lines.append(f"  spam suppressed: {metrics.counter_value('messages_total', 'spam_suppressed')}")
+    send = outbox.metrics()
+    lines.append(
+        f"  send: sent {send['sent']} / failed {send['failed']} / retried {send['retried']}"
+        f" / flood waits {send['flood_waits']} / queue {send['queue_depth']}"
+    )
+
+    lines.append("")
+    lines.append("Handlers (calls, p50/p95/p99 ms):")
+    for name, histogram in metrics.histograms_by_total("handler_seconds"):
+        lines.append(f"  {name}: {histogram.count}, {ms(histogram, 0.5)}/{ms(histogram, 0.95)}/{ms(histogram, 0.99)}")
+
+    lines.append("")
+    lines.append("DB functions (calls, total s, p95 ms):")
+    for name, histogram in metrics.histograms_by_total("gamedb_call_seconds"):
+        lines.append(f"  {name}: {histogram.count}, {histogram.total:.2f}, {ms(histogram, 0.95)}")
+
+    await update.message.reply_text("\n".join(lines)) # (Function နာမည်တွေမှာ _ ပါလို့ Markdown မသုံးပါ)
+
+def _broadcast_progress_text(broadcaster, title="⏳ Broadcast ပို့နေပါသည်..."):
+    stats = broadcaster.stats
+    elapsed = broadcaster.elapsed()
+    rate = broadcaster.processed / elapsed if elapsed else 0.0
+    return (
+        f"{title}\n\n"
+        f"✅ Sent: {stats['sent']}\n"
+        f"🗑️ Removed (dead chats): {stats['removed']}\n"
+        f"❌ Failed: {stats['failed']}\n"
+        f"⏱️ {int(elapsed)}s ({rate:.1f}/s)"
+    )
+
+async def run_broadcast(broadcaster, status):
+    """Background Task: ပို့ပြီး Status Message ကို ပြင်ပါ။"""
+    async def on_progress(b):
+        await status.edit_text(_broadcast_progress_text(b))
+
+    try:
+        await broadcaster.run(on_progress=on_progress, progress_every=BROADCAST_PROGRESS_SECONDS)
+        title = "⏹️ Broadcast ရပ်လိုက်ပါပြီ။" if broadcaster.cancelled else "✅ Broadcast ပြီးပါပြီ!"
+        await status.edit_text(_broadcast_progress_text(broadcaster, title))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error running broadcast: {e}")
+        await status.edit_text(f"❌ Broadcast ရပ်သွားပါသည် (Sent {broadcaster.stats['sent']}): {e}")
+    finally:
+        for result, count in broadcaster.stats.items():
+            metrics.inc("broadcast_messages_total", count, label_key="result", label_value=result)
+
+@metrics.timed_handler
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """(Owner Only) Group အားလုံးကို ကြေညာချက် ပို့ပါ။ (Message ကို Reply ပြီး /broadcast ဒါမှမဟုတ် /broadcast <စာ>)"""
+    if update.effective_user.id != OWNER_ID:
+        await update.message.reply_text("❌ ဤ command ကို Owner သာ သုံးနိုင်ပါသည်။")
+        return
+
+    bot_data = context.application.bot_data
+    running = bot_data.get("broadcast")
+    if context.args and context.args[0].lower() == "cancel":
+        if running and not running.finished:
+            running.cancel()
+            await update.message.reply_text("⏹️ Broadcast ကို ရပ်နေပါသည်... (ပို့နေဆဲ Message တွေ ပြီးမှ ရပ်ပါမည်)")
+        else:
+            await update.message.reply_text("ℹ️ ပို့နေတဲ့ Broadcast မရှိပါ။")
+        return
+    if running and not running.finished:
+        await update.message.reply_text("⏳ Broadcast တစ်ခု ပို့နေဆဲပါ။ ရပ်ချင်ရင် `/broadcast cancel`", parse_mode="Markdown")
+        return
+
+    bot = context.bot
+    replied = update.message.reply_to_message
+    if replied:
+        # (ပုံ / Formatting / Button ပါ မူရင်းအတိုင်း ကူးပို့ပါ)
+        from_chat_id, message_id = replied.chat_id, replied.message_id
+        make_call = lambda chat_id: functools.partial(bot.copy_message, chat_id, from_chat_id, message_id)
+    elif context.args:
+        text = update.message.text.split(None, 1)[1]
+        make_call = lambda chat_id: functools.partial(bot.send_message, chat_id, text)
+    else:
+        await update.message.reply_text(
+            "❌ **ပို့မယ့် Message ကို Reply ပြီး သုံးပါ!**\n"
+            "`/broadcast` - Reply ထားတဲ့ Message ကို Group အားလုံးဆီ ကူးပို့ရန်\n"
+            "`/broadcast <စာ>` - စာကို ပို့ရန်\n"
+            "`/broadcast cancel` - ရပ်ရန်",
+            parse_mode="Markdown"
+        )
+        return
+
+    async def send(chat_id):
+        # (Bulk Priority - /catch / Spawn Message တွေကို မစောင့်ခိုင်းပါ)
+        return await outbox.send(chat_id, make_call(chat_id), PRIORITY_BULK)
+
+    broadcaster = Broadcaster(
+        gamedb.get_group_ids_page, send, gamedb.remove_group,
+        concurrency=BROADCAST_CONCURRENCY,
+        rate=min(BROADCAST_RATE, outbox.global_bucket.rate),
+        page_size=gamedb.BROADCAST_PAGE_SIZE
+    )
+    status = await update.message.reply_text("⏳ Broadcast စတင်နေပါသည်...")
+    bot_data["broadcast"] = broadcaster
+    bot_data["broadcast_task"] = asyncio.create_task(run_broadcast(broadcaster, status))
+
 # --- Main Function ---
 
-def main():
-    print("🤖 Game Bot (character.py) စတင်နေပါသည်...")
+async def flush_message_counters():
+    """ပြောင်းထားတဲ့ Group Count တွေကို DB ထဲ တစ်ခါတည်း ရေးပါ။"""
+    rows = message_counters.take_dirty()
+    if not rows:
+        return
+    try:
+        await gamedb.save_group_counters(rows)
+    except Exception as e:
+        message_counters.restore_dirty(rows)
+        print(f"Error flushing message counters ({len(rows)} groups): {e}")
 
-    application = Application.builder().token(GAME_BOT_TOKEN).build() 
+async def counter_flush_loop():
+    """COUNTER_FLUSH_SECONDS တိုင်း Count တွေကို DB ထဲ သိမ်းပါ။"""
+    while True:
+        await asyncio.sleep(COUNTER_FLUSH_SECONDS)
+        await flush_message_counters()
+
+async def expire_spawns_once(bot):
+    """အချိန်ကျော်နေတဲ့ Spawn အားလုံးကို (Batch လိုက်) ဖျက်ပြီး Group တစ်ခုချင်းစီမှာ အဖြေ ပြပါ။"""
+    while True:
+        expired = await gamedb.expire_due_spawns()
+        for chat_id, character_obj in expired:
+            reveal_msg = (
+                f"⌛ **Tʜᴇ ᴄʜᴀʀᴀᴄᴛᴇʀ ʀᴀɴ ᴀᴡᴀʏ!**\n\n"
+                f"🫧 **Nᴀᴍᴇ:** {character_obj.get('name', 'Unknown')} [{character_obj.get('emoji', '')}]\n"
+                f"🏖️ **Aɴɪᴍᴇ:** {character_obj.get('anime', 'Unknown Series')}"
+            )
+            outbox.submit(chat_id, functools.partial(bot.send_message, chat_id, reveal_msg, parse_mode="Markdown"))
+        if expired:
+            metrics.inc("spawns_expired_total", len(expired))
+        if len(expired) < gamedb.SPAWN_EXPIRY_BATCH:
+            return
+
+async def spawn_expiry_loop(bot):
+    """SPAWN_EXPIRY_CHECK_SECONDS တိုင်း Due ဖြစ်နေတဲ့ Group အားလုံးကို တစ်ခါတည်း စစ်ပါ။ (Group တစ်ခုချင်း Timer မထားပါ)"""
+    while True:
+        await asyncio.sleep(SPAWN_EXPIRY_CHECK_SECONDS)
+        try:
+            await expire_spawns_once(bot)
+        except Exception as e:
+            print(f"Error expiring spawns: {e}")
+
+async def leaderboard_reconcile_loop():
+    """LEADERBOARD_RECONCILE_SECONDS တိုင်း Leaderboard Count တွေကို Harem ကနေ ပြန်တွက်ပါ။ (Counter လွဲနေတာ ပြင်ရန်)"""
+    while True:
+        await asyncio.sleep(LEADERBOARD_RECONCILE_SECONDS)
+        try:
+            entries = await gamedb.rebuild_leaderboards()
+            print(f"🏆 Leaderboard reconcile: Entry {entries} ခု")
+        except Exception as e:
+            print(f"Error reconciling leaderboards: {e}")
+
+async def metrics_route(headers, body):
+    """GET /metrics (Prometheus text format)"""
+    return 200, "text/plain; version=0.0.4", metrics.render_prometheus().encode("utf-8")
+
+async def metrics_log_loop():
+    """METRICS_LOG_SECONDS တိုင်း Metrics snapshot ကို JSON line တစ်ကြောင်းအဖြစ် print ထုတ်ပါ။"""
+    while True:
+        await asyncio.sleep(METRICS_LOG_SECONDS)
+        print(f"METRICS {metrics.snapshot_json()}")
+
+def register_metric_gauges():
+    """Export လုပ်ချိန်မှာ ဖတ်မယ့် Gauge တွေ (Queue depth, Cache size စသည်)"""
+    metrics.register_gauge("send_queue_depth", outbox.depth, "Outgoing messages waiting in the send queue")
+    metrics.register_gauge(
+        "send_queue_depth_by_priority", lambda: outbox.metrics()["queue_depth_by_priority"],
+        "Outgoing messages waiting, by priority", label_key="priority"
+    )
+    metrics.register_gauge(
+        "send_results", lambda: {k: outbox.stats[k] for k in ("sent", "retried", "failed", "flood_waits")},
+        "Send scheduler outcomes since start", label_key="result"
+    )
+    metrics.register_gauge("message_counter_chats", lambda: len(message_counters), "Groups held in the message counter store")
+    metrics.register_gauge("spawn_cache_entries", lambda: len(gamedb.spawn_cache), "Entries in the active spawn cache")
+
+async def post_init(application: Application):
+    """Bot စတက်ချိန်မှာ Background Task တွေ စပါ။"""
+    # Application.initialize() က get_me ကို တစ်ခါ ခေါ်ပြီးသားမို့ အဲဒီ User ကိုပဲ သိမ်းထားပါ
+    application.bot_data["me"] = application.bot.bot
+    catalog = await gamedb.load_catalog() # Catalog Snapshot ကို ကြိုဆွဲထားပါ
+    print(f"📚 Catalog snapshot: Character {len(catalog)} ကောင်")
+    application.bot_data["change_watcher_stop"] = gamedb.start_change_watcher()
+    application.bot_data["counter_flush_task"] = asyncio.create_task(counter_flush_loop())
+    if LEADERBOARD_RECONCILE_SECONDS > 0:
+        application.bot_data["leaderboard_task"] = asyncio.create_task(leaderboard_reconcile_loop())
+    if gamedb.SPAWN_EXPIRE_SECONDS > 0 and SPAWN_EXPIRY_CHECK_SECONDS > 0:
+        application.bot_data["spawn_expiry_task"] = asyncio.create_task(spawn_expiry_loop(application.bot))
+    register_metric_gauges()
+    if METRICS_PORT:
+        metrics_server = HTTPServer({("GET", "/metrics"): metrics_route}, host=METRICS_LISTEN, port=METRICS_PORT)
+        await metrics_server.start()
+        application.bot_data["metrics_server"] = metrics_server
+    if METRICS_LOG_SECONDS > 0:
+        application.bot_data["metrics_log_task"] = asyncio.create_task(metrics_log_loop())
+    await outbox.start()
+
+async def post_stop(application: Application):
+    """Update လက်ခံတာ ရပ်ပြီးချိန် (Bot မပိတ်ခင်) မှာ ကျန်နေတာတွေ သိမ်း/ပို့ပါ။"""
+    stop_event = application.bot_data.get("change_watcher_stop")
+    if stop_event:
+        stop_event.set()
+    flush_task = application.bot_data.get("counter_flush_task")
+    if flush_task:
+        flush_task.cancel()
+    for task_name in ("leaderboard_task", "spawn_expiry_task", "broadcast_task"):
+        task = application.bot_data.get(task_name)
+        if task:
+            task.cancel()
+    await flush_message_counters() # မသိမ်းရသေးတဲ့ Count တွေ မပျောက်အောင်
+    await outbox.stop() # Queue ထဲ ကျန်တာတွေ ပို့ပြီးမှ ရပ်ပါ
+    log_task = application.bot_data.get("metrics_log_task")
+    if log_task:
+        log_task.cancel()
+    metrics_server = application.bot_data.get("metrics_server")
+    if metrics_server:
+        await metrics_server.stop()
+
+async def post_shutdown(application: Application):
+    """Bot ပိတ်ချိန်မှာ DB Thread Pool ကို ရှင်းပါ။"""
+    gamedb.shutdown()
+
+def build_application(with_updater=True):
+    """Handler အားလုံး ထည့်ထားတဲ့ Application ကို တည်ဆောက်ပါ။"""
+    builder = (
+        Application.builder()
+        .token(GAME_BOT_TOKEN)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        # Chat မတူရင် တပြိုင်နက်၊ Chat တူရင် အစဉ်လိုက် run ပါ
+        .concurrent_updates(PerChatUpdateProcessor(CONCURRENT_UPDATES))
+    )
+    if not with_updater:
+        builder = builder.updater(None) # (Webhook mode - Update တွေကို ကိုယ်တိုင် update_queue ထဲ ထည့်ပါ)
+    application = builder.build() 
 
     # --- (JobQueue (Timer) ကို ဖြုတ်ထားပါသည်) ---
 
@@ -394,11 +1176,23 @@ def main():
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("catch", catch_command))
     application.add_handler(CommandHandler("harem", harem_command))
+    application.add_handler(CallbackQueryHandler(harem_callback, pattern=r"^harem:"))
+    application.add_handler(CommandHandler("top", top_command))
+    application.add_handler(CommandHandler("topgroup", top_group_command))
+    application.add_handler(CommandHandler("search", search_command))
+    application.add_handler(CommandHandler("browse", browse_command))
+    application.add_handler(CallbackQueryHandler(catalog_callback, pattern=r"^cat:"))
     
     # Owner Command
     application.add_handler(CommandHandler("addchar", add_character_command))
     application.add_handler(CommandHandler("wang", wang_command)) 
     application.add_handler(CommandHandler("cleanmongodb", clean_game_db_command)) 
+    application.add_handler(CommandHandler("backup", backup_command))
+    application.add_handler(CommandHandler("rebuildcounters", rebuild_counters_command))
+    application.add_handler(CommandHandler("warmimages", warm_images_command))
+    application.add_handler(CommandHandler("importchars", import_characters_command))
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("broadcast", broadcast_command))
 
     # Group Management
     application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, on_new_chat_members))
@@ -411,9 +1205,68 @@ def main():
         handle_group_message
     ))
     # --- (ပြီး) ---
+    return application
+
+async def run_webhook(application: Application):
+    """
+    Webhook mode: Telegram က POST လုပ်တဲ့ Update တွေကို HTTP server နဲ့ လက်ခံပါ။
+    WEBHOOK_URL မထည့်ထားရင် Telegram မှာ webhook မမှတ်ပါ (Local မှာ replay_updates.py နဲ့ စမ်းရန်)
+    """
+    server = HTTPServer(
+        {
+            ("POST", WEBHOOK_PATH): telegram_webhook_route(application, WEBHOOK_SECRET),
+            ("GET", "/metrics"): metrics_route,
+        },
+        host=WEBHOOK_LISTEN, port=WEBHOOK_PORT
+    )
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError: # (Windows)
+            pass
 
-    print("🚀 Game Bot အဆင်သင့်ဖြစ်ပါပြီ။ (Message Count Mode)")
-    application.run_polling()
+    await application.initialize()
+    await post_init(application)
+    await application.start()
+    try:
+        await server.start()
+        if WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES
+            )
+            print(f"✅ Webhook ကို {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH} မှာ မှတ်ပြီးပါပြီ။")
+        else:
+            print("ℹ️ WEBHOOK_URL မရှိလို့ Telegram မှာ webhook မမှတ်ပါ။ (Local replay mode)")
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        await application.stop()
+        await post_stop(application)
+        await application.shutdown()
+        await post_shutdown(application)
+
+def main():
+    print("🤖 Game Bot (character.py) စတင်နေပါသည်...")
+
+    if BOT_MODE == "sharded":
+        # Group တွေကို Worker Process အများကြီးကြား ခွဲ run ပါ (sharding.py)
+        import sharding
+        sharding.run_sharded(
+            int(os.environ.get("SHARD_WORKERS", "4")),
+            ingress=os.environ.get("SHARD_INGRESS", "polling")
+        )
+    elif BOT_MODE == "webhook":
+        application = build_application(with_updater=False)
+        print(f"🚀 Game Bot အဆင်သင့်ဖြစ်ပါပြီ။ (Webhook Mode, concurrent updates: {CONCURRENT_UPDATES})")
+        asyncio.run(run_webhook(application))
+    else:
+        application = build_application()
+        print(f"🚀 Game Bot အဆင်သင့်ဖြစ်ပါပြီ။ (Message Count Mode, concurrent updates: {CONCURRENT_UPDATES})")
+        application.run_polling()
 
 if __name__ == "__main__":
     main()
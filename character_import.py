@@ -0,0 +1,128 @@
+# character_import.py
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+
+# CSV/JSON ထဲက column နာမည် တွေ (ကြိုက်တဲ့ နာမည်နဲ့ ရေးလို့ရအောင်)
+FIELD_ALIASES = {
+    "name": "name",
+    "image_url": "image_url",
+    "image": "image_url",
+    "url": "image_url",
+    "rarity": "rarity",
+    "anime": "anime",
+    "anime_series": "anime",
+    "series": "anime",
+    "emoji": "emoji",
+}
+REQUIRED_FIELDS = ("name", "image_url", "rarity", "anime")
+
+
+class ImportFormatError(Exception):
+    """File တစ်ခုလုံး ဖတ်လို့ မရတဲ့ Error (Row တစ်ခုချင်းစီ Error မဟုတ်)"""
+
+
+def _normalize_row(raw):
+    """Column နာမည်တွေကို ညှိပြီး တန်ဖိုးတွေကို strip လုပ်ပါ။"""
+    row = {}
+    for key, value in (raw or {}).items():
+        field = FIELD_ALIASES.get(str(key or "").strip().lower())
+        if field and value is not None:
+            row[field] = str(value).strip()
+    return row
+
+
+def validate_row(raw):
+    """(row, None) ဒါမှမဟုတ် (None, error_message) ကို ပြန်ပေးပါ။"""
+    if isinstance(raw, str):
+        return None, raw # (iter_rows က ပေးထားတဲ့ parse error)
+    if not isinstance(raw, dict):
+        return None, "Row က object/column ပုံစံ မဟုတ်ပါ"
+    row = _normalize_row(raw)
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        return None, f"{', '.join(missing)} မပါပါ"
+    if not row["image_url"].lower().startswith(("http://", "https://")):
+        return None, f"image_url မမှန်ပါ: {row['image_url'][:60]}"
+    row.setdefault("emoji", "")
+    return row, None
+
+
+def iter_rows(data, filename=""):
+    """
+    File (bytes) ထဲက Row တွေကို တစ်ခုချင်း ထုတ်ပေးပါ။ (row_number, raw_row)
+    - .csv          : Header ပါတဲ့ CSV
+    - .jsonl/.ndjson: Line တစ်ကြောင်း JSON object တစ်ခု
+    - .json         : JSON array (ဒါမှမဟုတ် {"characters": [...]})
+    """
+    name = (filename or "").lower()
+    stream = io.BytesIO(data)
+
+    if name.endswith(".csv"):
+        text = codecs.getreader("utf-8-sig")(stream)
+        reader = csv.DictReader(text)
+        for row_number, raw in enumerate(reader, start=2): # (Line 1 က Header)
+            yield row_number, raw
+        return
+
+    if name.endswith((".jsonl", ".ndjson")):
+        text = codecs.getreader("utf-8-sig")(stream)
+        for row_number, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"JSON မမှန်ပါ: {e.msg}"
+        return
+
+    if name.endswith(".json"):
+        try:
+            payload = json.loads(data.decode("utf-8-sig"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ImportFormatError(f"JSON file ဖတ်မရပါ: {e}")
+        if isinstance(payload, dict):
+            payload = payload.get("characters", [])
+        if not isinstance(payload, list):
+            raise ImportFormatError("JSON file ထဲမှာ Character array မတွေ့ပါ")
+        for row_number, raw in enumerate(payload, start=1):
+            yield row_number, raw
+        return
+
+    raise ImportFormatError("`.csv`, `.json`, `.jsonl` file တွေပဲ လက်ခံပါသည်")
+
+
+async def check_image_urls(rows, workers=8, timeout=10.0):
+    """
+    image_url တွေ ဖွင့်လို့ရမရ Worker အရေအတွက် ကန့်သတ်ပြီး တပြိုင်နက် စစ်ပါ။
+    rows: [(row_number, row), ...]  ->  {row_number: error_message} (မှားတာတွေပဲ)
+    """
+    import httpx # (python-telegram-bot နဲ့ အတူ ပါပြီးသား)
+
+    semaphore = asyncio.Semaphore(workers)
+    errors = {}
+
+    async def check(client, row_number, url):
+        async with semaphore:
+            try:
+                response = await client.head(url)
+                if response.status_code in (405, 403):
+                    # HEAD ကို လက်မခံတဲ့ Host တွေအတွက် GET နဲ့ ပြန်စစ်ပါ
+                    async with client.stream("GET", url) as response:
+                        pass
+                if response.status_code >= 400:
+                    errors[row_number] = f"image_url HTTP {response.status_code}"
+                    return
+                content_type = response.headers.get("content-type", "")
+                if content_type and not content_type.startswith("image/"):
+                    errors[row_number] = f"image_url က ပုံ မဟုတ်ပါ ({content_type})"
+            except Exception as e:
+                errors[row_number] = f"image_url ဖွင့်မရပါ: {type(e).__name__}"
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
+        await asyncio.gather(*(check(client, n, row["image_url"]) for n, row in rows))
+    return errors
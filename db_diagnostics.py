@@ -0,0 +1,38 @@
+# db_diagnostics.py
+# Usage: MONGO_URL=... python db_diagnostics.py
+#        GAME_DB_BACKEND=sqlite SQLITE_PATH=game_bot.db python db_diagnostics.py
+# Query function တစ်ခုချင်းစီ Index သုံးမသုံး စစ်ပါ။ (Collection Scan ဖြစ်နေရင် Exit code 1)
+
+import sys
+
+import game_database as gamedb
+
+
+def main():
+    if not gamedb.store:
+        print("❌ Database နှင့် ချိတ်ဆက်မရပါ။")
+        return 1
+
+    gamedb.ensure_indexes()
+    report = gamedb.explain_queries()
+    if not report:
+        print(f"ℹ️ '{gamedb.store.name}' Backend မှာ Query Planner မရှိပါ။")
+        return 0
+
+    not_indexed = 0
+    for function_name, index_backed, stages in report:
+        status = "✅ INDEX" if index_backed else "❌ COLLSCAN"
+        if not index_backed:
+            not_indexed += 1
+        print(f"{status:12} {function_name:36} {', '.join(stages)}")
+
+    print()
+    if not_indexed:
+        print(f"⚠️ Index မသုံးတဲ့ Query {not_indexed} ခု ရှိပါသည်။")
+        return 1
+    print("✅ Query အားလုံး Index သုံးထားပါသည်။")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
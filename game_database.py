@@ -1,202 +1,563 @@
 # game_database.py
 
-import pymongo
 import os
-from datetime import datetime
-import random
+import threading
+from datetime import datetime, timedelta, timezone
 
-# --- MongoDB Connection ---
-try:
-    MONGO_URL = os.environ.get("MONGO_URL")
-    if not MONGO_URL:
-        print("Error: MONGO_URL environment variable မတွေ့ပါ။")
-        exit()
-        
-    client = pymongo.MongoClient(MONGO_URL)
-    db = client["game_bot_db"] # DB အသစ် သီးသန့် သုံးပါ
-    
-    characters_collection = db["characters"] # Character အားလုံး (Admin ထည့်ရန်)
-    user_harems_collection = db["user_harems"]   # User တွေ ဖမ်းမိထားတာ
-    group_spawns_collection = db["group_spawns"] # Group မှာ ဘာပေါ်နေလဲ
-    active_groups_collection = db["active_groups"] # Bot ရှိနေတဲ့ Group list
+from spawn_cache import SpawnCache, MISS
+from spawn_sampler import SpawnSampler, RARITY_WEIGHTS, parse_rarity_weights
+from storage_base import character_fields, harem_record, leaderboard_scope
+from catalog import CatalogSnapshot, EMPTY_CATALOG, record_to_object, normalize_name
+import backup
+
+# --- Active Spawn Cache (Message တိုင်းမှာ DB မခေါ်ရအောင်) ---
+SPAWN_CACHE_SIZE = int(os.environ.get("SPAWN_CACHE_SIZE", "20000"))
+SPAWN_CACHE_TTL = float(os.environ.get("SPAWN_CACHE_TTL", "60"))
+spawn_cache = SpawnCache(max_size=SPAWN_CACHE_SIZE, ttl=SPAWN_CACHE_TTL)
+
+# --- Spawn Expiry (ဘယ်သူမှ မဖမ်းရင် SPAWN_EXPIRE_SECONDS ကြာရင် ထွက်ပြေးပါ - 0 ဆိုရင် မပြေးပါ) ---
+# Bot က expire_due_spawns နဲ့ ဖျက်ပါ။ Bot ပိတ်ထားတုန်း / Group ပျောက်သွားတဲ့ Spawn တွေကို
+# Mongo TTL Index က SPAWN_TTL_GRACE_SECONDS ထပ်စောင့်ပြီး ဖျက်ပါ။ (spawned_at က UTC)
+SPAWN_EXPIRE_SECONDS = float(os.environ.get("SPAWN_EXPIRE_SECONDS", "300"))
+SPAWN_TTL_GRACE_SECONDS = float(os.environ.get("SPAWN_TTL_GRACE_SECONDS", "3600"))
+SPAWN_EXPIRY_BATCH = 200
+
+# --- Leaderboard Top-K Cache (/top ကို ခဏခဏ ခေါ်လည်း DB မခေါ်ရအောင်) ---
+LEADERBOARD_SIZE = 10
+LEADERBOARD_CACHE_SECONDS = float(os.environ.get("LEADERBOARD_CACHE_SECONDS", "30"))
+leaderboard_cache = SpawnCache(max_size=1000, ttl=LEADERBOARD_CACHE_SECONDS) # (scope, limit) -> rows
+
+# --- Spawn Sampler (Catalog တစ်ခုလုံး မဆွဲဘဲ Rarity အလိုက် ရွေးရန်) ---
+SPAWN_NO_REPEAT_WINDOW = int(os.environ.get("SPAWN_NO_REPEAT_WINDOW", "0"))
+spawn_sampler = SpawnSampler(
+    weights={**RARITY_WEIGHTS, **parse_rarity_weights(os.environ.get("RARITY_WEIGHTS"))},
+    refresh_seconds=float("inf"), # (Catalog Snapshot version ပြောင်းမှ ပြန်ဆောက်ပါ)
+    no_repeat_window=SPAWN_NO_REPEAT_WINDOW
+)
+_sampler_lock = threading.Lock()
+
+# --- Catalog Snapshot (Character Catalog ကို Memory ထဲမှာ ထားပြီး DB မခေါ်ဘဲ ဖတ်ရန်) ---
+# add_character / import / wipe (ဒါမှမဟုတ် တခြား Process ကနေ Change Stream) က _catalog_version ကို တိုးပြီး
+# နောက်တစ်ခါ ဖတ်တဲ့အခါ Snapshot အသစ် ဆောက်ပါ။ Change Stream မရရင် CATALOG_REFRESH_SECONDS တိုင်း ပြန်ဆွဲပါ။
+CATALOG_REFRESH_SECONDS = float(os.environ.get("CATALOG_REFRESH_SECONDS", os.environ.get("SAMPLER_REFRESH_SECONDS", "300")))
+_catalog_version = 0 # Catalog ပြောင်းတိုင်း တိုးပါ
+_catalog = EMPTY_CATALOG
+_catalog_loaded_version = None
+_catalog_loads = 0
+_catalog_lock = threading.Lock()
+_file_id_overrides = {} # char_id -> file_id (Snapshot ဆောက်ပြီးမှ ပြောင်းတဲ့ file_id - None ဆိုရင် ဖျက်ထား)
+
+# --- Storage Backend (mongo / sqlite / memory) ---
+# GAME_DB_BACKEND=mongo  : MONGO_URL + GAME_DB_NAME (Default)
+# GAME_DB_BACKEND=sqlite : SQLITE_PATH (File တစ်ခုတည်း - DB Server မလို)
+# GAME_DB_BACKEND=memory : Process ထဲမှာပဲ (Test / Benchmark - Restart ရင် ပျောက်ပါမည်)
+GAME_DB_BACKEND = os.environ.get("GAME_DB_BACKEND", "mongo").lower()
 
-    print("✅ Game Bot Database နှင့် အောင်မြင်စွာ ချိတ်ဆက်ပြီးပါပြီ။")
+def open_storage(backend=None):
+    """Config အတိုင်း Storage Backend ကို ဖွင့်ပါ။ (Backend module ကို လိုမှ import လုပ်ပါ)"""
+    backend = (backend or GAME_DB_BACKEND).lower()
+    if backend == "memory":
+        from storage_memory import MemoryStorage
+        return MemoryStorage()
+    if backend == "sqlite":
+        from storage_sqlite import SQLiteStorage
+        return SQLiteStorage(os.environ.get("SQLITE_PATH", "game_bot.db"))
+    if backend == "mongo":
+        from storage_mongo import MongoStorage
+        return MongoStorage(
+            os.environ["MONGO_URL"], os.environ.get("GAME_DB_NAME", "game_bot_db"), # DB အသစ် သီးသန့် သုံးပါ
+            spawn_ttl_seconds=SPAWN_EXPIRE_SECONDS + SPAWN_TTL_GRACE_SECONDS if SPAWN_EXPIRE_SECONDS > 0 else None
+        )
+    raise ValueError(f"Unknown GAME_DB_BACKEND: {backend}")
+
+if GAME_DB_BACKEND == "mongo" and not os.environ.get("MONGO_URL"):
+    print("Error: MONGO_URL environment variable မတွေ့ပါ။ (GAME_DB_BACKEND=sqlite / memory ကိုလည်း သုံးနိုင်ပါသည်)")
+    exit()
+
+try:
+    store = open_storage()
+    print(f"✅ Game Bot Database ({store.name}) နှင့် အောင်မြင်စွာ ချိတ်ဆက်ပြီးပါပြီ။")
 except Exception as e:
     print(f"❌ Game Bot Database ချိတ်ဆက်ရာတွင် Error ဖြစ်နေပါသည်: {e}")
-    client = None
+    store = None
+
+def ensure_indexes():
+    """လိုအပ်တဲ့ Index တွေကို ဆောက်ပါ။ (ရှိပြီးသားဆိုရင် ဘာမှမဖြစ်ပါ - idempotent)"""
+    if not store: return
+    store.ensure_indexes()
+
+if store:
+    ensure_indexes()
 
 # --- Group Management ---
 
 def add_group(chat_id, group_name):
     """Bot ဝင်ထားသော Group ID ကို DB ထဲ မှတ်ထားပါ။"""
-    if not client: return
-    active_groups_collection.update_one(
-        {"_id": chat_id},
-        {"$set": {"name": group_name, "joined_at": datetime.now().isoformat()}},
-        upsert=True
-    )
+    if not store: return
+    store.add_group(chat_id, group_name, datetime.now(timezone.utc).isoformat())
 
 def set_group_last_catcher(group_id, user_name):
     """Group မှာ နောက်ဆုံးဖမ်းသွားတဲ့သူကို မှတ်ထားပါ (Already Caught အတွက်)"""
-    if not client: return
-    active_groups_collection.update_one(
-        {"_id": group_id},
-        {"$set": {"last_caught_by": user_name}}
-    )
+    if not store: return
+    store.set_group_last_catcher(group_id, user_name)
 
 def get_group_last_catcher(group_id):
     """Group မှာ နောက်ဆုံးဖမ်းသွားတဲ့သူကို ပြန်ယူပါ"""
-    if not client: return None
-    doc = active_groups_collection.find_one({"_id": group_id})
-    return doc.get("last_caught_by") if doc else None
+    if not store: return None
+    return store.get_group_last_catcher(group_id)
 
 def remove_group(chat_id):
-    """Bot ထွက်သွားသော Group ID ကို DB မှ ဖျက်ပါ။"""
-    if not client: return
-    active_groups_collection.delete_one({"_id": chat_id})
+    """Bot ထွက်သွားသော Group ID ကို DB မှ ဖျက်ပါ။ (Active Spawn ပါ)"""
+    if not store: return
+    store.remove_group(chat_id)
+    spawn_cache.invalidate(chat_id)
 
 def get_all_groups():
     """Bot ဝင်ထားသော Group ID များအားလုံးကို ယူပါ။"""
-    if not client: return []
-    return [doc["_id"] for doc in active_groups_collection.find({}, {"_id": 1})]
+    if not store: return []
+    return store.get_all_groups()
 
-def set_group_last_catcher(group_id, user_name):
-    """Group မှာ နောက်ဆုံးဖမ်းသွားတဲ့သူကို မှတ်ထားပါ (Already Caught အတွက်)"""
-    if not client: return
-    active_groups_collection.update_one(
-        {"_id": group_id},
-        {"$set": {"last_caught_by": user_name}}
-    )
+BROADCAST_PAGE_SIZE = 500
 
-def get_group_last_catcher(group_id):
-    """Group မှာ နောက်ဆုံးဖမ်းသွားတဲ့သူကို ပြန်ယူပါ"""
-    if not client: return None
-    doc = active_groups_collection.find_one({"_id": group_id})
-    return doc.get("last_caught_by") if doc else None
+def get_group_ids_page(after=None, limit=BROADCAST_PAGE_SIZE):
+    """
+    Group ID တွေကို after ရဲ့ နောက်ကနေ limit ခုစီ ယူပါ။ (List တစ်ခုလုံး Memory ထဲ မထည့်ရအောင်)
+    ဗလာ List ရရင် ကုန်ပါပြီ။ နောက် Page အတွက် နောက်ဆုံး ID ကို after အဖြစ် ပေးပါ။
+    """
+    if not store: return []
+    return store.get_group_ids_page(after, limit)
+
+# --- Group Message Counters ---
+
+def load_group_counter(chat_id):
+    """Group ရဲ့ သိမ်းထားတဲ့ Message Count ကို ယူပါ။ (မရှိရင် None)"""
+    if not store: return None
+    return store.load_group_counter(chat_id)
+
+def save_group_counters(rows):
+    """
+    {chat_id: (count, last_user_id, streak)} ကို တစ်ခါတည်းနဲ့ ရေးပါ။
+    ရေးလိုက်တဲ့ အရေအတွက်ကို ပြန်ပေးပါ။
+    """
+    if not store or not rows: return 0
+    return store.save_group_counters(rows)
 
 # --- Character Management (Admin) ---
 
+def _bump_catalog_version():
+    """Catalog ပြောင်းသွားကြောင်း မှတ်ပါ။ (နောက်တစ်ခါ ဖတ်ရင် Snapshot အသစ် ဆောက်ပါ)"""
+    global _catalog_version
+    _catalog_version += 1
+
+def get_catalog():
+    """
+    လက်ရှိ Catalog Snapshot ကို ပြန်ပေးပါ။ (Catalog ပြောင်းထားရင် ဒါမှမဟုတ် အချိန်ကျော်ရင် ပြန်ဆောက်ပါ)
+    Snapshot ကို ဘယ်တော့မှ မပြင်ပါ - Reference အသစ်နဲ့ပဲ လဲပါ။
+    """
+    global _catalog, _catalog_loaded_version, _catalog_loads
+    if not store: return EMPTY_CATALOG
+    if catalog_is_fresh():
+        return _catalog
+    version = _catalog_version
+    with _catalog_lock:
+        if _catalog_loaded_version == version and _catalog.age() < CATALOG_REFRESH_SECONDS:
+            return _catalog
+        overrides_before = dict(_file_id_overrides)
+        _catalog_loads += 1
+        snapshot = CatalogSnapshot(store.iter_characters(), version=_catalog_loads)
+        # Snapshot ထဲမှာ ပါသွားပြီးသား file_id တွေကို ဖယ်ပါ (ဆွဲနေတုန်း ပြောင်းသွားတာတွေ ချန်ထားပါ)
+        for char_id, file_id in overrides_before.items():
+            if _file_id_overrides.get(char_id, MISS) == file_id:
+                _file_id_overrides.pop(char_id, None)
+        _catalog = snapshot
+        _catalog_loaded_version = version
+        return snapshot
+
+def catalog_is_fresh():
+    """Snapshot ကို DB မခေါ်ဘဲ ချက်ချင်း သုံးလို့ရလား (Event loop ကနေ တိုက်ရိုက် ဖတ်ရန်)"""
+    return _catalog_loaded_version == _catalog_version and _catalog.age() < CATALOG_REFRESH_SECONDS
+
+def _character_object(record):
+    return record_to_object(record, _file_id_overrides.get(record.id, record.file_id) or "")
+
 def add_character(name, image_url, rarity, anime, emoji):
     """Character အသစ် (Admin က) ထည့်ရန် (Emoji/Anime ပါ)"""
-    if not client: return
-    characters_collection.update_one(
-        {"name_lower": name.lower()},
-        {"$set": {
-            "name": name,
-            "name_lower": name.lower(),
-            "image_url": image_url,
-            "rarity": rarity,
-            "anime": anime, 
-            "emoji": emoji
-        }},
-        upsert=True
-    )
+    if not store: return
+    fields = character_fields({"name": name, "image_url": image_url, "rarity": rarity, "anime": anime, "emoji": emoji})
+    changed = _image_changed_ids([fields])
+    char_id = store.add_character(fields)
+    _drop_file_id_overrides(changed)
+    _bump_catalog_version()
+    return char_id
+
+def _image_changed_ids(rows):
+    """
+    Upsert မလုပ်ခင် လက်ရှိ Snapshot နဲ့ တိုက်ပြီး image_url ပြောင်းမယ့် (ရှိပြီးသား) Character _id များ
+    (Import Chunk တိုင်း Snapshot ပြန်မဆောက်ရအောင် get_catalog() မခေါ်ပါ - Override ရှိတဲ့ Character က Snapshot ထဲမှာ ရှိပြီးသား)
+    """
+    catalog = _catalog
+    changed = []
+    for fields in rows:
+        char_id = catalog.by_name_lower.get(fields["name_lower"])
+        if char_id is not None and catalog.by_id[char_id].image_url != fields["image_url"]:
+            changed.append(char_id)
+    return changed
+
+def _drop_file_id_overrides(char_ids):
+    """Storage က file_id ဖျက်လိုက်တဲ့ Character တွေရဲ့ Override ကို ဖယ်ပြီး Snapshot အသစ်ကနေ ယူပါ။"""
+    for char_id in char_ids:
+        _file_id_overrides[char_id] = None
+
+IMPORT_CHUNK_SIZE = 500
+
+def bulk_upsert_characters(rows):
+    """
+    Character အများကြီးကို name_lower နဲ့ Upsert လုပ်ပါ။ (/importchars အတွက်)
+    rows: [{"name", "image_url", "rarity", "anime", "emoji"}, ...] (Chunk တစ်ခု)
+    (inserted, updated) ကို ပြန်ပေးပါ။
+    """
+    if not store or not rows: return 0, 0
+    rows = [character_fields(row) for row in rows]
+    changed = _image_changed_ids(rows)
+    result = store.bulk_upsert_characters(rows)
+    _drop_file_id_overrides(changed) # (ပုံ ပြောင်းတဲ့ Character တွေပဲ - ကျန်တာ file_id Cache မပျောက်ပါ)
+    _bump_catalog_version()
+    return result
+
+# --- Telegram file_id Cache (ပုံကို URL ကနေ ထပ်ခါထပ်ခါ မဆွဲရအောင်) ---
+
+def set_character_file_id(char_id, file_id):
+    """ပထမဆုံး ပို့ပြီးရင် Telegram ပေးတဲ့ file_id ကို Character ပေါ်မှာ မှတ်ပါ။"""
+    if not store: return
+    store.set_character_file_id(char_id, file_id)
+    _file_id_overrides[char_id] = file_id # (Snapshot တစ်ခုလုံး ပြန်မဆောက်ပါ)
 
-def get_random_character():
-    """DB ထဲက Character (Object) တစ်ခုလုံးကို ကျပန်း ဆွဲထုတ်ပါ။"""
-    if not client: return None
-    all_chars = list(characters_collection.find({}))
-    if not all_chars:
+def clear_character_file_id(char_id):
+    """Telegram က လက်မခံတော့တဲ့ file_id ကို ဖျက်ပါ။"""
+    if not store: return
+    store.clear_character_file_id(char_id)
+    _file_id_overrides[char_id] = None
+
+def get_characters_without_file_id():
+    """file_id မရှိသေးတဲ့ Character တွေ [{_id, name, image_url}, ...] ကို ယူပါ။ (/warmimages အတွက်)"""
+    if not store: return []
+    return store.get_characters_without_file_id()
+
+def _refresh_sampler(catalog):
+    """Catalog Snapshot အသစ် ဖြစ်သွားရင် Rarity Table ကို Snapshot ကနေ ပြန်ဆောက်ပါ။ (DB မခေါ်ပါ)"""
+    if not spawn_sampler.needs_rebuild(catalog.version):
+        return
+    with _sampler_lock:
+        if spawn_sampler.needs_rebuild(catalog.version):
+            spawn_sampler.rebuild(catalog.rarity_rows, catalog.version)
+
+def get_random_character(group_id=None):
+    """Catalog ထဲက Character (Object) တစ်ခုလုံးကို Rarity အလိုက် ကျပန်း ရွေးပါ။"""
+    if not store: return None
+    catalog = get_catalog()
+    _refresh_sampler(catalog)
+    char_id = spawn_sampler.pick(group_id)
+    record = catalog.get(char_id) if char_id is not None else None
+    if record is None:
         return None
-    return random.choice(all_chars)
+    spawn_sampler.remember(group_id, char_id)
+    return _character_object(record)
 
 def get_all_character_names():
-    """(ကိုကို့ /wang command အတွက်) DB ထဲက Character နာမည်တွေ အကုန် ယူပါ။"""
-    if not client: return []
-    try:
-        cursor = characters_collection.find({}, {"name": 1, "_id": 0}).sort("name", 1)
-        names_list = [doc.get("name") for doc in cursor if doc.get("name")]
-        return names_list
-    except Exception as e:
-        print(f"Error getting all character names: {e}")
-        return []
+    """(ကိုကို့ /wang command အတွက်) Catalog ထဲက Character နာမည်တွေ အကုန် (အစဉ်လိုက်) ယူပါ။"""
+    if not store: return []
+    return list(get_catalog().names_sorted)
 
 def get_total_anime_collection_count(anime_name):
     """ဒီ Anime မှာ စုစုပေါင်း Character ဘယ်နှစ်ကောင် ရှိလဲ စစ်ပါ။"""
-    if not client: return 0
-    return characters_collection.count_documents({"anime": anime_name})
+    if not store: return 0
+    return get_catalog().anime_count(anime_name)
+
+# --- Search / Browse (Catalog Snapshot ထဲက Index ကနေပဲ - DB မခေါ်ပါ) ---
+CATALOG_PAGE_SIZE = 15
+
+def _character_page(catalog, char_ids, offset, limit):
+    return len(char_ids), [_character_object(catalog.by_id[char_id]) for char_id in char_ids[offset:offset + limit]]
+
+def search_characters(query, offset=0, limit=CATALOG_PAGE_SIZE):
+    """
+    နာမည် (ဒါမှမဟုတ် နာမည်ထဲက စကားလုံး) က query နဲ့ စတဲ့ Character တွေ (total, [Character Object, ...])
+    (အကြီး/အသေး / Accent / သင်္ကေတ မခွဲပါ)
+    """
+    if not store: return 0, []
+    catalog = get_catalog()
+    return _character_page(catalog, catalog.search(normalize_name(query)), offset, limit)
+
+def browse_characters(anime=None, rarity=None, offset=0, limit=CATALOG_PAGE_SIZE):
+    """
+    Anime / Rarity အလိုက် (ဘာမှမပေးရင် အကုန်) Character တွေကို နာမည်အစဉ်လိုက် (total, [Character Object, ...])
+    """
+    if not store: return 0, []
+    catalog = get_catalog()
+    if anime is None and rarity is None:
+        char_ids = catalog.ids_sorted
+    else:
+        char_ids = catalog.character_ids(anime=anime, rarity=rarity)
+    return _character_page(catalog, char_ids, offset, limit)
 
 # --- Game Logic Functions ---
 
 def set_active_spawn(group_id, character_object):
-    """Group ထဲမှာ ဘယ် character (Object) ပေါ်နေလဲ မှတ်ထားပါ။"""
-    if not client: return
-    if character_object is None:
-        # ဖမ်းမိသွားရင် DB ထဲက ဖျက်ပါ
-        group_spawns_collection.delete_one({"_id": group_id})
-    else:
-        # (ပြင်ဆင်ပြီး) Object တစ်ခုလုံးကို သိမ်းပါ
-        group_spawns_collection.update_one(
-            {"_id": group_id},
-            {"$set": {
-                "active_character": character_object, 
-                "spawned_at": datetime.now()
-            }},
-            upsert=True
-        )
+    """Group ထဲမှာ ဘယ် character (Object) ပေါ်နေလဲ မှတ်ထားပါ။ (None ဆိုရင် ဖျက်ပါ)"""
+    if not store: return
+    store.set_active_spawn(group_id, character_object, datetime.now(timezone.utc))
+    spawn_cache.set(group_id, character_object) # (Write-through)
 
 def get_active_spawn(group_id):
     """Group မှာ ဖမ်းစရာ character (Object) ရှိမရှိ စစ်ပါ။"""
-    if not client: return None
-    spawn_data = group_spawns_collection.find_one({"_id": group_id})
-    return spawn_data.get("active_character") if spawn_data else None # (Object ကို ပြန်ပေး)
+    if not store: return None
+    cached = spawn_cache.get(group_id)
+    if cached is not MISS:
+        return cached
+    character_object = store.get_active_spawn(group_id)
+    spawn_cache.set(group_id, character_object)
+    return character_object
+
+def claim_spawn(group_id, guessed_name):
+    """
+    နာမည်မှန်ရင် Spawn ကို Atomic ဖျက်ပြီး Character (Object) ကို ပြန်ပေးပါ။
+    (တပြိုင်နက် ဖမ်းကြရင် တစ်ယောက်တည်းသာ Object ရပါမည်။ ကျန်သူတွေ None)
+    """
+    if not store: return None
+    character_object = store.claim_spawn(group_id, guessed_name.lower())
+    if not character_object:
+        return None
+    spawn_cache.set(group_id, None)
+    return character_object
+
+def expire_due_spawns(limit=SPAWN_EXPIRY_BATCH):
+    """
+    SPAWN_EXPIRE_SECONDS ကျော်နေတဲ့ Spawn တွေကို တစ်ခါတည်း ဖျက်ပြီး Cache ကိုပါ ပြင်ပါ။ (Group တွေ Count ပြန်စရအောင်)
+    [(group_id, character_object), ...] ပြန်ပေးပါ။ (အဖြေ ပြဖို့)
+    """
+    if not store or SPAWN_EXPIRE_SECONDS <= 0: return []
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=SPAWN_EXPIRE_SECONDS)
+    expired = store.expire_spawns(cutoff, limit)
+    for group_id, _ in expired:
+        spawn_cache.set(group_id, None)
+    return expired
+
+def _on_file_id_change(char_id, file_id):
+    _file_id_overrides[char_id] = file_id
+
+def watch_changes(stop_event=None):
+    """
+    တခြား Process (Bot replica / Shard) က Spawn / Catalog ကို ပြင်ရင် Cache နဲ့ Snapshot ကို ပြင်ပါ။ (Mongo Change Stream)
+    Change Stream မရတဲ့ Backend (Replica Set မဟုတ်တဲ့ Mongo / sqlite / memory) မှာ TTL ကိုပဲ အားကိုးပါမည်။
+    """
+    if not store: return
+    try:
+        store.watch_changes(
+            spawn_cache.invalidate, spawn_cache.clear, _bump_catalog_version, _on_file_id_change, stop_event
+        )
+    except Exception as e:
+        print(
+            f"Change stream မရပါ (Spawn cache TTL {SPAWN_CACHE_TTL}s / "
+            f"Catalog refresh {CATALOG_REFRESH_SECONDS}s ကိုပဲ သုံးပါမည်): {e}"
+        )
+
+def start_change_watcher():
+    """Change Stream ကို Background Thread ထဲမှာ run ပါ။"""
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=watch_changes, args=(stop_event,),
+        name="gamedb-change-watcher", daemon=True
+    )
+    thread.start()
+    return stop_event
 
-def catch_character(user_id, user_name, character_object):
+def catch_character(user_id, user_name, character_object, group_id=None):
     """User က Character (Object) ကို ဖမ်းမိကြောင်း DB ထဲ မှတ်ပါ။"""
-    if not client: return
+    if not store: return
     if not character_object:
         return 
-        
-    catch_record = {
-        "user_id": user_id,
-        "user_name": user_name,
-        "character_name": character_object.get("name"),
-        "character_image": character_object.get("image_url"),
-        "character_rarity": character_object.get("rarity"),
-        "character_anime": character_object.get("anime"), # (အသစ်)
-        "character_emoji": character_object.get("emoji"), # (အသစ်)
-        "caught_at": datetime.now().isoformat()
-    }
-    user_harems_collection.insert_one(catch_record)
+    if group_id is not None:
+        # ဖမ်းမိသွားပြီမို့ ဒီ Group မှာ Spawn မရှိတော့ပါ
+        spawn_cache.set(group_id, None)
+    store.insert_catch(harem_record(user_id, user_name, character_object, datetime.now(timezone.utc), group_id))
+
+def insert_harem_records(records):
+    """Harem Document (user_id, user_name, character_id, count, caught_at, first_caught_at) အများကြီးကို တစ်ခါတည်း ထည့်ပါ။ (Seed / Restore - ပြီးရင် rebuild_collection_counters ခေါ်ပါ)"""
+    if not store or not records: return 0
+    return store.insert_harem_records(records)
+
+def _join_harem(docs):
+    """Harem Document တွေကို Catalog Snapshot နဲ့ Join ပါ။ (Legacy Document တွေက ကူးထားတဲ့ Field ကို သုံးပါ)"""
+    catalog = get_catalog()
+    for doc in docs:
+        if doc.get("character_id") is not None:
+            doc.update(catalog.harem_fields(doc["character_id"]))
+        if doc.get("count") is None:
+            doc["count"] = 1
+    return docs
 
 def get_user_harem(user_id):
     """User ဖမ်းမိထားတဲ့ Character list ကို ယူပါ။"""
-    if not client: return []
-    return list(user_harems_collection.find({"user_id": user_id}).sort("caught_at", -1))
-    
+    if not store: return []
+    return _join_harem(store.get_user_harem(user_id))
+
+HAREM_PAGE_SIZE = 20
+
+def get_user_harem_page(user_id, after=None, anime=None, rarity=None, limit=HAREM_PAGE_SIZE):
+    """
+    User ရဲ့ Harem ကို တစ်မျက်နှာစာ (limit) ပဲ ယူပါ။ (Keyset Pagination - caught_at နဲ့ _id)
+    after: ယခင် page ရဲ့ နောက်ဆုံး (caught_at, _id) - ဒီနောက်က စ ယူပါ။
+    anime / rarity Filter ကို Catalog ကနေ Character _id တွေအဖြစ် ပြောင်းပြီး ရှာပါ။
+    (docs, next_cursor) ကို ပြန်ပေးပါ။ နောက်ထပ် မရှိရင် next_cursor က None။
+    """
+    if not store: return [], None
+    character_ids = None
+    if anime is not None or rarity is not None:
+        character_ids = get_catalog().character_ids(anime, rarity)
+        if not character_ids:
+            return [], None
+    docs, next_cursor = store.get_user_harem_page(user_id, after, character_ids, limit)
+    return _join_harem(docs), next_cursor
+
+# --- Collection Counters ---
+
+def get_anime_collection_progress(user_id, anime_name):
+    """User ဖမ်းထားတဲ့ (မတူတဲ့) Character အရေအတွက် နဲ့ Anime စုစုပေါင်း ကို Counter ကနေ တစ်ခါတည်း ယူပါ။ (user_count, total)"""
+    if not store: return 0, 0
+    return store.get_anime_collection_progress(user_id, anime_name)
+
+def rebuild_collection_counters():
+    """
+    Counter တွေကို Harem / Characters ကနေ အစကနေ ပြန်တွက်ပါ။ (/rebuildcounters အတွက်)
+    ပြန်တွက်ထားတဲ့ Counter အရေအတွက်ကို ပြန်ပေးပါ။
+    """
+    if not store: return 0
+    return store.rebuild_collection_counters()
+
 def get_user_anime_collection_count(user_id, anime_name):
-    """User က ဒီ Anime ထဲက ဘယ်နှစ်ကောင် ဖမ်းပြီးပြီလဲ စစ်ပါ။"""
-    if not client: return 0
-    return user_harems_collection.count_documents({
-        "user_id": user_id, 
-        "character_anime": anime_name
-    })
+    """User က ဒီ Anime ထဲက (မတူတဲ့) ဘယ်နှစ်ကောင် ဖမ်းပြီးပြီလဲ စစ်ပါ။"""
+    if not store: return 0
+    character_ids = get_catalog().by_anime.get(anime_name, ())
+    if not character_ids:
+        return 0
+    return store.count_user_characters(user_id, character_ids)
+
+# --- Harem Migration (migrate_harems.py) ---
+
+HAREM_MIGRATION_CHUNK_SIZE = 500
+
+def migrate_legacy_harems(after=None, limit=HAREM_MIGRATION_CHUNK_SIZE):
+    """
+    Legacy Harem Document limit ခုကို Compact ပုံစံ ပြောင်းပါ။ (Catalog နဲ့ character_name ကနေ _id ရှာပါ)
+    (last_id, converted, skipped) ပြန်ပေးပါ။ ကျန်တာ မရှိရင် None။
+    """
+    if not store: return None
+    return store.migrate_legacy_harems(get_catalog().by_name_lower, after, limit)
+
+def finish_harem_migration():
+    """Legacy Index တွေ ဖျက်ပြီး Counter / Leaderboard ကို Compact ပုံစံ အတိုင်း ပြန်တွက်ပါ။"""
+    if not store: return
+    store.finish_harem_migration()
+    store.rebuild_collection_counters()
+    rebuild_leaderboards()
+
+def harem_storage_stats():
+    """{"documents", "legacy_documents", "data_bytes", "index_bytes"}"""
+    if not store: return None
+    return store.harem_storage_stats()
+
+# --- Leaderboards ---
+
+def get_leaderboard(group_id=None, rarity=None, limit=LEADERBOARD_SIZE):
+    """
+    Catch အများဆုံး User limit ယောက် [{"user_id", "user_name", "count"}, ...]
+    group_id ပေးရင် အဲ့ Group ထဲမှာ ဖမ်းတာပဲ၊ rarity ပေးရင် အဲ့ Rarity ပဲ၊ ဘာမှမပေးရင် Global။
+    (LEADERBOARD_CACHE_SECONDS အတွင်း Cache ကနေ)
+    """
+    if not store: return []
+    key = (leaderboard_scope(group_id=group_id, rarity=rarity), limit)
+    rows = leaderboard_cache.get(key)
+    if rows is MISS:
+        rows = store.get_leaderboard(key[0], limit)
+        leaderboard_cache.set(key, rows)
+    return rows
+
+def rebuild_leaderboards():
+    """
+    Leaderboard Count တွေကို Harem ကနေ ပြန်တွက်ပါ။ (Reconcile Job / /rebuildcounters အတွက်)
+    ပြန်တွက်ထားတဲ့ Entry အရေအတွက်ကို ပြန်ပေးပါ။
+    """
+    if not store: return 0
+    total = store.rebuild_leaderboards()
+    leaderboard_cache.clear()
+    return total
+
+# --- Diagnostics ---
+
+def explain_queries():
+    """
+    Query function တစ်ခုချင်းစီရဲ့ Query Plan ကို explain လုပ်ပြီး
+    [(function_name, index_backed, stages), ...] ကို ပြန်ပေးပါ။ (Query Planner မရှိတဲ့ Backend မှာ [])
+    """
+    if not store: return []
+    return store.explain_queries()
+
+# --- Backup / Restore (gzip JSONL - backup.py) ---
+BACKUP_DIR = os.environ.get("BACKUP_DIR", "backups")
+BACKUP_BATCH_SIZE = 1000
 
-def wipe_game_data():
+def _clear_caches():
+    """DB ကို တစ်ခုလုံး အစားထိုးပြီးရင် Cache / Snapshot အဟောင်းတွေ မသုံးမိအောင် ရှင်းပါ။"""
+    spawn_cache.clear()
+    leaderboard_cache.clear()
+    _file_id_overrides.clear()
+    _bump_catalog_version()
+
+def export_backup(path=None, progress=None):
+    """
+    DB တစ်ခုလုံးကို Backup File (gzip JSONL) ထဲ Stream လုပ်ပြီး (path, {collection: count}) ပြန်ပေးပါ။
+    path မပေးရင် BACKUP_DIR ထဲမှာ game_backup_<UTC အချိန်>.jsonl.gz
+    """
+    if not store: return None
+    if not path:
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(BACKUP_DIR, f"game_backup_{stamp}.jsonl.gz")
+    counts = backup.write_backup(store, path, BACKUP_BATCH_SIZE, progress=progress)
+    return path, counts
+
+def restore_backup(path, progress=None):
+    """
+    !!! DB ကို ဖျက်ပြီး Backup File ထဲက Data နဲ့ အစားထိုးပါ !!! {collection: count} ပြန်ပေးပါ။
+    (File ပြတ်နေ / Backend မတူရင် မဖျက်ခင် backup.BackupError)
+    """
+    if not store: return None
+    counts = backup.restore_backup(store, path, BACKUP_BATCH_SIZE, progress=progress)
+    _clear_caches()
+    return counts
+
+def wipe_game_data(snapshot=True):
     """
     !!! Game Bot DATA အားလုံးကို ဖျက်ဆီးပါမည် !!! (/cleanmongodb အတွက်)
+    snapshot=True ဆိုရင် မဖျက်ခင် BACKUP_DIR ထဲ Backup အရင်ယူပါ။ (Backup မရရင် မဖျက်ပါ)
     """
-    if not client:
+    if not store:
         return False
     try:
         print("\n" + "="*30)
         print("WARNING: GAME BOT DB WIPE INITIATED...")
         print("="*30 + "\n")
-        
-        collections_to_wipe = [
-            characters_collection,
-            user_harems_collection,
-            group_spawns_collection,
-            active_groups_collection
-        ]
-        
-        for collection in collections_to_wipe:
-            collection_name = collection.name
-            count = collection.count_documents({})
-            collection.delete_many({})
+
+        if snapshot:
+            path, counts = export_backup()
+            print(f"SNAPSHOT: {path} ({sum(counts.values())} documents)")
+
+        wiped = store.wipe()
+        for collection_name, count in wiped:
             print(f"WIPED: {collection_name} (Deleted {count} documents)")
             
-        print("\n✅ Game Bot collections (4) ခုလုံး ရှင်းလင်းပြီးပါပြီ။")
+        _clear_caches()
+        print(f"\n✅ Game Bot collections ({len(wiped)}) ခုလုံး ရှင်းလင်းပြီးပါပြီ။")
         return True
     
     except Exception as e:
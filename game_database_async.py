@@ -0,0 +1,154 @@
+# game_database_async.py
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import game_database as _db
+import metrics
+
+# --- Executor (pymongo က sync ဖြစ်လို့ Thread Pool ထဲမှာ run ပါ) ---
+# Event loop ကို မပိတ်ဆို့အောင် DB call တိုင်းကို ဒီ pool ထဲ ပို့ပါ။
+# Worker အရေအတွက်ကို ကန့်သတ်ထားလို့ Mongo နှေးနေချိန်မှာ thread တွေ အကန့်အသတ်မဲ့ မများလာပါ။
+DB_MAX_WORKERS = int(os.environ.get("DB_MAX_WORKERS", "16"))
+
+IMPORT_CHUNK_SIZE = _db.IMPORT_CHUNK_SIZE
+BROADCAST_PAGE_SIZE = _db.BROADCAST_PAGE_SIZE
+BACKUP_DIR = _db.BACKUP_DIR
+CATALOG_PAGE_SIZE = _db.CATALOG_PAGE_SIZE
+SPAWN_EXPIRE_SECONDS = _db.SPAWN_EXPIRE_SECONDS
+SPAWN_EXPIRY_BATCH = _db.SPAWN_EXPIRY_BATCH
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="gamedb")
+
+
+def _make_async(func):
+    """
+    Sync DB function ကို awaitable အဖြစ် ပြောင်းပါ။
+    Function တစ်ခုချင်းစီရဲ့ ခေါ်တဲ့အကြိမ်ရေ/ကြာချိန် (Thread ထဲမှာ) နဲ့ Pool ထဲ စောင့်ရတဲ့အချိန်ကိုပါ မှတ်ပါ။
+    """
+    timed = metrics.timed_db(func)
+
+    def run(queued_at, args, kwargs):
+        metrics.observe("gamedb_executor_wait_seconds", time.perf_counter() - queued_at)
+        return timed(*args, **kwargs)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, run, time.perf_counter(), args, kwargs)
+    return wrapper
+
+
+metrics.describe("gamedb_call_seconds", "game_database function call latency (executor thread)")
+metrics.describe("gamedb_executor_wait_seconds", "Time a DB call waited for a free executor thread")
+metrics.register_gauge(
+    "gamedb_executor_queue", lambda: _executor._work_queue.qsize(),
+    "DB calls waiting for a free executor thread"
+)
+
+
+def shutdown():
+    """Bot ပိတ်ချိန်မှာ Executor ကို ရှင်းပါ။"""
+    _executor.shutdown(wait=True)
+
+
+# --- Group Management ---
+add_group = _make_async(_db.add_group)
+set_group_last_catcher = _make_async(_db.set_group_last_catcher)
+get_group_last_catcher = _make_async(_db.get_group_last_catcher)
+remove_group = _make_async(_db.remove_group)
+get_all_groups = _make_async(_db.get_all_groups)
+get_group_ids_page = _make_async(_db.get_group_ids_page)
+load_group_counter = _make_async(_db.load_group_counter)
+save_group_counters = _make_async(_db.save_group_counters)
+
+# --- Character Management (Admin) ---
+add_character = _make_async(_db.add_character)
+bulk_upsert_characters = _make_async(_db.bulk_upsert_characters)
+load_catalog = _make_async(_db.get_catalog)
+_get_random_character = _make_async(_db.get_random_character)
+_get_all_character_names = _make_async(_db.get_all_character_names)
+_get_total_anime_collection_count = _make_async(_db.get_total_anime_collection_count)
+_search_characters = _make_async(_db.search_characters)
+_browse_characters = _make_async(_db.browse_characters)
+
+# Catalog Snapshot က Fresh ဖြစ်နေရင် Memory ထဲကပဲ ဖတ်လို့ Thread Pool ကို မသွားပါ
+
+async def get_catalog():
+    if _db.catalog_is_fresh():
+        return _db.get_catalog()
+    return await load_catalog()
+
+async def get_random_character(group_id=None):
+    if _db.catalog_is_fresh():
+        return _db.get_random_character(group_id)
+    return await _get_random_character(group_id)
+
+async def get_all_character_names():
+    if _db.catalog_is_fresh():
+        return _db.get_all_character_names()
+    return await _get_all_character_names()
+
+async def get_total_anime_collection_count(anime_name):
+    if _db.catalog_is_fresh():
+        return _db.get_total_anime_collection_count(anime_name)
+    return await _get_total_anime_collection_count(anime_name)
+
+async def search_characters(query, offset=0, limit=CATALOG_PAGE_SIZE):
+    if _db.catalog_is_fresh():
+        return _db.search_characters(query, offset, limit)
+    return await _search_characters(query, offset, limit)
+
+async def browse_characters(anime=None, rarity=None, offset=0, limit=CATALOG_PAGE_SIZE):
+    if _db.catalog_is_fresh():
+        return _db.browse_characters(anime, rarity, offset, limit)
+    return await _browse_characters(anime, rarity, offset, limit)
+
+set_character_file_id = _make_async(_db.set_character_file_id)
+clear_character_file_id = _make_async(_db.clear_character_file_id)
+get_characters_without_file_id = _make_async(_db.get_characters_without_file_id)
+
+# --- Game Logic Functions ---
+set_active_spawn = _make_async(_db.set_active_spawn)
+_get_active_spawn = _make_async(_db.get_active_spawn)
+start_change_watcher = _db.start_change_watcher
+spawn_cache = _db.spawn_cache
+
+async def get_active_spawn(group_id):
+    """Cache ထဲမှာ ရှိရင် Thread Pool ကို မသွားဘဲ ချက်ချင်း ပြန်ပေးပါ။"""
+    cached = _db.spawn_cache.get(group_id)
+    if cached is not _db.MISS:
+        metrics.inc("spawn_cache_lookups_total", label_key="result", label_value="hit")
+        return cached
+    metrics.inc("spawn_cache_lookups_total", label_key="result", label_value="miss")
+    return await _get_active_spawn(group_id)
+
+catch_character = _make_async(_db.catch_character)
+claim_spawn = _make_async(_db.claim_spawn)
+expire_due_spawns = _make_async(_db.expire_due_spawns)
+
+async def claim_and_record_catch(group_id, user_id, user_name, guessed_name):
+    """
+    Spawn ကို Atomic ယူပြီး (နိုင်ရင်) Harem ထည့်ခြင်း နဲ့ နောက်ဆုံးဖမ်းသူ မှတ်ခြင်းကို တပြိုင်နက် ရေးပါ။
+    နိုင်ရင် Character (Object)၊ ရှုံးရင် (ဒါမှမဟုတ် နာမည်မှားရင်) None။
+    """
+    character_object = await claim_spawn(group_id, guessed_name)
+    if not character_object:
+        return None
+    await asyncio.gather(
+        catch_character(user_id, user_name, character_object, group_id=group_id),
+        set_group_last_catcher(group_id, user_name)
+    )
+    return character_object
+get_user_harem = _make_async(_db.get_user_harem)
+get_user_harem_page = _make_async(_db.get_user_harem_page)
+get_user_anime_collection_count = _make_async(_db.get_user_anime_collection_count)
+get_anime_collection_progress = _make_async(_db.get_anime_collection_progress)
+rebuild_collection_counters = _make_async(_db.rebuild_collection_counters)
+get_leaderboard = _make_async(_db.get_leaderboard)
+rebuild_leaderboards = _make_async(_db.rebuild_leaderboards)
+wipe_game_data = _make_async(_db.wipe_game_data)
+export_backup = _make_async(_db.export_backup)
@@ -0,0 +1,127 @@
+# message_counter.py
+
+from collections import OrderedDict
+
+# Entry index များ (list တစ်ခုထဲမှာ သိမ်းထားပါ - dict ထက် Memory သက်သာ)
+COUNT, LAST_USER, STREAK = 0, 1, 2
+
+
+class MessageCounterStore:
+    """
+    Group တစ်ခုချင်းစီရဲ့ Message Count နဲ့ Anti-Spam (တစ်ယောက်တည်း ဆက်တိုက်ရိုက်တာ) ကို မှတ်ပါ။
+    - max_chats ပြည့်ရင် အကြာဆုံး idle ဖြစ်နေတဲ့ Group ကို Memory ကနေ ဖယ်ပါ။ (LRU)
+    - ပြောင်းသွားတဲ့ (dirty) Group တွေကို take_dirty() နဲ့ ယူပြီး DB ထဲ batch နဲ့ ရေးပါ။
+    - Memory ထဲ မရှိတဲ့ Group ကို load() နဲ့ DB ကနေ ပြန်ဖြည့်ပါ။ (Restart ပြီးရင်တောင် Count မပျောက်)
+    - Spawn ပုံ Send Queue ထဲ စောင့်နေတုန်း (Active Spawn မမှတ်ရသေး) ထပ် မ Spawn အောင် spawn_pending နဲ့ မှတ်ပါ။
+    """
+
+    def __init__(self, max_chats=50000, anti_spam_limit=5):
+        self.max_chats = max_chats
+        self.anti_spam_limit = anti_spam_limit
+        self._entries = OrderedDict()  # chat_id -> [count, last_user_id, streak]
+        self._dirty = set()
+        self._pending = {}  # Flush မလုပ်ရသေးခင် Memory ကနေ ဖယ်လိုက်ရတဲ့ entry များ
+        self._spawn_pending = set()  # Spawn ပုံ ပို့နေဆဲ Group များ (Memory ထဲမှာပဲ)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_loaded(self, chat_id):
+        return chat_id in self._entries
+
+    def load(self, chat_id, doc):
+        """DB ကနေ ယူထားတဲ့ doc (မရှိရင် None) နဲ့ Group entry ကို ဖြည့်ပါ။"""
+        if chat_id in self._entries:
+            return
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            entry = list(pending)
+        elif doc:
+            entry = [doc.get("count", 0), doc.get("last_user_id"), doc.get("streak", 0)]
+        else:
+            entry = [0, None, 0]
+        self._entries[chat_id] = entry
+        self._evict()
+
+    def register_message(self, chat_id, user_id, spawn_count):
+        """
+        Message တစ်ခုကို ရေတွက်ပါ။ (counted, should_spawn) ကို ပြန်ပေးပါ။
+        load() အရင် ခေါ်ထားရပါမည်။
+        """
+        entry = self._entries[chat_id]
+        self._entries.move_to_end(chat_id)
+
+        if entry[LAST_USER] == user_id:
+            if entry[STREAK] >= self.anti_spam_limit:
+                return False, False
+            entry[STREAK] += 1
+        else:
+            entry[LAST_USER] = user_id
+            entry[STREAK] = 1
+
+        entry[COUNT] += 1
+        self._dirty.add(chat_id)
+        return True, entry[COUNT] >= spawn_count
+
+    def get_count(self, chat_id):
+        entry = self._entries.get(chat_id)
+        return entry[COUNT] if entry else 0
+
+    def reset(self, chat_id):
+        """Spawn ပြီးရင် Count နဲ့ Anti-Spam ကို ပြန်စပါ။"""
+        if chat_id in self._entries:
+            self._entries[chat_id] = [0, None, 0]
+            self._dirty.add(chat_id)
+
+    def start_spawn(self, chat_id):
+        """Count ကို ပြန်စပြီး Spawn ပုံ ပို့ပြီးတဲ့အထိ (finish_spawn / fail_spawn) ဒီ Group ကို ထပ် မ Spawn ပါ။"""
+        self.reset(chat_id)
+        self._spawn_pending.add(chat_id)
+
+    def is_spawn_pending(self, chat_id):
+        return chat_id in self._spawn_pending
+
+    def finish_spawn(self, chat_id):
+        """Active Spawn ကို DB ထဲ မှတ်ပြီးပါပြီ။"""
+        self._spawn_pending.discard(chat_id)
+
+    def fail_spawn(self, chat_id, spawn_count):
+        """Spawn ပုံ ပို့မရရင် Spawn မပျောက်အောင် နောက် Message တစ်ခုနဲ့ ပြန် Spawn မယ့် Count ကို ပြန်ထားပါ။"""
+        self._spawn_pending.discard(chat_id)
+        entry = self._entries.get(chat_id)
+        if entry is not None:
+            entry[COUNT] = max(entry[COUNT], spawn_count - 1)
+            self._dirty.add(chat_id)
+
+    def drop(self, chat_id):
+        """Bot က Group ကနေ ထွက်သွားရင် Memory ကနေ လုံးဝ ဖယ်ပါ။"""
+        self._entries.pop(chat_id, None)
+        self._pending.pop(chat_id, None)
+        self._dirty.discard(chat_id)
+        self._spawn_pending.discard(chat_id)
+
+    def take_dirty(self):
+        """DB ထဲ ရေးရမယ့် entry တွေကို {chat_id: (count, last_user_id, streak)} အဖြစ် ယူပြီး dirty ကို ရှင်းပါ။"""
+        rows = dict(self._pending)
+        for chat_id in self._dirty:
+            entry = self._entries.get(chat_id)
+            if entry is not None:
+                rows[chat_id] = tuple(entry)
+        self._pending = {}
+        self._dirty = set()
+        return rows
+
+    def restore_dirty(self, rows):
+        """Flush မအောင်မြင်ရင် နောက်တစ်ကြိမ် ပြန်ရေးနိုင်အောင် ပြန်ထည့်ပါ။"""
+        for chat_id, row in rows.items():
+            if chat_id in self._entries:
+                self._dirty.add(chat_id)
+            else:
+                self._pending.setdefault(chat_id, row)
+
+    def _evict(self):
+        while len(self._entries) > self.max_chats:
+            chat_id, entry = self._entries.popitem(last=False)
+            if chat_id in self._dirty:
+                self._dirty.discard(chat_id)
+                self._pending[chat_id] = tuple(entry)
@@ -0,0 +1,217 @@
+# metrics.py
+
+import functools
+import json
+import threading
+import time
+from collections import defaultdict
+
+# Latency bucket များ (စက္ကန့်)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+_lock = threading.Lock()
+_histograms = {}               # (name, label_key, label_value) -> Histogram
+_counters = defaultdict(int)   # (name, label_key, label_value) -> int
+_gauges = {}                   # name -> function () -> number ဒါမှမဟုတ် {label_value: number}
+_help = {}
+started_at = time.time()
+
+
+class Histogram:
+    """Fixed bucket Histogram (Prometheus ပုံစံ cumulative bucket)"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Bucket upper bound နဲ့ ခန့်မှန်းထားတဲ့ quantile (စက္ကန့်)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for i, bound in enumerate(BUCKETS):
+            running += self.counts[i]
+            if running >= target:
+                return bound if bound != float("inf") else BUCKETS[-2]
+        return BUCKETS[-2]
+
+
+def describe(name, help_text):
+    _help[name] = help_text
+
+
+def observe(name, seconds, label_key=None, label_value=None):
+    key = (name, label_key, label_value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def inc(name, amount=1, label_key=None, label_value=None):
+    with _lock:
+        _counters[(name, label_key, label_value)] += amount
+
+
+def register_gauge(name, func, help_text=None, label_key=None):
+    """Export လုပ်ချိန်မှာ func() ကို ခေါ်ပြီး တန်ဖိုးယူပါ။ (Queue depth, Cache size စသည်)"""
+    _gauges[name] = (func, label_key)
+    if help_text:
+        _help[name] = help_text
+
+
+# --- Decorators ---
+
+def timed_handler(func):
+    """Telegram handler (async) တစ်ခုချင်းစီရဲ့ Latency ကို မှတ်ပါ။"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            inc("handler_errors_total", label_key="handler", label_value=name)
+            raise
+        finally:
+            observe("handler_seconds", time.perf_counter() - started, "handler", name)
+    return wrapper
+
+
+def timed_db(func):
+    """game_database function တစ်ခုချင်းစီရဲ့ ခေါ်တဲ့အကြိမ်ရေ နဲ့ ကြာချိန်ကို မှတ်ပါ။"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            inc("gamedb_errors_total", label_key="function", label_value=name)
+            raise
+        finally:
+            observe("gamedb_call_seconds", time.perf_counter() - started, "function", name)
+    return wrapper
+
+
+# --- Export ---
+
+def _labels(label_key, label_value, extra=None):
+    parts = []
+    if label_key is not None:
+        parts.append(f'{label_key}="{str(label_value).replace(chr(34), chr(39))}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _gauge_values():
+    values = []
+    for name, (func, label_key) in _gauges.items():
+        try:
+            value = func()
+        except Exception:
+            continue
+        if isinstance(value, dict):
+            values.extend((name, label_key, k, v) for k, v in value.items())
+        else:
+            values.append((name, None, None, value))
+    return values
+
+
+def render_prometheus():
+    """Prometheus text exposition format"""
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    with _lock:
+        counters = sorted(_counters.items(), key=lambda item: (item[0][0], str(item[0][2])))
+        histograms = sorted(
+            ((key, list(h.counts), h.total, h.count) for key, h in _histograms.items()),
+            key=lambda item: (item[0][0], str(item[0][2]))
+        )
+
+    for (name, label_key, label_value), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_labels(label_key, label_value)} {value}")
+
+    for (name, label_key, label_value), counts, total, count in histograms:
+        header(name, "histogram")
+        running = 0
+        for bound, bucket_count in zip(BUCKETS, counts):
+            running += bucket_count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+            lines.append(f"{name}_bucket{_labels(label_key, label_value, le)} {running}")
+        lines.append(f"{name}_sum{_labels(label_key, label_value)} {total}")
+        lines.append(f"{name}_count{_labels(label_key, label_value)} {count}")
+
+    for name, label_key, label_value, value in _gauge_values():
+        header(name, "gauge")
+        lines.append(f"{name}{_labels(label_key, label_value)} {value}")
+
+    lines.append(f"process_uptime_seconds {time.time() - started_at:.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """Structured log / /stats အတွက် dict"""
+    with _lock:
+        counters = {}
+        for (name, label_key, label_value), value in _counters.items():
+            key = name if label_key is None else f"{name}[{label_value}]"
+            counters[key] = value
+        histograms = {}
+        for (name, label_key, label_value), h in _histograms.items():
+            key = name if label_key is None else f"{name}[{label_value}]"
+            histograms[key] = {
+                "count": h.count,
+                "total_s": round(h.total, 4),
+                "p50_ms": round((h.quantile(0.5) or 0) * 1000, 2),
+                "p95_ms": round((h.quantile(0.95) or 0) * 1000, 2),
+                "p99_ms": round((h.quantile(0.99) or 0) * 1000, 2),
+            }
+    gauges = {}
+    for name, label_key, label_value, value in _gauge_values():
+        gauges[name if label_key is None else f"{name}[{label_value}]"] = value
+    return {"uptime_s": round(time.time() - started_at), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+
+def snapshot_json():
+    return json.dumps({"metrics": snapshot(), "ts": round(time.time())}, ensure_ascii=False, sort_keys=True)
+
+
+def histograms_by_total(name, limit=10):
+    """name Histogram တွေကို စုစုပေါင်း ကြာချိန် အများဆုံး အစဉ်နဲ့ [(label, Histogram)] ပြန်ပေးပါ။"""
+    with _lock:
+        rows = [(key[2], h) for key, h in _histograms.items() if key[0] == name]
+    rows.sort(key=lambda row: row[1].total, reverse=True)
+    return rows[:limit]
+
+
+def counter_value(name, label_value=None):
+    with _lock:
+        if label_value is None:
+            return sum(v for (n, _, _), v in _counters.items() if n == name)
+        return sum(v for (n, _, lv), v in _counters.items() if n == name and lv == label_value)
@@ -0,0 +1,97 @@
+# migrate_harems.py
+# Usage: MONGO_URL=... python migrate_harems.py [--chunk-size 500] [--pause 0.1]
+#        GAME_DB_BACKEND=sqlite SQLITE_PATH=game_bot.db python migrate_harems.py
+# Harem Document အဟောင်း (Catch တစ်ခု = Document တစ်ခု၊ Character Field ကူးထား) တွေကို
+# Compact ပုံစံ (User + Character တစ်ခု = Document တစ်ခု၊ count / datetime) ပြောင်းပါ။
+# Bot ကို မရပ်ဘဲ run လို့ရပါတယ်။ Ctrl+C နှိပ်ရင် လက်ရှိ Chunk ပြီးမှ ရပ်ပါမည် - ပြန် run ရင် ကျန်တာကနေ ဆက်ပါမည်။
+
+import argparse
+import signal
+import sys
+import time
+
+import game_database as gamedb
+
+
+def format_bytes(value):
+    if value is None:
+        return "?"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.1f}{unit}" if unit != "B" else f"{value}{unit}"
+        value /= 1024
+
+
+def print_stats(label, stats):
+    print(
+        f"{label:8} documents={stats['documents']} legacy={stats['legacy_documents']} "
+        f"data={format_bytes(stats['data_bytes'])} index={format_bytes(stats['index_bytes'])}"
+    )
+
+
+def print_savings(before, after):
+    for key, label in (("documents", "Documents"), ("data_bytes", "Data"), ("index_bytes", "Index")):
+        old, new = before[key], after[key]
+        if old is None or new is None:
+            print(f"{label:10} (ဒီ Backend မှာ မသိနိုင်ပါ)")
+            continue
+        saved = old - new
+        percent = f" ({saved / old * 100:.1f}%)" if old else ""
+        shown = format_bytes if key != "documents" else str
+        print(f"{label:10} {shown(old)} -> {shown(new)}  saved {shown(saved)}{percent}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert legacy harem documents to the compact format")
+    parser.add_argument("--chunk-size", type=int, default=gamedb.HAREM_MIGRATION_CHUNK_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0, help="Chunk တစ်ခုချင်းကြား စောင့်ချိန် (DB ကို Load မများအောင်)")
+    args = parser.parse_args()
+
+    if not gamedb.store:
+        print("❌ Database နှင့် ချိတ်ဆက်မရပါ။")
+        return 1
+
+    gamedb.ensure_indexes() # (Compact ပုံစံ Upsert အတွက် user_character_unique Index လိုပါတယ်)
+    before = gamedb.harem_storage_stats()
+    print_stats("Before", before)
+    if not before["legacy_documents"]:
+        print("✅ ပြောင်းစရာ Legacy Document မရှိပါ။")
+
+    stopping = []
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+
+    started = time.perf_counter()
+    after_id, converted, skipped, chunks = None, 0, 0, 0
+    while not stopping:
+        result = gamedb.migrate_legacy_harems(after=after_id, limit=args.chunk_size)
+        if result is None:
+            break
+        after_id, chunk_converted, chunk_skipped = result
+        converted += chunk_converted
+        skipped += chunk_skipped
+        chunks += 1
+        rate = converted / max(time.perf_counter() - started, 1e-9)
+        print(f"⏳ Chunk {chunks}: converted {converted} / skipped {skipped} ({rate:.0f} docs/s)")
+        if args.pause:
+            time.sleep(args.pause)
+
+    if stopping:
+        print(f"⏸️ ရပ်လိုက်ပါပြီ (converted {converted})။ ပြန် run ရင် ကျန်တာကနေ ဆက်ပါမည်။")
+        return 1
+
+    print("⏳ Legacy Index ဖျက်ပြီး Counter / Leaderboard ပြန်တွက်နေပါသည်...")
+    gamedb.finish_harem_migration()
+
+    after = gamedb.harem_storage_stats()
+    print_stats("After", after)
+    print()
+    print_savings(before, after)
+    if skipped:
+        # (Catalog မှာ မရှိတော့တဲ့ Character - Character ပြန်ထည့်ပြီး ပြန် run ပါ)
+        print(f"⚠️ Catalog မှာ နာမည်မတွေ့လို့ Legacy Document {skipped} ခု ချန်ထားခဲ့ပါသည်။")
+    print(f"✅ Migration ပြီးပါပြီ ({time.perf_counter() - started:.1f}s)။")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# replay_updates.py
+# Usage: python replay_updates.py updates.jsonl [--url http://127.0.0.1:8443/telegram] [--secret TOKEN] [--rate 50]
+# မှတ်ထားတဲ့ Telegram Update JSON တွေကို Webhook endpoint ဆီ POST လုပ်ပြီး Local မှာ စမ်းပါ။
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def load_updates(path):
+    """JSON array (ဒါမှမဟုတ်) JSONL file ထဲက Update တွေကို ဖတ်ပါ။"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorded Telegram updates ကို webhook ဆီ ပြန်ပို့ပါ")
+    parser.add_argument("file")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{os.environ.get('PORT', '8443')}{os.environ.get('WEBHOOK_PATH', '/telegram')}")
+    parser.add_argument("--secret", default=os.environ.get("WEBHOOK_SECRET"))
+    parser.add_argument("--rate", type=float, default=0, help="တစ်စက္ကန့် Update အရေအတွက် (0 = အမြန်ဆုံး)")
+    args = parser.parse_args()
+
+    updates = load_updates(args.file)
+    headers = {"Content-Type": "application/json"}
+    if args.secret:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = args.secret
+
+    failed = 0
+    started = time.monotonic()
+    for i, update in enumerate(updates, start=1):
+        request = urllib.request.Request(args.url, data=json.dumps(update).encode("utf-8"), headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except urllib.error.URLError as e:
+            failed += 1
+            print(f"Update #{i} (update_id={update.get('update_id')}) failed: {e}")
+        if args.rate:
+            time.sleep(max(0.0, started + i / args.rate - time.monotonic()))
+
+    elapsed = time.monotonic() - started
+    print(f"✅ {len(updates) - failed}/{len(updates)} updates ပို့ပြီးပါပြီ ({elapsed:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# send_queue.py
+
+import asyncio
+import itertools
+import time
+
+from telegram.error import RetryAfter, NetworkError, TimedOut, BadRequest, Forbidden
+
+# --- Priority (နံပါတ် ငယ်လေ အရင်ပို့လေ) ---
+PRIORITY_CATCH = 0   # /catch အဖြေ
+PRIORITY_SPAWN = 1   # Character ပေါ်လာကြောင်း
+PRIORITY_NORMAL = 2  # ကြိုဆိုစာ၊ /harem စသည်
+PRIORITY_BULK = 3    # /wang list၊ broadcast စသည်
+
+PRIORITY_NAMES = {
+    PRIORITY_CATCH: "catch",
+    PRIORITY_SPAWN: "spawn",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BULK: "bulk",
+}
+
+
+class TokenBucket:
+    """rate (token/စက္ကန့်) နဲ့ ပြန်ဖြည့်ပြီး capacity အထိ burst ခွင့်ပြုတဲ့ Bucket"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # RetryAfter ရရင် ဒီအချိန်ထိ မပို့ပါ
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now=None):
+        """Token တစ်ခု ရဖို့ စောင့်ရမယ့် စက္ကန့် (0 ဆိုရင် အခုပို့လို့ရ)"""
+        now = now if now is not None else time.monotonic()
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+    def block_for(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def is_idle(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+class _Job:
+    __slots__ = ("chat_id", "make_call", "priority", "future", "retry_timeouts", "attempts", "enqueued_at")
+
+    def __init__(self, chat_id, make_call, priority, future, retry_timeouts=False):
+        self.chat_id = chat_id
+        self.make_call = make_call
+        self.priority = priority
+        self.future = future
+        self.retry_timeouts = retry_timeouts
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+
+def _retrieve_exception(future):
+    # စောင့်မကြည့်တဲ့ (fire-and-forget) Future တွေအတွက် "exception was never retrieved" မပေါ်အောင်
+    if not future.cancelled():
+        future.exception()
+
+
+class SendScheduler:
+    """
+    Bot ကနေ ပို့တဲ့ Message အားလုံးကို Queue တစ်ခုထဲကနေ Flood Limit မကျော်အောင် ပို့ပါ။
+    - Global Bucket (Bot တစ်ခုလုံး) နဲ့ Chat တစ်ခုချင်းစီ Bucket (Group / Private မတူ)
+    - RetryAfter ရရင် အဲဒီ Chat နဲ့ Global Bucket ကို ခဏရပ်ပြီး ပြန်ပို့ပါ
+    - TimedOut ဆိုရင် Telegram ဆီ ရောက်ပြီးသား ဖြစ်နိုင်လို့ retry_timeouts=True (Edit လို ထပ်ခေါ်လည်း ရတဲ့ call) မှသာ ပြန်ပို့ပါ
+    - Priority: /catch အဖြေတွေက bulk output တွေထက် အရင်ထွက်ပါ
+    """
+
+    def __init__(self, global_rate=25.0, global_burst=30, group_rate=20 / 60, group_burst=5,
+                 private_rate=1.0, private_burst=3, workers=8, max_retries=3, max_chats=20000):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.workers = workers
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._buckets = {}
+        self._queue = None
+        self._tasks = []
+        self._seq = itertools.count()
+        self._waiting = 0  # Chat bucket ကြောင့် ခဏ ဖယ်ထားတဲ့ Job အရေအတွက်
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "flood_waits": 0}
+        self.depth_by_priority = {p: 0 for p in PRIORITY_NAMES}
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout=10.0):
+        """Queue ထဲ ကျန်နေတာတွေ (drain_timeout အတွင်း) ပို့ပြီးမှ ရပ်ပါ။"""
+        if self._queue is None:
+            return
+        deadline = time.monotonic() + drain_timeout
+        while self.depth() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- Public API ---
+
+    def submit(self, chat_id, make_call, priority=PRIORITY_NORMAL, retry_timeouts=False):
+        """
+        ပို့ရမယ့် call ကို Queue ထဲ ထည့်ပြီး Future ကို ပြန်ပေးပါ။ (ရလဒ်လိုရင် await လုပ်ပါ)
+        make_call: Coroutine ပြန်ပေးတဲ့ argument မပါ function (Retry အတွက် ထပ်ခေါ်နိုင်ရမည်)
+        retry_timeouts: ထပ်ခေါ်လည်း Message နှစ်ခါ မထွက်တဲ့ call (edit_message_text စသည်) ဆိုမှ True
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        job = _Job(chat_id, make_call, priority, future, retry_timeouts)
+        self._put(job)
+        return future
+
+    async def send(self, chat_id, make_call, priority=PRIORITY_NORMAL, retry_timeouts=False):
+        """submit() ပြီး ရလဒ်ကို စောင့်ပါ။"""
+        return await self.submit(chat_id, make_call, priority, retry_timeouts)
+
+    def depth(self):
+        return (self._queue.qsize() if self._queue else 0) + self._waiting
+
+    def metrics(self):
+        return {
+            "queue_depth": self.depth(),
+            "queue_depth_by_priority": {PRIORITY_NAMES[p]: n for p, n in self.depth_by_priority.items()},
+            "tracked_chats": len(self._buckets),
+            **self.stats,
+        }
+
+    # --- Internals ---
+
+    def _put(self, job):
+        self.depth_by_priority[job.priority] += 1
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+
+    def _requeue_later(self, job, delay):
+        """Chat bucket မပြည့်သေးရင် Worker ကို မပိတ်ဘဲ ခဏနေမှ Queue ထဲ ပြန်ထည့်ပါ။"""
+        self._waiting += 1
+        self.depth_by_priority[job.priority] -= 1
+
+        def requeue():
+            self._waiting -= 1
+            self._put(job)
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    def _bucket_for(self, chat_id):
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_chats:
+                now = time.monotonic()
+                for key in [k for k, b in self._buckets.items() if b.is_idle(now)]:
+                    del self._buckets[key]
+            if chat_id is not None and chat_id < 0: # Group / Supergroup / Channel
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, self.private_burst)
+            self._buckets[chat_id] = bucket
+        return bucket
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            if job.future.done(): # (cancel လုပ်ခံရပြီးသား)
+                self.depth_by_priority[job.priority] -= 1
+                continue
+
+            chat_bucket = self._bucket_for(job.chat_id)
+            chat_wait = chat_bucket.wait_time()
+            if chat_wait > 0:
+                self._requeue_later(job, chat_wait)
+                continue
+
+            global_wait = self.global_bucket.wait_time()
+            while global_wait > 0:
+                await asyncio.sleep(global_wait)
+                global_wait = self.global_bucket.wait_time()
+
+            self.depth_by_priority[job.priority] -= 1
+            self.global_bucket.consume()
+            chat_bucket.consume()
+            await self._run(job, chat_bucket)
+
+    async def _run(self, job, chat_bucket):
+        job.attempts += 1
+        try:
+            result = await job.make_call()
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else float(e.retry_after)
+            self.stats["flood_waits"] += 1
+            chat_bucket.block_for(retry_after)
+            self.global_bucket.block_for(retry_after) # (Bot တစ်ခုလုံး Limit ကျော်နေတာ ဖြစ်နိုင်လို့ ကျန်တဲ့ Chat တွေပါ ရပ်ပါ)
+            self._retry_or_fail(job, e)
+        except (BadRequest, Forbidden) as e:
+            # ပြန်ပို့လည်း မရနိုင်တဲ့ Error (BadRequest က NetworkError ရဲ့ subclass မို့ အရင်ဖမ်းပါ)
+            self._fail(job, e)
+        except TimedOut as e:
+            # Request က Telegram ဆီ ရောက်ပြီး Message ထွက်သွားပြီး ဖြစ်နိုင်ပါတယ် (ပြန်ပို့ရင် နှစ်ခါ ထွက်)
+            if job.retry_timeouts:
+                self._retry_or_fail(job, e)
+            else:
+                self._fail(job, e)
+        except NetworkError as e:
+            self._retry_or_fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.stats["sent"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def _retry_or_fail(self, job, error):
+        if job.attempts > self.max_retries:
+            self._fail(job, error)
+            return
+        self.stats["retried"] += 1
+        self._put(job)
+
+    def _fail(self, job, error):
+        self.stats["failed"] += 1
+        print(f"Send failed (chat {job.chat_id}, {PRIORITY_NAMES[job.priority]}, attempt {job.attempts}): {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
@@ -0,0 +1,328 @@
+# sharding.py
+#
+# Group တွေကို chat_id hash နဲ့ Worker Process N ခုကြား ခွဲပေးပါ။
+# - Dispatcher (ဒီ process) : Telegram ကနေ Update (raw JSON) ယူပြီး သက်ဆိုင်ရာ Worker Queue ထဲ ထည့်
+# - Worker (shard-0..N-1)  : Application အပြည့်အစုံ run ပြီး ကိုယ်ပိုင် Group တွေရဲ့ Count / Spawn Cache ကို ကိုင်
+# - Coordinator            : Owner command တွေ (/addchar, /wang, /cleanmongodb ...) ကို တစ်နေရာတည်းမှာ run
+#
+# Usage:
+#   BOT_MODE=sharded SHARD_WORKERS=4 python character.py
+#   python sharding.py --workers 4                       (Telegram polling)
+#   python sharding.py --workers 4 --replay updates.jsonl (Local dispatcher stand-in)
+#   python sharding.py --workers 4 --replay updates.jsonl --dry-run (Routing ကိုပဲ စစ်)
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from collections import Counter
+
+COORDINATOR = "coordinator"
+
+# Coordinator ဆီပဲ ပို့ရမယ့် Owner Command များ
+COORDINATOR_COMMANDS = {
+    "addchar", "wang", "cleanmongodb", "rebuildcounters", "warmimages", "importchars", "stats", "broadcast",
+    "backup",
+}
+
+# Update ထဲမှာ Message ပါနိုင်တဲ့ field များ
+_MESSAGE_FIELDS = ("message", "edited_message", "channel_post", "edited_channel_post")
+_MEMBER_FIELDS = ("my_chat_member", "chat_member", "chat_join_request")
+
+# Worker တစ်ခုချင်းစီမှာ ကိုယ်ပိုင် Spawn Cache / Catalog Snapshot ရှိလို့ တခြား Worker ပြင်တာကို
+# watch_changes (Mongo Change Stream) နဲ့ သိရပါမည်။ မရှိတဲ့ Backend (sqlite / memory) မှာ Cache အဟောင်း ဖတ်မိပါမည်။
+SHARDED_BACKENDS = {"mongo"}
+
+
+def shard_for_chat(chat_id, num_shards):
+    """chat_id ကနေ Shard နံပါတ် (0..num_shards-1) ကို တွက်ပါ။ (Process တိုင်း အဖြေတူ)"""
+    return chat_id % num_shards
+
+
+def _command_name(text):
+    """ "/addchar@MyBot Goku | ..." -> "addchar" """
+    if not text or not text.startswith("/"):
+        return None
+    parts = text[1:].split(maxsplit=1)
+    return parts[0].split("@", 1)[0].lower() if parts else None
+
+
+def extract_route_info(data):
+    """Raw Update (dict) ထဲက (chat_id, chat_type, from_user_id, command) ကို ယူပါ။"""
+    for field in _MESSAGE_FIELDS:
+        message = data.get(field)
+        if message:
+            chat = message.get("chat", {})
+            text = message.get("text") or message.get("caption")
+            return chat.get("id"), chat.get("type"), (message.get("from") or {}).get("id"), _command_name(text)
+    callback = data.get("callback_query")
+    if callback:
+        chat = (callback.get("message") or {}).get("chat", {})
+        return chat.get("id"), chat.get("type"), (callback.get("from") or {}).get("id"), None
+    for field in _MEMBER_FIELDS:
+        member_update = data.get(field)
+        if member_update:
+            chat = member_update.get("chat", {})
+            return chat.get("id"), chat.get("type"), (member_update.get("from") or {}).get("id"), None
+    return None, None, None, None
+
+
+def route_update(data, num_shards, owner_id=None):
+    """Update ကို ဘယ် Worker ဆီ ပို့ရမလဲ ("coordinator" ဒါမှမဟုတ် shard နံပါတ်)"""
+    chat_id, chat_type, from_id, command = extract_route_info(data)
+    if command in COORDINATOR_COMMANDS:
+        return COORDINATOR
+    if owner_id is not None and chat_type == "private" and from_id == owner_id:
+        # Owner ရဲ့ Private chat (Owner command တွေရဲ့ Button callback တွေပါ) ကို Coordinator မှာပဲ ထားပါ
+        return COORDINATOR
+    if chat_id is None:
+        return COORDINATOR
+    return shard_for_chat(chat_id, num_shards)
+
+
+# --- Worker Process ---
+
+def _worker_main(name, queue, num_shards):
+    """Worker process ထဲမှာ Application ကို run ပြီး Queue ထဲက Update တွေကို process လုပ်ပါ။"""
+    # (spawn start method မှာ character.py က __mp_main__ အဖြစ် import ပြီးသား ဖြစ်နိုင်ပါတယ်)
+    bot_module = sys.modules.get("__mp_main__")
+    if not hasattr(bot_module, "build_application"):
+        import character as bot_module
+
+    # Global send budget ကို Worker တွေကြား ခွဲပေးပါ (Bot တစ်ခုလုံး Telegram limit မကျော်အောင်)
+    share = 1.0 / (num_shards + 1)
+    bucket = bot_module.outbox.global_bucket
+    bucket.rate *= share
+    bucket.capacity = max(1, bucket.capacity * share)
+    bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    # Metrics port ကို Process တစ်ခုချင်းစီ ခွဲပေးပါ (coordinator: METRICS_PORT, shard-i: METRICS_PORT+1+i)
+    if getattr(bot_module, "METRICS_PORT", 0):
+        bot_module.METRICS_PORT += 0 if name == COORDINATOR else 1 + int(name.rsplit("-", 1)[1])
+
+    # Leaderboard Reconcile / Spawn Expiry Sweep ကို Coordinator တစ်ခုတည်းက လုပ်ပါ (DB ကို အားလုံး မျှသုံးလို့)
+    # (Shard တွေရဲ့ Spawn Cache ကို Change Watcher က ဖျက်ပေးပါမည်)
+    if name != COORDINATOR:
+        bot_module.LEADERBOARD_RECONCILE_SECONDS = 0
+        bot_module.SPAWN_EXPIRY_CHECK_SECONDS = 0
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # (Dispatcher က Sentinel ပို့ပြီး ရပ်ခိုင်းပါမည်)
+    print(f"🧩 Worker '{name}' (pid {os.getpid()}) စတင်ပါပြီ။")
+    asyncio.run(_worker_loop(bot_module, queue))
+    print(f"🧩 Worker '{name}' ရပ်ပါပြီ။")
+
+
+async def _worker_loop(bot_module, queue):
+    from telegram import Update
+
+    application = bot_module.build_application(with_updater=False)
+    loop = asyncio.get_running_loop()
+    await application.initialize()
+    await bot_module.post_init(application)
+    await application.start()
+    try:
+        while True:
+            data = await loop.run_in_executor(None, queue.get)
+            if data is None: # (Stop sentinel)
+                break
+            try:
+                await application.update_queue.put(Update.de_json(data, application.bot))
+            except Exception as e:
+                print(f"Worker: invalid update {data.get('update_id')}: {e}")
+    finally:
+        await application.stop()
+        await bot_module.post_stop(application)
+        await application.shutdown()
+        await bot_module.post_shutdown(application)
+
+
+# --- Dispatcher ---
+
+class ShardDispatcher:
+    """Worker process တွေကို စတင်ပြီး Update တွေကို chat_id အလိုက် ခွဲပို့ပါ။"""
+
+    def __init__(self, num_shards, owner_id=None, queue_size=10000):
+        self.num_shards = num_shards
+        self.owner_id = owner_id
+        self.queue_size = queue_size
+        self.routed = Counter()
+        self.dropped = Counter()
+        self._ctx = multiprocessing.get_context("spawn") # (pymongo client က fork-safe မဖြစ်လို့)
+        self._queues = {}
+        self._processes = {}
+
+    def targets(self):
+        return [COORDINATOR] + list(range(self.num_shards))
+
+    def start(self):
+        for target in self.targets():
+            name = target if target == COORDINATOR else f"shard-{target}"
+            worker_queue = self._ctx.Queue(maxsize=self.queue_size)
+            process = self._ctx.Process(target=_worker_main, args=(name, worker_queue, self.num_shards), name=name)
+            process.start()
+            self._queues[target] = worker_queue
+            self._processes[target] = process
+
+    def dispatch(self, data, block=False):
+        """
+        Update ကို Worker Queue ထဲ ထည့်ပြီး target ကို ပြန်ပေးပါ။
+        Queue ပြည့်နေရင် (Worker နောက်ကျနေ) မစောင့်ဘဲ None ပြန်ပေးပါ။ (Event loop ကို မပိတ်ရအောင် -
+        Webhook က 503 ပြန်ပြီး Telegram ကို ပြန်ပို့ခိုင်း / Polling က offset မတိုးဘဲ ပြန်ဆွဲ)
+        block=True က Event loop အပြင် (Replay) အတွက်သာ
+        """
+        target = route_update(data, self.num_shards, self.owner_id)
+        if self._queues:
+            try:
+                self._queues[target].put(data, block=block)
+            except queue.Full:
+                self.dropped[target] += 1
+                if self.dropped[target] % 100 == 1:
+                    print(f"Dispatcher: {self._name(target)} queue full ({self.dropped[target]} dropped)")
+                return None
+        self.routed[target] += 1
+        return target
+
+    def stop(self, timeout=30):
+        """Worker တွေကို Sentinel ပို့ပြီး ရပ်ခိုင်းပါ။ (Queue ပြည့်နေလို့ timeout အတွင်း မရောက်ရင် terminate)"""
+        deadline = time.monotonic() + timeout
+        for target, worker_queue in self._queues.items():
+            try:
+                worker_queue.put(None, timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Full:
+                print(f"Dispatcher: {self._name(target)} queue full, terminating") # (အောက်က join ပြီး terminate)
+        for process in self._processes.values():
+            process.join(max(0.1, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+
+    @staticmethod
+    def _name(target):
+        return "coordinator" if target == COORDINATOR else f"shard-{target}"
+
+    def summary(self):
+        text = ", ".join(f"{self._name(t)}: {self.routed[t]}" for t in self.targets())
+        if self.dropped:
+            text += f" (dropped: {sum(self.dropped.values())})"
+        return text
+
+
+async def _poll_telegram(dispatcher, token, stop_event):
+    """Telegram getUpdates ကနေ Update တွေ ယူပြီး Dispatcher ဆီ ပို့ပါ။"""
+    from telegram import Bot, Update
+
+    async with Bot(token) as bot:
+        await bot.delete_webhook()
+        offset = None
+        while not stop_event.is_set():
+            try:
+                updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=Update.ALL_TYPES)
+            except Exception as e:
+                print(f"Dispatcher: get_updates error: {e}")
+                await asyncio.sleep(3)
+                continue
+            for update in updates:
+                if dispatcher.dispatch(update.to_dict()) is None:
+                    await asyncio.sleep(1) # (Queue ပြည့်နေ - offset မတိုးဘဲ ဒီ Update ကနေ ပြန်ဆွဲပါ)
+                    break
+                offset = update.update_id + 1
+
+
+async def _serve_webhook(dispatcher, stop_event):
+    """Webhook ingress: Raw Update JSON ကို Decode မလုပ်ဘဲ Worker ဆီ တိုက်ရိုက် ပို့ပါ။"""
+    import hmac
+    from webhook_server import HTTPServer
+
+    secret = os.environ.get("WEBHOOK_SECRET")
+
+    async def handle(headers, body):
+        if secret and not hmac.compare_digest(headers.get("x-telegram-bot-api-secret-token", ""), secret):
+            return 403, "text/plain", b""
+        try:
+            target = dispatcher.dispatch(json.loads(body))
+        except ValueError:
+            return 400, "text/plain", b""
+        if target is None:
+            return 503, "text/plain", b"" # (Queue ပြည့်နေ - Telegram က နောက်မှ ပြန်ပို့ပါမည်)
+        return 200, "text/plain", b""
+
+    server = HTTPServer(
+        {("POST", os.environ.get("WEBHOOK_PATH", "/telegram")): handle},
+        host=os.environ.get("WEBHOOK_LISTEN", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8443"))
+    )
+    await server.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await server.stop()
+
+
+async def _run_ingress(dispatcher, ingress, token):
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+    if ingress == "webhook":
+        await _serve_webhook(dispatcher, stop_event)
+    else:
+        poll_task = asyncio.create_task(_poll_telegram(dispatcher, token, stop_event))
+        await stop_event.wait()
+        poll_task.cancel()
+        await asyncio.gather(poll_task, return_exceptions=True)
+
+
+def replay_file(dispatcher, path):
+    """Local dispatcher stand-in: မှတ်ထားတဲ့ Update JSON (array / JSONL) ကို Dispatcher ဆီ ပို့ပါ။"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    updates = json.loads(text) if text.startswith("[") else [json.loads(l) for l in text.splitlines() if l.strip()]
+    for data in updates:
+        dispatcher.dispatch(data, block=True)
+    return len(updates)
+
+
+def run_sharded(num_shards, ingress="polling", replay=None, dry_run=False):
+    """Sharded mode ကို run ပါ။"""
+    backend = os.environ.get("GAME_DB_BACKEND", "mongo").lower()
+    if not dry_run and backend not in SHARDED_BACKENDS:
+        # memory: Worker တစ်ခုချင်းစီမှာ ကိုယ်ပိုင် Data / sqlite: တခြား Worker ပြင်တာ Cache ထဲ မရောက်
+        print(f"❌ Sharded mode မှာ GAME_DB_BACKEND={backend} ကို မသုံးနိုင်ပါ။ (Change Stream ပါတဲ့ mongo ကို သုံးပါ)")
+        return
+    owner_id = os.environ.get("OWNER_ID")
+    dispatcher = ShardDispatcher(num_shards, owner_id=int(owner_id) if owner_id else None)
+
+    if not dry_run:
+        dispatcher.start()
+    try:
+        if replay:
+            count = replay_file(dispatcher, replay)
+            print(f"✅ Update {count} ခု ခွဲပို့ပြီးပါပြီ။ ({dispatcher.summary()})")
+        else:
+            print(f"🚀 Sharded mode: {num_shards} shards + coordinator ({ingress})")
+            asyncio.run(_run_ingress(dispatcher, ingress, os.environ.get("GAME_BOT_TOKEN")))
+    finally:
+        if not dry_run:
+            dispatcher.stop()
+        print(f"📊 Routed: {dispatcher.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game Bot sharded mode")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SHARD_WORKERS", "4")))
+    parser.add_argument("--ingress", choices=["polling", "webhook"], default=os.environ.get("SHARD_INGRESS", "polling"))
+    parser.add_argument("--replay", help="Telegram မချိတ်ဘဲ Update JSON file ကို ခွဲပို့ရန်")
+    parser.add_argument("--dry-run", action="store_true", help="Worker မစဘဲ Routing ကိုပဲ စစ်ရန် (--replay နဲ့)")
+    args = parser.parse_args()
+    run_sharded(args.workers, ingress=args.ingress, replay=args.replay, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
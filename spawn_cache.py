@@ -0,0 +1,52 @@
+# spawn_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+# Cache ထဲမှာ မရှိကြောင်း ပြတဲ့ sentinel (None က "Spawn မရှိ" ဆိုတဲ့ အဖြေ ဖြစ်နိုင်လို့)
+MISS = object()
+
+
+class SpawnCache:
+    """
+    Group တစ်ခုချင်းစီရဲ့ Active Spawn ကို Memory ထဲမှာ မှတ်ထားပါ။ (Write-through)
+    - max_size ပြည့်ရင် အကြာဆုံး မသုံးရသေးတဲ့ (idle) Group ကို ဖယ်ပါ။ (LRU)
+    - ttl စက္ကန့် ကျော်ရင် DB ကနေ ပြန်ဖတ်ပါ။ (တခြား Process က ရေးသွားတာ မသိရင်တောင် ကြာကြာ မမှားအောင်)
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # group_id -> (expires_at, character_object or None)
+        self._lock = threading.Lock()
+
+    def get(self, group_id):
+        with self._lock:
+            entry = self._entries.get(group_id)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[group_id]
+                return MISS
+            self._entries.move_to_end(group_id)
+            return value
+
+    def set(self, group_id, character_object):
+        with self._lock:
+            self._entries[group_id] = (time.monotonic() + self.ttl, character_object)
+            self._entries.move_to_end(group_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, group_id):
+        with self._lock:
+            self._entries.pop(group_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,149 @@
+# spawn_sampler.py
+
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+# --- Rarity Weights (rarity field အလိုက် ပေါ်နိုင်ခြေ) ---
+# ဒီစာရင်းထဲ မပါတဲ့ rarity တွေကို DEFAULT_RARITY_WEIGHT နဲ့ တွက်ပါ။
+RARITY_WEIGHTS = {
+    "common": 50,
+    "uncommon": 30,
+    "rare": 15,
+    "epic": 8,
+    "legendary": 3,
+    "mythic": 1,
+}
+DEFAULT_RARITY_WEIGHT = 10
+
+
+def parse_rarity_weights(spec):
+    """ "common=50,rare=10" ပုံစံ String ကို dict ပြောင်းပါ။"""
+    weights = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        key, value = part.split("=", 1)
+        try:
+            weights[key.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return weights
+
+
+def rarity_weight(rarity, weights=None):
+    """Character ရဲ့ rarity ကနေ weight ကို ရှာပါ။"""
+    weights = weights if weights is not None else RARITY_WEIGHTS
+    return weights.get(str(rarity or "").strip().lower(), DEFAULT_RARITY_WEIGHT)
+
+
+class AliasTable:
+    """
+    Weighted random pick ကို O(1) နဲ့ လုပ်ဖို့ Vose Alias Table။
+    Catalog ပြောင်းမှပဲ ပြန်တည်ဆောက်ပါ။ (O(n))
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        self.size = n
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        if n == 0:
+            return
+        total = float(sum(weights))
+        if total <= 0:
+            weights = [1.0] * n
+            total = float(n)
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def pick(self, rng=random):
+        i = rng.randrange(self.size)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class SpawnSampler:
+    """
+    Character `_id` နဲ့ rarity ကိုပဲ Memory ထဲမှာ သိမ်းထားပြီး Spawn ရွေးပါ။
+    Catalog တစ်ခုလုံး (image_url အပါအဝင်) ကို Spawn တိုင်း ဆွဲမထုတ်တော့ပါ။
+    """
+
+    def __init__(self, weights=None, refresh_seconds=300, no_repeat_window=0, max_groups=20000):
+        self.weights = weights if weights is not None else RARITY_WEIGHTS
+        self.refresh_seconds = refresh_seconds
+        self.no_repeat_window = no_repeat_window
+        self.max_groups = max_groups
+        self._ids = []
+        self._table = AliasTable([])
+        self._built_version = None
+        self._built_at = 0.0
+        self._recent = OrderedDict()  # group_id -> deque of recent character ids
+        self._lock = threading.Lock()
+
+    def needs_rebuild(self, catalog_version):
+        return (
+            self._built_version != catalog_version
+            or time.monotonic() - self._built_at > self.refresh_seconds
+        )
+
+    def rebuild(self, rows, catalog_version):
+        """rows: [{"_id": ..., "rarity": ...}, ...] (Projection နဲ့ ယူထားတာ)"""
+        ids = []
+        weights = []
+        for row in rows:
+            ids.append(row["_id"])
+            weights.append(rarity_weight(row.get("rarity"), self.weights))
+        table = AliasTable(weights)
+        with self._lock:
+            self._ids = ids
+            self._table = table
+            self._built_version = catalog_version
+            self._built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def pick(self, group_id=None, rng=random):
+        """Character `_id` တစ်ခုကို ရွေးပါ။ Catalog ဗလာဖြစ်ရင် None။"""
+        with self._lock:
+            ids, table = self._ids, self._table
+            if not ids:
+                return None
+            recent = self._recent.get(group_id) if (group_id is not None and self.no_repeat_window) else None
+            # မကြာသေးခင်က ပေါ်ခဲ့တာတွေ ရှောင်ပါ (Catalog သေးရင် ရှောင်လို့မရနိုင်လို့ အကြိမ်ကန့်သတ်ထား)
+            char_id = ids[table.pick(rng)]
+            if recent:
+                for _ in range(10):
+                    if char_id not in recent:
+                        break
+                    char_id = ids[table.pick(rng)]
+            return char_id
+
+    def remember(self, group_id, char_id):
+        """Group မှာ ဘာပေါ်ခဲ့လဲ မှတ်ပါ။ (no-repeat window အတွက်)"""
+        if group_id is None or not self.no_repeat_window:
+            return
+        with self._lock:
+            recent = self._recent.get(group_id)
+            if recent is None:
+                recent = deque(maxlen=self.no_repeat_window)
+                self._recent[group_id] = recent
+            recent.append(char_id)
+            self._recent.move_to_end(group_id)
+            while len(self._recent) > self.max_groups:
+                self._recent.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._built_version = None
@@ -0,0 +1,292 @@
+# storage_base.py
+#
+# game_database.py က သုံးတဲ့ Storage Interface
+# Backend တိုင်း (storage_mongo / storage_memory / storage_sqlite) က ဒီ method တွေကို implement လုပ်ပါ။
+#
+# Document ပုံစံ (Backend တိုင်း တူရပါမည်):
+#   Character : {"_id", "name", "name_lower", "image_url", "rarity", "anime", "emoji", ["file_id"]}
+#   Harem     : {"_id", "user_id", "user_name", "character_id", "count", "caught_at", "first_caught_at"}
+#               User + Character တစ်ခုကို Document တစ်ခုတည်း (ထပ်ဖမ်းရင် count +1)။ caught_at က datetime။
+#               Character Field တွေကို မကူးပါ - ဖတ်တဲ့အခါ Catalog နဲ့ Join ပါ။
+#   Spawn     : Character Object (dict) တစ်ခုလုံး
+#   Counter   : {"_id", "count", "last_user_id", "streak"}
+# "_id" ရဲ့ Type က Backend အလိုက် ကွဲနိုင်ပါတယ် (ObjectId / int)။ တန်းတူစစ်ခြင်း နဲ့ အစဉ်ချခြင်းပဲ လုပ်ပါ။
+#
+# Harem အဟောင်း (Legacy) : Catch တစ်ခုကို Document တစ်ခု၊ Character Field (LEGACY_HAREM_FIELDS) ကူးထားပြီး
+# caught_at က ISO string။ character_id မပါပါ။ migrate_harems.py နဲ့ ပြောင်းပြီးတဲ့အထိ ဖတ်လို့ရအောင် ထားပါ။
+
+HAREM_FIELDS = ("user_id", "user_name", "character_id", "count", "caught_at", "first_caught_at")
+
+LEGACY_HAREM_FIELDS = ("character_name", "character_image", "character_rarity", "character_anime", "character_emoji")
+
+# Page တစ်ခုအတွက် (Legacy Document တွေမှာ character_id မရှိလို့ ပြစရာ Field တွေပါ ယူပါ)
+HAREM_PAGE_FIELDS = ("character_id", "count", "caught_at", "character_name", "character_emoji", "character_rarity", "character_anime")
+
+CHARACTER_FIELDS = ("name", "name_lower", "image_url", "rarity", "anime", "emoji")
+
+
+def character_fields(row):
+    """Input row (name, image_url, rarity, anime, emoji) ကနေ သိမ်းမယ့် Field တွေ ထုတ်ပါ။"""
+    return {
+        "name": row["name"],
+        "name_lower": row["name"].lower(),
+        "image_url": row["image_url"],
+        "rarity": row["rarity"],
+        "anime": row["anime"],
+        "emoji": row.get("emoji", ""),
+    }
+
+
+def harem_record(user_id, user_name, character_object, caught_at, group_id=None):
+    """
+    Catch တစ်ခု (insert_catch အတွက်)
+    HAREM_FIELDS ထဲက Field တွေပဲ သိမ်းပါ။ group_id / character_anime / character_rarity က
+    Counter နဲ့ Leaderboard တိုးဖို့သာ (Harem ထဲ မသိမ်းပါ)။
+    """
+    return {
+        "user_id": user_id,
+        "user_name": user_name,
+        "character_id": character_object["_id"],
+        "caught_at": caught_at,
+        "group_id": group_id,
+        "character_anime": character_object.get("anime"),
+        "character_rarity": character_object.get("rarity"),
+    }
+
+
+# --- Leaderboard Scope ---
+# Catch တစ်ခုက Scope ၃ ခု (global / group / rarity) ရဲ့ User Count ကို +1 လုပ်ပါ။
+# Compact Harem Entry က Group အများကြီးမှာ ဖမ်းထားတာကို count တစ်ခုတည်းနဲ့ ပေါင်းထားလို့ group Scope တွေကို
+# Harem ကနေ ပြန်မတွက်နိုင်ပါ (Leaderboard ကိုယ်တိုင်က မူရင်း)။ rebuild_leaderboards က GROUP_SCOPE_PREFIX နဲ့
+# စတဲ့ Scope တွေကို မထိရပါ။ (ဖျက်ပြီး ပြန်မဆောက်နိုင်လို့)
+GROUP_SCOPE_PREFIX = "group:"
+
+def leaderboard_scope(group_id=None, rarity=None):
+    if group_id is not None:
+        return f"{GROUP_SCOPE_PREFIX}{group_id}"
+    if rarity is not None:
+        return f"rarity:{str(rarity).lower()}"
+    return "global"
+
+
+def leaderboard_scopes(record):
+    """Harem record တစ်ခု ဝင်သွားရင် တိုးရမယ့် Scope များ"""
+    scopes = [leaderboard_scope()]
+    if record.get("group_id") is not None:
+        scopes.append(leaderboard_scope(group_id=record["group_id"]))
+    if record.get("character_rarity"):
+        scopes.append(leaderboard_scope(rarity=record["character_rarity"]))
+    return scopes
+
+
+class GameStorage:
+    """Groups / Characters / Spawns / Harems အတွက် Storage Interface"""
+
+    name = "base"
+
+    # --- Setup ---
+
+    def ensure_indexes(self):
+        """လိုအပ်တဲ့ Index တွေ ဆောက်ပါ။ (idempotent)"""
+
+    def close(self):
+        """Connection တွေ ပိတ်ပါ။"""
+
+    # --- Groups ---
+
+    def add_group(self, chat_id, group_name, joined_at):
+        raise NotImplementedError
+
+    def set_group_last_catcher(self, group_id, user_name):
+        """Group ရှိမှ မှတ်ပါ (Upsert မလုပ်ပါ)"""
+        raise NotImplementedError
+
+    def get_group_last_catcher(self, group_id):
+        raise NotImplementedError
+
+    def remove_group(self, chat_id):
+        """Group နဲ့ သူ့ Message Counter / Active Spawn / Group Leaderboard ကိုပါ ဖျက်ပါ။"""
+        raise NotImplementedError
+
+    def get_all_groups(self):
+        raise NotImplementedError
+
+    def get_group_ids_page(self, after=None, limit=500):
+        """Group ID တွေကို ID အစဉ်လိုက် after ရဲ့ နောက်ကနေ limit ခု (Broadcast လို တစ်ခုလုံး ပတ်ရတဲ့ အလုပ်အတွက်)"""
+        raise NotImplementedError
+
+    def load_group_counter(self, chat_id):
+        """{"_id", "count", "last_user_id", "streak"} ဒါမှမဟုတ် None"""
+        raise NotImplementedError
+
+    def save_group_counters(self, rows):
+        """{chat_id: (count, last_user_id, streak)} ကို တစ်ခါတည်း ရေးပြီး အရေအတွက် ပြန်ပေးပါ။"""
+        raise NotImplementedError
+
+    # --- Characters ---
+
+    def add_character(self, fields):
+        """name_lower နဲ့ Upsert (image_url ပြောင်းမှ file_id ကို ဖျက်) ပြီး Anime Counter ပြင်ပါ။ Character _id ကို ပြန်ပေးပါ။"""
+        raise NotImplementedError
+
+    def bulk_upsert_characters(self, rows):
+        """
+        Chunk တစ်ခုကို Upsert လုပ်ပြီး (inserted, updated) ပြန်ပေးပါ။ (နာမည်တူ ထပ်ပါရင် နောက်ဆုံးတစ်ခု အနိုင်)
+        add_character လိုပဲ image_url ပြောင်းတဲ့ Character ရဲ့ file_id ကိုပဲ ဖျက်ပါ။ (Rarity / Emoji ပြင်ရုံနဲ့ Cache မပျောက်အောင်)
+        """
+        raise NotImplementedError
+
+    def iter_characters(self):
+        """Character document အားလုံး (Catalog Snapshot ဆောက်ရန်)"""
+        raise NotImplementedError
+
+    def set_character_file_id(self, char_id, file_id):
+        raise NotImplementedError
+
+    def clear_character_file_id(self, char_id):
+        raise NotImplementedError
+
+    def get_characters_without_file_id(self):
+        """[{"_id", "name", "image_url"}, ...]"""
+        raise NotImplementedError
+
+    # --- Spawns ---
+
+    def set_active_spawn(self, group_id, character_object, spawned_at):
+        """character_object က None ဆိုရင် Spawn ကို ဖျက်ပါ။"""
+        raise NotImplementedError
+
+    def get_active_spawn(self, group_id):
+        raise NotImplementedError
+
+    def claim_spawn(self, group_id, name_lower):
+        """နာမည်ကိုက်ရင် Spawn ကို Atomic ဖျက်ပြီး Character Object ပြန်ပေးပါ။ (တပြိုင်နက် ခေါ်ရင် တစ်ခုတည်းသာ ရ)"""
+        raise NotImplementedError
+
+    def expire_spawns(self, cutoff, limit):
+        """
+        spawned_at <= cutoff ဖြစ်တဲ့ Spawn (အဟောင်းဆုံးက အရင်) limit ခုကို Atomic ဖျက်ပြီး
+        [(group_id, character_object), ...] ပြန်ပေးပါ။ (claim_spawn နဲ့ ပြိုင်ရင် တစ်ခုတည်းသာ ရ)
+        """
+        raise NotImplementedError
+
+    def watch_changes(self, on_spawn_change, on_spawn_reset, on_catalog_change, on_file_id_change, stop_event):
+        """
+        တခြား Process က Spawn / Catalog ပြင်တာကို စောင့်ကြည့်ပါ။ (Mongo Change Stream)
+        - on_spawn_change(group_id) / on_spawn_reset()
+        - on_catalog_change() : Character ထည့်/ပြင်/ဖျက်
+        - on_file_id_change(char_id, file_id) : file_id ပဲ ပြောင်းတာ (Catalog တစ်ခုလုံး ပြန်မဆွဲရအောင်)
+        Process တစ်ခုတည်းသာ သုံးတဲ့ Backend တွေမှာ ဘာမှ မလုပ်ပါ။ False ပြန်ပေးပါ။
+        """
+        return False
+
+    # --- Harems ---
+
+    def insert_catch(self, record):
+        """
+        harem_record ကို (user_id, character_id) နဲ့ Upsert (count +1၊ caught_at အသစ်) လုပ်ပါ။
+        Character အသစ်ဆိုမှ User+Anime Counter +1၊ Leaderboard (leaderboard_scopes) တွေကိုတော့ အမြဲ +1။
+        """
+        raise NotImplementedError
+
+    def insert_harem_records(self, records):
+        """
+        Harem Document (HAREM_FIELDS) အများကြီးကို Counter မပြင်ဘဲ ထည့်ပါ။ (Seed အတွက် - ပြီးရင် rebuild_collection_counters)
+        (user_id, character_id) တူတာ (ရှိပြီးသား / records ထဲမှာ ထပ်) ဆိုရင် count ပေါင်းပြီး caught_at အသစ်ဆုံး / first_caught_at အဟောင်းဆုံး ယူပါ။
+        """
+        raise NotImplementedError
+
+    def get_user_harem(self, user_id):
+        """caught_at အသစ်ဆုံးက အရင် (Legacy Document တွေပါ)"""
+        raise NotImplementedError
+
+    def get_user_harem_page(self, user_id, after, character_ids, limit):
+        """
+        Keyset Pagination (caught_at, _id) DESC။ HAREM_PAGE_FIELDS + "_id" ပဲ ပြန်ပေးပါ။
+        character_ids ပေးရင် အဲ့ Character တွေပဲ (Legacy Document မပါ)။
+        (docs, next_cursor) - နောက်ထပ် မရှိရင် next_cursor က None
+        """
+        raise NotImplementedError
+
+    def get_anime_collection_progress(self, user_id, anime_name):
+        """(user_count, total) - user_count က မတူတဲ့ Character အရေအတွက်"""
+        raise NotImplementedError
+
+    def rebuild_collection_counters(self):
+        """Counter တွေကို Characters / Harems (Characters နဲ့ Join) ကနေ ပြန်တွက်ပြီး အရေအတွက် ပြန်ပေးပါ။"""
+        raise NotImplementedError
+
+    def count_user_characters(self, user_id, character_ids):
+        """character_ids ထဲက User ဖမ်းထားတဲ့ (မတူတဲ့) Character အရေအတွက်"""
+        raise NotImplementedError
+
+    # --- Harem Migration (Legacy -> Compact) ---
+
+    def migrate_legacy_harems(self, character_ids_by_name, after, limit):
+        """
+        after နောက်က Legacy Document limit ခုကို Compact ပုံစံ ပြောင်းပါ။ (Bot run နေတုန်း လုပ်လို့ရ)
+        character_ids_by_name: name_lower -> Character _id (Catalog မှာ မရှိတဲ့ နာမည်ဆိုရင် မပြောင်းဘဲ ချန်ထားပါ)
+        ပြတ်သွားလို့ ပြန် run ရင်လည်း Count နှစ်ခါ မတိုးရပါ။
+        (last_id, converted, skipped) ပြန်ပေးပါ။ ကျန်တာ မရှိရင် None။
+        """
+        return None
+
+    def finish_harem_migration(self):
+        """Migration ပြီးရင် Legacy Index / Bookkeeping Field တွေ ရှင်းပါ။"""
+
+    def harem_storage_stats(self):
+        """{"documents", "legacy_documents", "data_bytes", "index_bytes"} (Backend က မသိရင် Byte တွေက None)"""
+        raise NotImplementedError
+
+    # --- Leaderboards ---
+
+    def get_leaderboard(self, scope, limit):
+        """Count အများဆုံး User limit ယောက် [{"user_id", "user_name", "count"}, ...] (Index နဲ့ - Catch အရေအတွက် မမူတည်)"""
+        raise NotImplementedError
+
+    def rebuild_leaderboards(self):
+        """
+        global / rarity Leaderboard Count တွေကို Harem ကနေ ပြန်တွက်ပြီး (Reconcile) Entry အရေအတွက် ပြန်ပေးပါ။
+        GROUP_SCOPE_PREFIX Scope တွေကို မဖျက် / မပြင်ပါ။ (Harem မှာ Group အလိုက် count မရှိလို့)
+        """
+        raise NotImplementedError
+
+    # --- Admin ---
+
+    def explain_queries(self):
+        """[(function_name, index_backed, stages), ...] (Query Planner မရှိတဲ့ Backend ဆိုရင် [])"""
+        return []
+
+    def wipe(self):
+        """
+        Data အားလုံး ဖျက်ပြီး [(collection_name, deleted_count), ...] ပြန်ပေးပါ။
+        (Document တစ်ခုချင်း မဖျက်ဘဲ Collection / Table ကို Drop ပြီး Index နဲ့တကွ ပြန်ဆောက်ပါ)
+        """
+        raise NotImplementedError
+
+    # --- Backup / Restore (backup.py) ---
+
+    def backup_collections(self):
+        """Backup ထဲ ထည့်ရမယ့် Collection (Table) နာမည်များ"""
+        raise NotImplementedError
+
+    def iter_documents(self, collection_name, batch_size):
+        """Collection ထဲက Document တွေကို batch_size ခုစီ List အဖြစ် yield ပါ။ (Collection တစ်ခုလုံး Memory ထဲ မထည့်ပါ)"""
+        raise NotImplementedError
+
+    def restore_documents(self, collection_name, docs):
+        """Backup ထဲက Document တွေကို (_id မပြောင်းဘဲ) ထည့်ပြီး အရေအတွက် ပြန်ပေးပါ။ (wipe ပြီးမှ ခေါ်ပါ)"""
+        raise NotImplementedError
+
+    def finish_restore(self):
+        """Restore ပြီးရင် Index (နဲ့ Backup ထဲ မပါတဲ့ Counter) တွေ ပြန်ဆောက်ပါ။"""
+        self.ensure_indexes()
+
+
+def page_with_cursor(docs, limit):
+    """limit + 1 ခု ယူထားတဲ့ docs ကနေ (page, next_cursor) ထုတ်ပါ။"""
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        return docs, (last.get("caught_at"), last["_id"])
+    return docs, None
@@ -0,0 +1,376 @@
+# storage_memory.py
+#
+# Process တစ်ခုတည်းအတွက် In-memory Backend (Test / Benchmark / DB Server မလိုတဲ့ Deployment အသေး)
+# Restart လုပ်ရင် Data အားလုံး ပျောက်ပါမည်။
+
+import bisect
+import heapq
+import itertools
+import threading
+
+from storage_base import GameStorage, HAREM_PAGE_FIELDS, page_with_cursor, leaderboard_scope, leaderboard_scopes, GROUP_SCOPE_PREFIX
+
+
+def _harem_sort_key(doc):
+    return (doc["caught_at"], doc["_id"])
+
+
+class MemoryStorage(GameStorage):
+    """Dict နဲ့ သိမ်းထားတဲ့ Backend (Thread Pool ကနေ ခေါ်လို့ Lock တစ်ခုနဲ့ ကာထားပါ)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._reset()
+
+    def _reset(self):
+        self.characters = {}          # _id -> doc
+        self.character_by_name = {}   # name_lower -> _id
+        self.harems = {}              # user_id -> [doc, ...] (caught_at, _id) အစဉ်
+        self.harem_entries = {}       # (user_id, character_id) -> doc
+        self.spawns = {}              # group_id -> {"active_character", "spawned_at"}
+        self.groups = {}              # group_id -> {"name", "joined_at", "last_caught_by"}
+        self.group_counters = {}      # group_id -> {"_id", "count", "last_user_id", "streak"}
+        self.anime_counts = {}        # anime -> count
+        self.user_anime_counts = {}   # (user_id, anime) -> count
+        self.leaderboards = {}        # scope -> {user_id: [count, user_name]}
+
+    # --- Groups ---
+
+    def add_group(self, chat_id, group_name, joined_at):
+        with self._lock:
+            self.groups.setdefault(chat_id, {}).update(name=group_name, joined_at=joined_at)
+
+    def set_group_last_catcher(self, group_id, user_name):
+        with self._lock:
+            group = self.groups.get(group_id)
+            if group is not None:
+                group["last_caught_by"] = user_name
+
+    def get_group_last_catcher(self, group_id):
+        with self._lock:
+            return self.groups.get(group_id, {}).get("last_caught_by")
+
+    def remove_group(self, chat_id):
+        with self._lock:
+            self.groups.pop(chat_id, None)
+            self.group_counters.pop(chat_id, None)
+            self.spawns.pop(chat_id, None)
+            self.leaderboards.pop(leaderboard_scope(group_id=chat_id), None)
+
+    def get_all_groups(self):
+        with self._lock:
+            return list(self.groups)
+
+    def get_group_ids_page(self, after=None, limit=500):
+        with self._lock:
+            ids = sorted(gid for gid in self.groups if after is None or gid > after)
+        return ids[:limit]
+
+    def load_group_counter(self, chat_id):
+        with self._lock:
+            doc = self.group_counters.get(chat_id)
+            return dict(doc) if doc else None
+
+    def save_group_counters(self, rows):
+        with self._lock:
+            for chat_id, (count, last_user_id, streak) in rows.items():
+                self.group_counters[chat_id] = {
+                    "_id": chat_id, "count": count, "last_user_id": last_user_id, "streak": streak
+                }
+        return len(rows)
+
+    # --- Characters ---
+
+    def _adjust_anime(self, anime, delta):
+        self.anime_counts[anime] = self.anime_counts.get(anime, 0) + delta
+
+    def _upsert(self, fields):
+        """(_id, existed) - self._lock ကို ယူထားပြီးမှ ခေါ်ပါ။"""
+        char_id = self.character_by_name.get(fields["name_lower"])
+        if char_id is None:
+            char_id = next(self._ids)
+            self.characters[char_id] = {"_id": char_id, **fields}
+            self.character_by_name[fields["name_lower"]] = char_id
+            self._adjust_anime(fields["anime"], 1)
+            return char_id, False
+        doc = self.characters[char_id]
+        if doc.get("anime") != fields["anime"]:
+            self._adjust_anime(doc.get("anime"), -1)
+            self._adjust_anime(fields["anime"], 1)
+        if doc.get("image_url") != fields["image_url"]:
+            doc.pop("file_id", None) # (ပုံ ပြောင်းမှ Telegram file_id အဟောင်းကို ဖျက်ပါ)
+        doc.update(fields)
+        return char_id, True
+
+    def add_character(self, fields):
+        with self._lock:
+            return self._upsert(fields)[0]
+
+    def bulk_upsert_characters(self, rows):
+        inserted, updated = 0, 0
+        with self._lock:
+            for fields in rows:
+                if self._upsert(fields)[1]:
+                    updated += 1
+                else:
+                    inserted += 1
+        return inserted, updated
+
+    def iter_characters(self):
+        with self._lock:
+            return [dict(doc) for doc in self.characters.values()]
+
+    def set_character_file_id(self, char_id, file_id):
+        with self._lock:
+            doc = self.characters.get(char_id)
+            if doc is not None:
+                doc["file_id"] = file_id
+
+    def clear_character_file_id(self, char_id):
+        with self._lock:
+            doc = self.characters.get(char_id)
+            if doc is not None:
+                doc.pop("file_id", None)
+
+    def get_characters_without_file_id(self):
+        with self._lock:
+            return [
+                {"_id": doc["_id"], "name": doc.get("name"), "image_url": doc.get("image_url")}
+                for doc in self.characters.values() if "file_id" not in doc
+            ]
+
+    # --- Spawns ---
+
+    def set_active_spawn(self, group_id, character_object, spawned_at):
+        with self._lock:
+            if character_object is None:
+                self.spawns.pop(group_id, None)
+            else:
+                self.spawns[group_id] = {"active_character": character_object, "spawned_at": spawned_at}
+
+    def get_active_spawn(self, group_id):
+        with self._lock:
+            spawn = self.spawns.get(group_id)
+            return spawn["active_character"] if spawn else None
+
+    def claim_spawn(self, group_id, name_lower):
+        with self._lock:
+            spawn = self.spawns.get(group_id)
+            if not spawn or spawn["active_character"].get("name_lower") != name_lower:
+                return None
+            del self.spawns[group_id]
+            return spawn["active_character"]
+
+    def expire_spawns(self, cutoff, limit):
+        with self._lock:
+            due = sorted(
+                (spawn["spawned_at"], group_id) for group_id, spawn in self.spawns.items() if spawn["spawned_at"] <= cutoff
+            )[:limit]
+            return [(group_id, self.spawns.pop(group_id)["active_character"]) for _, group_id in due]
+
+    # --- Harems ---
+
+    def _place_harem(self, doc):
+        harem = self.harems.setdefault(doc["user_id"], [])
+        if not harem or _harem_sort_key(harem[-1]) <= _harem_sort_key(doc):
+            harem.append(doc) # (အများအားဖြင့် အသစ်ဆုံးက နောက်ဆုံးမှာ)
+        else:
+            bisect.insort(harem, doc, key=_harem_sort_key)
+
+    def _unplace_harem(self, doc):
+        harem = self.harems[doc["user_id"]]
+        i = bisect.bisect_left(harem, _harem_sort_key(doc), key=_harem_sort_key)
+        while harem[i] is not doc:
+            i += 1
+        del harem[i]
+
+    def _upsert_harem(self, user_id, character_id, user_name, count, caught_at, first_caught_at):
+        """(doc, is_new) - self._lock ကို ယူထားပြီးမှ ခေါ်ပါ။"""
+        doc = self.harem_entries.get((user_id, character_id))
+        if doc is None:
+            doc = {
+                "_id": next(self._ids), "user_id": user_id, "user_name": user_name, "character_id": character_id,
+                "count": count, "caught_at": caught_at, "first_caught_at": first_caught_at,
+            }
+            self.harem_entries[(user_id, character_id)] = doc
+            self._place_harem(doc)
+            return doc, True
+        self._unplace_harem(doc) # (caught_at ပြောင်းလို့ နေရာ ပြန်ချပါ)
+        doc["count"] += count
+        doc["user_name"] = user_name
+        doc["caught_at"] = max(doc["caught_at"], caught_at)
+        doc["first_caught_at"] = min(doc["first_caught_at"], first_caught_at)
+        self._place_harem(doc)
+        return doc, False
+
+    def insert_catch(self, record):
+        with self._lock:
+            _, is_new = self._upsert_harem(
+                record["user_id"], record["character_id"], record.get("user_name"), 1, record["caught_at"], record["caught_at"]
+            )
+            if is_new:
+                key = (record["user_id"], record.get("character_anime"))
+                self.user_anime_counts[key] = self.user_anime_counts.get(key, 0) + 1
+            self._count_leaderboards(record)
+
+    def _count_leaderboards(self, record, count=1):
+        for scope in leaderboard_scopes(record):
+            entry = self.leaderboards.setdefault(scope, {}).setdefault(record["user_id"], [0, None])
+            entry[0] += count
+            entry[1] = record.get("user_name")
+
+    def insert_harem_records(self, records):
+        with self._lock:
+            for record in records:
+                self._upsert_harem(
+                    record["user_id"], record["character_id"], record.get("user_name"), record.get("count", 1),
+                    record["caught_at"], record.get("first_caught_at") or record["caught_at"]
+                )
+        return len(records)
+
+    def get_user_harem(self, user_id):
+        with self._lock:
+            return [dict(doc) for doc in reversed(self.harems.get(user_id, []))]
+
+    def get_user_harem_page(self, user_id, after, character_ids, limit):
+        with self._lock:
+            harem = self.harems.get(user_id, [])
+            end = len(harem)
+            if after is not None:
+                end = bisect.bisect_left(harem, tuple(after), key=_harem_sort_key)
+            wanted = set(character_ids) if character_ids is not None else None
+            docs = []
+            for i in range(end - 1, -1, -1):
+                doc = harem[i]
+                if wanted is not None and doc["character_id"] not in wanted:
+                    continue
+                docs.append({"_id": doc["_id"], **{field: doc.get(field) for field in HAREM_PAGE_FIELDS if field in doc}})
+                if len(docs) > limit:
+                    break
+        return page_with_cursor(docs, limit)
+
+    def get_anime_collection_progress(self, user_id, anime_name):
+        with self._lock:
+            return self.user_anime_counts.get((user_id, anime_name), 0), self.anime_counts.get(anime_name, 0)
+
+    def _character_field(self, character_id, field):
+        return self.characters.get(character_id, {}).get(field)
+
+    def rebuild_collection_counters(self):
+        with self._lock:
+            self.anime_counts = {}
+            for doc in self.characters.values():
+                self._adjust_anime(doc.get("anime"), 1)
+            self.user_anime_counts = {}
+            for user_id, character_id in self.harem_entries:
+                key = (user_id, self._character_field(character_id, "anime"))
+                self.user_anime_counts[key] = self.user_anime_counts.get(key, 0) + 1
+            return len(self.anime_counts) + len(self.user_anime_counts)
+
+    def count_user_characters(self, user_id, character_ids):
+        with self._lock:
+            return sum(1 for character_id in character_ids if (user_id, character_id) in self.harem_entries)
+
+    def harem_storage_stats(self):
+        with self._lock:
+            return {"documents": len(self.harem_entries), "legacy_documents": 0, "data_bytes": None, "index_bytes": None}
+
+    # --- Leaderboards ---
+
+    def get_leaderboard(self, scope, limit):
+        with self._lock:
+            entries = self.leaderboards.get(scope, {})
+            top = heapq.nlargest(limit, entries.items(), key=lambda item: item[1][0])
+            return [{"user_id": user_id, "user_name": name, "count": count} for user_id, (count, name) in top]
+
+    def rebuild_leaderboards(self):
+        with self._lock:
+            # group Scope တွေက Harem ကနေ ပြန်မတွက်နိုင်လို့ ချန်ထားပါ
+            self.leaderboards = {
+                scope: entries for scope, entries in self.leaderboards.items() if scope.startswith(GROUP_SCOPE_PREFIX)
+            }
+            for doc in self.harem_entries.values():
+                record = {
+                    "user_id": doc["user_id"], "user_name": doc.get("user_name"),
+                    "character_rarity": self._character_field(doc["character_id"], "rarity"),
+                }
+                self._count_leaderboards(record, doc["count"])
+            return sum(len(entries) for entries in self.leaderboards.values())
+
+    # --- Admin ---
+
+    def wipe(self):
+        with self._lock:
+            wiped = [
+                ("characters", len(self.characters)),
+                ("user_harems", len(self.harem_entries)),
+                ("group_spawns", len(self.spawns)),
+                ("active_groups", len(self.groups)),
+                ("collection_counters", len(self.anime_counts) + len(self.user_anime_counts)),
+                ("group_counters", len(self.group_counters)),
+                ("leaderboards", sum(len(entries) for entries in self.leaderboards.values())),
+            ]
+            self._reset()
+        return wiped
+
+    # --- Backup / Restore ---
+    # (collection_counters က Harem / Character ကနေ ပြန်တွက်လို့ရလို့ Backup ထဲ မထည့်ပါ)
+
+    def backup_collections(self):
+        return ["characters", "user_harems", "group_spawns", "active_groups", "group_counters", "leaderboards"]
+
+    def _snapshot_documents(self, collection_name):
+        with self._lock:
+            if collection_name == "characters":
+                return [dict(doc) for doc in self.characters.values()]
+            if collection_name == "user_harems":
+                return [dict(doc) for doc in self.harem_entries.values()]
+            if collection_name == "group_spawns":
+                return [{"_id": group_id, **spawn} for group_id, spawn in self.spawns.items()]
+            if collection_name == "active_groups":
+                return [{"_id": group_id, **group} for group_id, group in self.groups.items()]
+            if collection_name == "group_counters":
+                return [dict(doc) for doc in self.group_counters.values()]
+            if collection_name == "leaderboards":
+                return [
+                    {"scope": scope, "user_id": user_id, "user_name": user_name, "count": count}
+                    for scope, entries in self.leaderboards.items()
+                    for user_id, (count, user_name) in entries.items()
+                ]
+        raise ValueError(f"Unknown collection: {collection_name}")
+
+    def iter_documents(self, collection_name, batch_size):
+        docs = self._snapshot_documents(collection_name) # (Lock ကို ကြာကြာ မကိုင်ထားရအောင် အရင် ကူးပါ)
+        for start in range(0, len(docs), batch_size):
+            yield docs[start:start + batch_size]
+
+    def restore_documents(self, collection_name, docs):
+        with self._lock:
+            for doc in docs:
+                doc = dict(doc)
+                if collection_name == "characters":
+                    self.characters[doc["_id"]] = doc
+                    self.character_by_name[doc["name_lower"]] = doc["_id"]
+                elif collection_name == "user_harems":
+                    self.harem_entries[(doc["user_id"], doc["character_id"])] = doc
+                    self._place_harem(doc)
+                elif collection_name == "group_spawns":
+                    self.spawns[doc.pop("_id")] = doc
+                elif collection_name == "active_groups":
+                    self.groups[doc.pop("_id")] = doc
+                elif collection_name == "group_counters":
+                    self.group_counters[doc["_id"]] = doc
+                elif collection_name == "leaderboards":
+                    self.leaderboards.setdefault(doc["scope"], {})[doc["user_id"]] = [doc["count"], doc.get("user_name")]
+                else:
+                    raise ValueError(f"Unknown collection: {collection_name}")
+            if docs and collection_name in ("characters", "user_harems"):
+                # (နောက်ထည့်မယ့် Document တွေရဲ့ _id မထပ်အောင်)
+                self._ids = itertools.count(max(max(doc["_id"] for doc in docs) + 1, next(self._ids)))
+        return len(docs)
+
+    def finish_restore(self):
+        self.rebuild_collection_counters()
@@ -0,0 +1,652 @@
+# storage_mongo.py
+
+import time
+from datetime import datetime, timezone
+
+import pymongo
+
+from storage_base import GameStorage, HAREM_PAGE_FIELDS, page_with_cursor, leaderboard_scope, leaderboard_scopes, GROUP_SCOPE_PREFIX
+
+# --- Indexes ---
+# (collection, keys, options) - Query တိုင်း Collection Scan မဖြစ်အောင်
+INDEX_SPECS = [
+    ("characters", [("name_lower", pymongo.ASCENDING)], {"unique": True, "name": "name_lower_unique"}),
+    ("characters", [("anime", pymongo.ASCENDING)], {"name": "anime"}),
+    ("user_harems", [("user_id", pymongo.ASCENDING), ("caught_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], {"name": "user_caught_at"}),
+    # (Legacy Document တွေမှာ character_id မရှိလို့ Partial)
+    ("user_harems", [("user_id", pymongo.ASCENDING), ("character_id", pymongo.ASCENDING)],
+     {"unique": True, "name": "user_character_unique", "partialFilterExpression": {"character_id": {"$exists": True}}}),
+    ("leaderboards", [("scope", pymongo.ASCENDING), ("count", pymongo.DESCENDING)], {"name": "scope_count"}),
+]
+
+# Harem Compact ပုံစံ မပြောင်းခင်က Index များ (finish_harem_migration က ဖျက်ပါ)
+LEGACY_HAREM_INDEXES = ("user_anime_caught_at", "user_rarity_caught_at")
+
+LEADERBOARD_WRITE_CHUNK = 1000
+COUNTER_WRITE_CHUNK = 1000
+
+SPAWN_TTL_INDEX = "spawned_at_ttl"
+
+HAREM_PAGE_PROJECTION = {field: 1 for field in HAREM_PAGE_FIELDS}
+
+# --- Collection Counters ---
+# {"_id": {"a": anime}, "count": N}            -> ဒီ Anime မှာ Character ဘယ်နှစ်ကောင်
+# {"_id": {"u": user_id, "a": anime}, "count": N} -> User က ဒီ Anime ထဲက ဘယ်နှစ်ကောင် ဖမ်းပြီးပြီလဲ
+
+def _anime_counter_key(anime_name):
+    return {"_id": {"a": anime_name}}
+
+def _user_anime_counter_key(user_id, anime_name):
+    return {"_id": {"u": user_id, "a": anime_name}}
+
+def _character_upsert(fields):
+    # Aggregation Pipeline Update: image_url ပြောင်းမှ file_id ကို ဖျက်ပါ (Stage တစ်ခုထဲမှာ "$image_url" က Update မလုပ်ခင် Value)
+    # (Field Value တွေက "$" နဲ့ စရင် Field Path လို့ မယူအောင် $literal)
+    return [{"$set": {
+        **{field: {"$literal": value} for field, value in fields.items()},
+        "file_id": {"$cond": [{"$eq": ["$image_url", {"$literal": fields["image_url"]}]}, "$file_id", "$$REMOVE"]},
+    }}]
+
+def _counter_inc(key, delta=1):
+    # (stale ကို ဖျက်ပါ - rebuild_collection_counters လုပ်နေတုန်း တိုးသွားတဲ့ Counter ကို အဟောင်းလို့ မဖျက်မိအောင်)
+    return pymongo.UpdateOne(key, {"$inc": {"count": delta}, "$unset": {"stale": ""}}, upsert=True)
+
+
+# --- Leaderboards ---
+# {"_id": {"s": scope, "u": user_id}, "scope", "user_id", "user_name", "count", "updated_at"}
+
+def _leaderboard_upsert(scope, user_id, user_name, now):
+    return pymongo.UpdateOne(
+        {"_id": {"s": scope, "u": user_id}},
+        {"$inc": {"count": 1}, "$set": {"scope": scope, "user_id": user_id, "user_name": user_name, "updated_at": now}},
+        upsert=True
+    )
+
+
+# --- Harem ---
+# Legacy Document ကို Catalog နဲ့ Join ဖို့ (character_id ရှိရင် Characters ကနေ၊ မရှိရင် ကူးထားတဲ့ Field)
+_HAREM_CHARACTER_LOOKUP = {"$lookup": {"from": "characters", "localField": "character_id", "foreignField": "_id", "as": "c"}}
+
+def _joined_field(character_field, legacy_field):
+    return {"$ifNull": [{"$arrayElemAt": [f"$c.{character_field}", 0]}, f"${legacy_field}"]}
+
+_HAREM_COUNT = {"$ifNull": ["$count", 1]} # (Legacy Document က Catch တစ်ခု)
+
+
+def _legacy_caught_at(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _plan_stages(plan):
+    """Explain plan ထဲက stage နာမည်တွေ အကုန် ထုတ်ပါ။"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+class MongoStorage(GameStorage):
+    """MongoDB Backend (Production)"""
+
+    name = "mongo"
+
+    def __init__(self, mongo_url, db_name, spawn_ttl_seconds=None):
+        self.client = pymongo.MongoClient(mongo_url)
+        self.db = self.client[db_name]
+        self.spawn_ttl_seconds = spawn_ttl_seconds # (None ဆိုရင် TTL Index မဆောက်ပါ)
+
+        self.characters_collection = self.db["characters"] # Character အားလုံး (Admin ထည့်ရန်)
+        self.user_harems_collection = self.db["user_harems"]   # User တွေ ဖမ်းမိထားတာ
+        self.group_spawns_collection = self.db["group_spawns"] # Group မှာ ဘာပေါ်နေလဲ
+        self.active_groups_collection = self.db["active_groups"] # Bot ရှိနေတဲ့ Group list
+        self.collection_counters_collection = self.db["collection_counters"] # User+Anime / Anime အလိုက် Count
+        self.group_counters_collection = self.db["group_counters"] # Group Message Count (Restart ပြီးလည်း မပျောက်အောင်)
+        self.leaderboards_collection = self.db["leaderboards"] # Scope (global / group / rarity) + User အလိုက် Catch Count
+
+    def ensure_indexes(self):
+        for collection_name, keys, options in INDEX_SPECS:
+            try:
+                self.db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                print(f"❌ Index '{options.get('name')}' ({collection_name}) ဆောက်ရာတွင် Error: {e}")
+        if self.spawn_ttl_seconds:
+            self._ensure_spawn_ttl_index(int(self.spawn_ttl_seconds))
+
+    def _ensure_spawn_ttl_index(self, seconds):
+        # Bot က Expire မလုပ်နိုင်ခဲ့တဲ့ Spawn (Bot ပိတ်ထား / Group ပျောက်) တွေကို Mongo ကိုယ်တိုင် ဖျက်ပါ
+        try:
+            self.group_spawns_collection.create_index(
+                [("spawned_at", pymongo.ASCENDING)], name=SPAWN_TTL_INDEX, expireAfterSeconds=seconds
+            )
+        except pymongo.errors.OperationFailure as e:
+            if e.code not in (85, 86): # IndexOptionsConflict / IndexKeySpecsConflict (Seconds ပြောင်းသွားတာ)
+                print(f"❌ Index '{SPAWN_TTL_INDEX}' (group_spawns) ဆောက်ရာတွင် Error: {e}")
+                return
+            self.db.command("collMod", self.group_spawns_collection.name,
+                            index={"name": SPAWN_TTL_INDEX, "expireAfterSeconds": seconds})
+
+    def close(self):
+        self.client.close()
+
+    # --- Groups ---
+
+    def add_group(self, chat_id, group_name, joined_at):
+        self.active_groups_collection.update_one(
+            {"_id": chat_id},
+            {"$set": {"name": group_name, "joined_at": joined_at}},
+            upsert=True
+        )
+
+    def set_group_last_catcher(self, group_id, user_name):
+        self.active_groups_collection.update_one(
+            {"_id": group_id},
+            {"$set": {"last_caught_by": user_name}}
+        )
+
+    def get_group_last_catcher(self, group_id):
+        doc = self.active_groups_collection.find_one({"_id": group_id})
+        return doc.get("last_caught_by") if doc else None
+
+    def remove_group(self, chat_id):
+        self.active_groups_collection.delete_one({"_id": chat_id})
+        self.group_counters_collection.delete_one({"_id": chat_id})
+        self.group_spawns_collection.delete_one({"_id": chat_id})
+        self.leaderboards_collection.delete_many({"scope": leaderboard_scope(group_id=chat_id)})
+
+    def get_all_groups(self):
+        return [doc["_id"] for doc in self.active_groups_collection.find({}, {"_id": 1})]
+
+    def get_group_ids_page(self, after=None, limit=500):
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        cursor = self.active_groups_collection.find(query, {"_id": 1}).sort("_id", 1).limit(limit)
+        return [doc["_id"] for doc in cursor]
+
+    def load_group_counter(self, chat_id):
+        return self.group_counters_collection.find_one({"_id": chat_id})
+
+    def save_group_counters(self, rows):
+        ops = [
+            pymongo.UpdateOne(
+                {"_id": chat_id},
+                {"$set": {"count": count, "last_user_id": last_user_id, "streak": streak}},
+                upsert=True
+            )
+            for chat_id, (count, last_user_id, streak) in rows.items()
+        ]
+        self.group_counters_collection.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    # --- Characters ---
+
+    def add_character(self, fields):
+        before = self.characters_collection.find_one_and_update(
+            {"name_lower": fields["name_lower"]},
+            _character_upsert(fields), # ပုံ ပြောင်းမှ Telegram file_id အဟောင်းကို ဖျက်ပါ
+            projection={"anime": 1},
+            upsert=True,
+            return_document=pymongo.ReturnDocument.BEFORE
+        )
+        # Anime Counter ကို ပြင်ပါ (အသစ်ဆိုရင် +1၊ Anime ပြောင်းသွားရင် အဟောင်း -1 / အသစ် +1)
+        anime = fields["anime"]
+        old_anime = before.get("anime") if before else None
+        if before is None or old_anime != anime:
+            ops = [_counter_inc(_anime_counter_key(anime))]
+            if before is not None:
+                ops.append(_counter_inc(_anime_counter_key(old_anime), -1))
+            self.collection_counters_collection.bulk_write(ops, ordered=False)
+        if before is not None:
+            return before["_id"]
+        inserted = self.characters_collection.find_one({"name_lower": fields["name_lower"]}, {"_id": 1})
+        return inserted["_id"] if inserted else None
+
+    def bulk_upsert_characters(self, rows):
+        names = list({row["name_lower"] for row in rows})
+        current_anime = {
+            doc["name_lower"]: doc.get("anime")
+            for doc in self.characters_collection.find({"name_lower": {"$in": names}}, {"name_lower": 1, "anime": 1})
+        }
+
+        ops = []
+        anime_deltas = {}
+        inserted, updated = 0, 0
+        for fields in rows:
+            name_lower = fields["name_lower"]
+            anime = fields["anime"]
+            if name_lower in current_anime:
+                updated += 1
+                old_anime = current_anime[name_lower]
+                if old_anime != anime:
+                    anime_deltas[old_anime] = anime_deltas.get(old_anime, 0) - 1
+                    anime_deltas[anime] = anime_deltas.get(anime, 0) + 1
+            else:
+                inserted += 1
+                anime_deltas[anime] = anime_deltas.get(anime, 0) + 1
+            current_anime[name_lower] = anime
+            ops.append(pymongo.UpdateOne(
+                {"name_lower": name_lower},
+                _character_upsert(fields),
+                upsert=True
+            ))
+
+        self.characters_collection.bulk_write(ops, ordered=True) # (နာမည်တူ ထပ်ပါရင် နောက်ဆုံးတစ်ခု အနိုင်ရအောင်)
+        counter_ops = [
+            _counter_inc(_anime_counter_key(anime), delta)
+            for anime, delta in anime_deltas.items() if delta
+        ]
+        if counter_ops:
+            self.collection_counters_collection.bulk_write(counter_ops, ordered=False)
+        return inserted, updated
+
+    def iter_characters(self):
+        return self.characters_collection.find({})
+
+    def set_character_file_id(self, char_id, file_id):
+        self.characters_collection.update_one({"_id": char_id}, {"$set": {"file_id": file_id}})
+
+    def clear_character_file_id(self, char_id):
+        self.characters_collection.update_one({"_id": char_id}, {"$unset": {"file_id": ""}})
+
+    def get_characters_without_file_id(self):
+        return list(self.characters_collection.find(
+            {"file_id": {"$exists": False}},
+            {"_id": 1, "name": 1, "image_url": 1}
+        ))
+
+    # --- Spawns ---
+
+    def set_active_spawn(self, group_id, character_object, spawned_at):
+        if character_object is None:
+            # ဖမ်းမိသွားရင် DB ထဲက ဖျက်ပါ
+            self.group_spawns_collection.delete_one({"_id": group_id})
+        else:
+            # (ပြင်ဆင်ပြီး) Object တစ်ခုလုံးကို သိမ်းပါ
+            self.group_spawns_collection.update_one(
+                {"_id": group_id},
+                {"$set": {
+                    "active_character": character_object,
+                    "spawned_at": spawned_at
+                }},
+                upsert=True
+            )
+
+    def get_active_spawn(self, group_id):
+        spawn_data = self.group_spawns_collection.find_one({"_id": group_id})
+        return spawn_data.get("active_character") if spawn_data else None
+
+    def claim_spawn(self, group_id, name_lower):
+        # (find_one_and_delete - တပြိုင်နက် ဖမ်းကြရင် တစ်ယောက်တည်းသာ Object ရပါမည်)
+        spawn_data = self.group_spawns_collection.find_one_and_delete({
+            "_id": group_id,
+            "active_character.name_lower": name_lower
+        })
+        return spawn_data.get("active_character") if spawn_data else None
+
+    def expire_spawns(self, cutoff, limit):
+        due = list(self.group_spawns_collection.find(
+            {"spawned_at": {"$lte": cutoff}}, {"spawned_at": 1}
+        ).sort("spawned_at", pymongo.ASCENDING).limit(limit))
+        expired = []
+        for spawn in due:
+            # (spawned_at ပါ စစ်ပြီး Atomic ဖျက်ပါ - ကြားထဲ ဖမ်းသွား / Spawn အသစ် ပေါ်လာရင် None ရလို့ မထည့်ပါ)
+            # (bulk_write DeleteOne ဆိုရင် ဘယ်ဟာ ငါတို့ ဖျက်တာလဲ မသိရလို့ ဖမ်းပြီးသား Spawn ကိုပါ "ပြေးသွားပြီ" ပြမိပါမည်)
+            spawn_data = self.group_spawns_collection.find_one_and_delete(
+                {"_id": spawn["_id"], "spawned_at": spawn["spawned_at"]}, {"active_character": 1}
+            )
+            if spawn_data:
+                expired.append((spawn_data["_id"], spawn_data.get("active_character")))
+        return expired
+
+    def watch_changes(self, on_spawn_change, on_spawn_reset, on_catalog_change, on_file_id_change, stop_event):
+        # Replica Set မဟုတ်တဲ့ Mongo မှာ Change Stream မရပါ (Exception တက်ပါမည်)
+        watched = [self.group_spawns_collection.name, self.characters_collection.name]
+        pipeline = [{"$match": {"ns.coll": {"$in": watched}}}]
+        with self.db.watch(pipeline, max_await_time_ms=1000) as stream:
+            print("✅ Spawn / Catalog change stream စတင်ပါပြီ။")
+            while stream.alive and not (stop_event and stop_event.is_set()):
+                change = stream.try_next()
+                if change is None:
+                    continue
+                operation = change.get("operationType")
+                if operation in ("drop", "dropDatabase", "invalidate", "rename"):
+                    on_spawn_reset()
+                    on_catalog_change()
+                    continue
+                doc_key = change.get("documentKey")
+                if change.get("ns", {}).get("coll") == self.group_spawns_collection.name:
+                    if doc_key:
+                        on_spawn_change(doc_key["_id"])
+                    continue
+                # characters
+                description = change.get("updateDescription") or {}
+                changed_fields = set(description.get("updatedFields", {})) | set(description.get("removedFields", []))
+                if operation == "update" and doc_key and changed_fields == {"file_id"}:
+                    on_file_id_change(doc_key["_id"], description.get("updatedFields", {}).get("file_id"))
+                else:
+                    on_catalog_change()
+        return True
+
+    # --- Harems ---
+
+    def insert_catch(self, record):
+        result = self.user_harems_collection.update_one(
+            {"user_id": record["user_id"], "character_id": record["character_id"]},
+            {"$inc": {"count": 1},
+             "$set": {"user_name": record.get("user_name"), "caught_at": record["caught_at"]},
+             "$setOnInsert": {"first_caught_at": record["caught_at"]}},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            # Character အသစ်ဆိုမှ Collection Progress တိုးပါ
+            self.collection_counters_collection.update_one(
+                _user_anime_counter_key(record["user_id"], record.get("character_anime")),
+                {"$inc": {"count": 1}, "$unset": {"stale": ""}}, # (_counter_inc နဲ့ တူ)
+                upsert=True
+            )
+        now = datetime.now(timezone.utc)
+        self.leaderboards_collection.bulk_write([
+            _leaderboard_upsert(scope, record["user_id"], record.get("user_name"), now)
+            for scope in leaderboard_scopes(record)
+        ], ordered=False)
+
+    def insert_harem_records(self, records):
+        # (memory / sqlite နဲ့ တူအောင် User + Character တူရင် Document အသစ် မထည့်ဘဲ count ပေါင်းပါ)
+        if records:
+            self.user_harems_collection.bulk_write([
+                pymongo.UpdateOne(
+                    {"user_id": record["user_id"], "character_id": record["character_id"]},
+                    {"$inc": {"count": record.get("count", 1)},
+                     "$set": {"user_name": record.get("user_name")},
+                     "$max": {"caught_at": record["caught_at"]},
+                     "$min": {"first_caught_at": record.get("first_caught_at") or record["caught_at"]}},
+                    upsert=True
+                ) for record in records
+            ], ordered=True) # (တူတာ ထပ်ပါရင် Upsert နှစ်ခု ပြိုင်ပြီး Unique Index Error မတက်အောင်)
+        return len(records)
+
+    def get_user_harem(self, user_id):
+        return list(self.user_harems_collection.find({"user_id": user_id}).sort("caught_at", -1))
+
+    def get_user_harem_page(self, user_id, after, character_ids, limit):
+        query = {"user_id": user_id}
+        if character_ids is not None:
+            query["character_id"] = {"$in": list(character_ids)}
+        if after is not None:
+            caught_at, last_id = after
+            query["$or"] = [
+                {"caught_at": {"$lt": caught_at}},
+                {"caught_at": caught_at, "_id": {"$lt": last_id}}
+            ]
+            if not isinstance(caught_at, str):
+                # Date နဲ့ String ကို $lt က မနှိုင်းယှဉ်ပါ။ (DESC မှာ Date တွေ ပြီးမှ လာတဲ့) Legacy String တွေ မကျန်အောင်
+                query["$or"].append({"caught_at": {"$type": "string"}})
+        cursor = self.user_harems_collection.find(query, HAREM_PAGE_PROJECTION).sort(
+            [("caught_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+        ).limit(limit + 1)
+        return page_with_cursor(list(cursor), limit)
+
+    def get_anime_collection_progress(self, user_id, anime_name):
+        user_key = _user_anime_counter_key(user_id, anime_name)["_id"]
+        anime_key = _anime_counter_key(anime_name)["_id"]
+        user_count, total = 0, 0
+        for doc in self.collection_counters_collection.find({"_id": {"$in": [user_key, anime_key]}}):
+            if doc["_id"] == user_key:
+                user_count = doc.get("count", 0)
+            else:
+                total = doc.get("count", 0)
+        return user_count, total
+
+    def rebuild_collection_counters(self):
+        # ရှိပြီးသား Counter တွေကို stale မှတ်ပြီး ပြန်ရေးတာ (ReplaceOne) / ကြားထဲ တိုးတာ (_counter_inc) က ဖျက်ပါ။
+        # ပြီးရင်လည်း stale ကျန်နေတာ (ဘယ်အရာမှ မကိုက်တော့တဲ့ အဟောင်း) ကိုပဲ ဖျက်ပါ။
+        # (Key တွေ အကုန် $nin ထဲ ထည့်ရင် 16MB Command Limit ကျော်လို့ / Rebuild နေတုန်း Catch အသစ်ရဲ့ Counter မပျောက်အောင်)
+        generation = time.time_ns()
+        self.collection_counters_collection.update_many({}, {"$set": {"stale": generation}})
+        ops = []
+        written = 0
+
+        def write(key, count):
+            nonlocal ops, written
+            ops.append(pymongo.ReplaceOne(key, {"count": count}, upsert=True))
+            if len(ops) >= COUNTER_WRITE_CHUNK:
+                self.collection_counters_collection.bulk_write(ops, ordered=False)
+                written += len(ops)
+                ops = []
+
+        for row in self.characters_collection.aggregate([
+            {"$group": {"_id": "$anime", "count": {"$sum": 1}}}
+        ]):
+            write(_anime_counter_key(row["_id"]), row["count"])
+        for row in self.user_harems_collection.aggregate([
+            _HAREM_CHARACTER_LOOKUP,
+            {"$group": {
+                "_id": {"u": "$user_id", "a": _joined_field("anime", "character_anime")},
+                "characters": {"$addToSet": {"$ifNull": ["$character_id", "$character_name"]}}
+            }},
+            {"$project": {"count": {"$size": "$characters"}}}
+        ], allowDiskUse=True):
+            write(_user_anime_counter_key(row["_id"].get("u"), row["_id"].get("a")), row["count"])
+
+        if ops:
+            self.collection_counters_collection.bulk_write(ops, ordered=False)
+            written += len(ops)
+        # ဘယ်အရာမှ မကိုက်တော့တဲ့ Counter အဟောင်းတွေ ဖျက်ပါ
+        self.collection_counters_collection.delete_many({"stale": generation})
+        return written
+
+    def count_user_characters(self, user_id, character_ids):
+        return self.user_harems_collection.count_documents({
+            "user_id": user_id,
+            "character_id": {"$in": list(character_ids)}
+        })
+
+    # --- Harem Migration (Legacy -> Compact) ---
+    # Compact Document တွေမှာ ပေါင်းပြီးသား Legacy _id တွေကို migrated_ids ထဲ ခဏ မှတ်ထားပါ။
+    # (Upsert ပြီး Legacy မဖျက်ရခင် ပြတ်သွားရင် ပြန် run တဲ့အခါ နှစ်ခါ မပေါင်းမိအောင် - ပြီးရင် finish_harem_migration က ဖျက်)
+
+    def migrate_legacy_harems(self, character_ids_by_name, after, limit):
+        query = {"character_id": {"$exists": False}}
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        docs = list(self.user_harems_collection.find(query).sort("_id", pymongo.ASCENDING).limit(limit))
+        if not docs:
+            return None
+
+        groups = {} # (user_id, character_id) -> [doc, ...]
+        skipped = 0
+        for doc in docs:
+            character_id = character_ids_by_name.get((doc.get("character_name") or "").lower())
+            if character_id is None:
+                skipped += 1
+                continue
+            groups.setdefault((doc["user_id"], character_id), []).append(doc)
+
+        applied = set()
+        if groups:
+            for target in self.user_harems_collection.find(
+                {"$or": [{"user_id": user_id, "character_id": character_id} for user_id, character_id in groups]},
+                {"migrated_ids": 1}
+            ):
+                applied.update(target.get("migrated_ids", ()))
+
+        ops, op_ids, done_ids = [], [], []
+        for (user_id, character_id), group in groups.items():
+            new = [doc for doc in group if doc["_id"] not in applied]
+            done_ids.extend(doc["_id"] for doc in group if doc["_id"] in applied)
+            if not new:
+                continue
+            new_ids = [doc["_id"] for doc in new]
+            caught = [_legacy_caught_at(doc["caught_at"]) for doc in new]
+            ops.append(pymongo.UpdateOne(
+                {"user_id": user_id, "character_id": character_id, "migrated_ids": {"$nin": new_ids}},
+                {"$inc": {"count": len(new)},
+                 "$max": {"caught_at": max(caught)},
+                 "$min": {"first_caught_at": min(caught)},
+                 "$setOnInsert": {"user_name": new[-1].get("user_name")},
+                 "$push": {"migrated_ids": {"$each": new_ids}}},
+                upsert=True
+            ))
+            op_ids.append(new_ids)
+
+        failed = set()
+        if ops:
+            try:
+                self.user_harems_collection.bulk_write(ops, ordered=False)
+            except pymongo.errors.BulkWriteError as e:
+                # (Catch အသစ်နဲ့ Upsert ပြိုင်မိတာ) - ဒီ Legacy တွေကို မဖျက်ဘဲ နောက်တစ်ခါ ပြန်လုပ်ပါ
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+        for i, ids in enumerate(op_ids):
+            if i not in failed:
+                done_ids.extend(ids)
+        if done_ids:
+            self.user_harems_collection.delete_many({"_id": {"$in": done_ids}})
+        return docs[-1]["_id"], len(done_ids), skipped + sum(len(op_ids[i]) for i in failed)
+
+    def finish_harem_migration(self):
+        self.user_harems_collection.update_many({"migrated_ids": {"$exists": True}}, {"$unset": {"migrated_ids": ""}})
+        existing = set(self.user_harems_collection.index_information())
+        for name in LEGACY_HAREM_INDEXES:
+            if name in existing:
+                self.user_harems_collection.drop_index(name)
+
+    def harem_storage_stats(self):
+        stats = self.db.command("collStats", self.user_harems_collection.name)
+        return {
+            "documents": stats.get("count", 0),
+            "legacy_documents": self.user_harems_collection.count_documents({"character_id": {"$exists": False}}),
+            "data_bytes": stats.get("size"),
+            "index_bytes": stats.get("totalIndexSize"),
+        }
+
+    # --- Leaderboards ---
+
+    def get_leaderboard(self, scope, limit):
+        cursor = self.leaderboards_collection.find(
+            {"scope": scope}, {"_id": 0, "user_id": 1, "user_name": 1, "count": 1}
+        ).sort("count", pymongo.DESCENDING).limit(limit)
+        return list(cursor)
+
+    def rebuild_leaderboards(self):
+        # Reconcile လုပ်နေတုန်း ဝင်လာတဲ့ Catch တွေ (updated_at က started ထက် နောက်ကျ) ကို မဖျက်မိအောင်
+        started = datetime.now(timezone.utc)
+        # ($last က caught_at အစဉ်အတိုင်း ဖြစ်မှ User ရဲ့ နောက်ဆုံး နာမည် ရပါမည် - $lookup / $project က အစဉ် မပြောင်း)
+        by_caught_at = {"$sort": {"caught_at": 1, "_id": 1}}
+        pipelines = [
+            (lambda key: "global", [
+                by_caught_at,
+                {"$group": {"_id": {"u": "$user_id"}, "count": {"$sum": _HAREM_COUNT}, "name": {"$last": "$user_name"}}}
+            ]),
+            (lambda key: leaderboard_scope(rarity=key["r"]), [
+                by_caught_at,
+                _HAREM_CHARACTER_LOOKUP,
+                {"$project": {"user_id": 1, "user_name": 1, "n": _HAREM_COUNT, "r": {"$toLower": _joined_field("rarity", "character_rarity")}}},
+                {"$match": {"r": {"$ne": ""}}},
+                {"$group": {"_id": {"r": "$r", "u": "$user_id"}, "count": {"$sum": "$n"}, "name": {"$last": "$user_name"}}}
+            ]),
+        ]
+        total = 0
+        ops = []
+        for scope_of, pipeline in pipelines:
+            for row in self.user_harems_collection.aggregate(pipeline, allowDiskUse=True):
+                scope, user_id = scope_of(row["_id"]), row["_id"]["u"]
+                ops.append(pymongo.ReplaceOne(
+                    {"_id": {"s": scope, "u": user_id}},
+                    {"scope": scope, "user_id": user_id, "user_name": row.get("name"), "count": row["count"], "updated_at": started},
+                    upsert=True
+                ))
+                if len(ops) >= LEADERBOARD_WRITE_CHUNK:
+                    self.leaderboards_collection.bulk_write(ops, ordered=False)
+                    total += len(ops)
+                    ops = []
+        if ops:
+            self.leaderboards_collection.bulk_write(ops, ordered=False)
+            total += len(ops)
+        # Harem မှာ မရှိတော့တဲ့ Entry အဟောင်းတွေ ဖျက်ပါ (group Scope တွေက Harem ကနေ ပြန်မတွက်နိုင်လို့ ချန်ထားပါ)
+        self.leaderboards_collection.delete_many({
+            "updated_at": {"$lt": started},
+            "scope": {"$not": {"$regex": f"^{GROUP_SCOPE_PREFIX}"}}
+        })
+        return total
+
+    # --- Admin ---
+
+    def _sample_query_values(self):
+        """Explain လုပ်ဖို့ DB ထဲက တကယ့် value တစ်ခုစီ ယူပါ။ (မရှိရင် placeholder)"""
+        harem = self.user_harems_collection.find_one({}, {"user_id": 1, "character_id": 1}) or {}
+        character = self.characters_collection.find_one({}, {"name_lower": 1}) or {}
+        return {
+            "user_id": harem.get("user_id", 0),
+            "character_ids": [harem.get("character_id", 0)],
+            "name_lower": character.get("name_lower", ""),
+        }
+
+    def explain_queries(self):
+        v = self._sample_query_values()
+        checks = [
+            ("add_character", {"find": "characters", "filter": {"name_lower": v["name_lower"]}}),
+            ("get_user_harem", {"find": "user_harems", "filter": {"user_id": v["user_id"]}, "sort": {"caught_at": -1}}),
+            ("get_user_harem_page", {"find": "user_harems", "filter": {"user_id": v["user_id"], "character_id": {"$in": v["character_ids"]}}, "sort": {"caught_at": -1, "_id": -1}}),
+            ("get_user_anime_collection_count", {"count": "user_harems", "query": {"user_id": v["user_id"], "character_id": {"$in": v["character_ids"]}}}),
+            ("get_active_spawn", {"find": "group_spawns", "filter": {"_id": 0}}),
+            ("get_group_last_catcher", {"find": "active_groups", "filter": {"_id": 0}}),
+            ("get_leaderboard", {"find": "leaderboards", "filter": {"scope": "global"}, "sort": {"count": -1}, "limit": 10}),
+        ]
+        if self.spawn_ttl_seconds:
+            checks.append(("expire_spawns", {"find": "group_spawns", "filter": {"spawned_at": {"$lte": datetime.now(timezone.utc)}}, "sort": {"spawned_at": 1}}))
+        report = []
+        for function_name, command in checks:
+            try:
+                result = self.db.command("explain", command, verbosity="queryPlanner")
+                stages = sorted(set(_plan_stages(result.get("queryPlanner", {}).get("winningPlan", {}))))
+                index_backed = "COLLSCAN" not in stages
+            except Exception as e:
+                stages = [f"ERROR: {e}"]
+                index_backed = False
+            report.append((function_name, index_backed, stages))
+        return report
+
+    def _game_collections(self):
+        return [
+            self.characters_collection,
+            self.user_harems_collection,
+            self.group_spawns_collection,
+            self.active_groups_collection,
+            self.collection_counters_collection,
+            self.group_counters_collection,
+            self.leaderboards_collection
+        ]
+
+    def wipe(self):
+        # delete_many က Document တိုင်း (Index Entry တိုင်း) ဖျက်ရလို့ Collection ကြီးရင် အရမ်းကြာပါတယ်
+        # Drop လုပ်ပြီး Index တွေ ပြန်ဆောက်ပါ (Count ကို Metadata ကနေ ယူပါ)
+        wiped = []
+        for collection in self._game_collections():
+            count = collection.estimated_document_count()
+            collection.drop()
+            wiped.append((collection.name, count))
+        self.ensure_indexes()
+        return wiped
+
+    # --- Backup / Restore ---
+
+    def backup_collections(self):
+        return [collection.name for collection in self._game_collections()]
+
+    def iter_documents(self, collection_name, batch_size):
+        batch = []
+        for doc in self.db[collection_name].find({}, batch_size=batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def restore_documents(self, collection_name, docs):
+        if not docs:
+            return 0
+        result = self.db[collection_name].bulk_write([pymongo.InsertOne(doc) for doc in docs], ordered=False)
+        return result.inserted_count
@@ -0,0 +1,578 @@
+# storage_sqlite.py
+#
+# DB Server မလိုတဲ့ Deployment အသေးအတွက် SQLite Backend (File တစ်ခုတည်း၊ WAL mode)
+# Thread တစ်ခုချင်းစီ ကိုယ်ပိုင် Connection သုံးပါ (WAL မှာ Reader တွေက Writer ကို မစောင့်ရပါ)
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from storage_base import GameStorage, HAREM_FIELDS, HAREM_PAGE_FIELDS, page_with_cursor, leaderboard_scope, leaderboard_scopes, GROUP_SCOPE_PREFIX
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    image_url TEXT,
+    rarity TEXT,
+    anime TEXT NOT NULL DEFAULT '',
+    emoji TEXT,
+    file_id TEXT
+);
+CREATE TABLE IF NOT EXISTS user_harems (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    user_name TEXT,
+    character_id INTEGER,
+    count INTEGER,
+    caught_at TEXT NOT NULL,
+    first_caught_at TEXT,
+    -- Legacy (Compact ပုံစံ မပြောင်းရသေးတဲ့ Row တွေမှာပဲ)
+    character_name TEXT,
+    character_image TEXT,
+    character_rarity TEXT,
+    character_anime TEXT,
+    character_emoji TEXT
+);
+CREATE TABLE IF NOT EXISTS group_spawns (
+    group_id INTEGER PRIMARY KEY,
+    name_lower TEXT,
+    active_character TEXT NOT NULL,
+    spawned_at TEXT
+);
+CREATE TABLE IF NOT EXISTS active_groups (
+    group_id INTEGER PRIMARY KEY,
+    name TEXT,
+    joined_at TEXT,
+    last_caught_by TEXT
+);
+CREATE TABLE IF NOT EXISTS anime_counters (
+    anime TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_anime_counters (
+    user_id INTEGER NOT NULL,
+    anime TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, anime)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS group_counters (
+    group_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL,
+    last_user_id INTEGER,
+    streak INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leaderboards (
+    scope TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    user_name TEXT,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scope, user_id)
+) WITHOUT ROWID;
+"""
+
+# File အဟောင်းတွေမှာ မပါသေးတဲ့ Column များ (table, column, type)
+ADDED_COLUMNS = [
+    ("user_harems", "character_id", "INTEGER"),
+    ("user_harems", "count", "INTEGER"),
+    ("user_harems", "first_caught_at", "TEXT"),
+]
+
+# (name, table, columns, unique, where) - storage_mongo.INDEX_SPECS နဲ့ တူအောင်
+INDEX_SPECS = [
+    ("name_lower_unique", "characters", "name_lower", True, None),
+    ("anime", "characters", "anime", False, None),
+    ("user_caught_at", "user_harems", "user_id, caught_at DESC, id DESC", False, None),
+    ("user_character_unique", "user_harems", "user_id, character_id", True, "character_id IS NOT NULL"),
+    ("scope_count", "leaderboards", "scope, count DESC", False, None),
+    ("spawned_at", "group_spawns", "spawned_at", False, None),
+]
+
+# Harem Compact ပုံစံ မပြောင်းခင်က Index များ (finish_harem_migration က ဖျက်ပါ)
+LEGACY_HAREM_INDEXES = ("user_anime_caught_at", "user_rarity_caught_at")
+
+# Leaderboard Reconcile: (scope expression, WHERE) - storage_base.leaderboard_scope နဲ့ တူအောင်
+# (h: user_harems၊ c: characters - Legacy Row ဆိုရင် ကူးထားတဲ့ character_rarity)
+LEADERBOARD_SCOPE_SQL = [
+    ("'global'", "1"),
+    ("'rarity:' || LOWER(COALESCE(c.rarity, h.character_rarity))", "COALESCE(c.rarity, h.character_rarity, '') != ''"),
+]
+
+TABLES = (
+    "characters", "user_harems", "group_spawns", "active_groups",
+    "anime_counters", "user_anime_counters", "group_counters", "leaderboards",
+)
+
+CHARACTER_COLUMNS = "id, name, name_lower, image_url, rarity, anime, emoji, file_id"
+HAREM_PAGE_COLUMNS = "id, " + ", ".join(HAREM_PAGE_FIELDS)
+HAREM_COLUMNS = "id, " + ", ".join(HAREM_FIELDS)
+
+HAREM_UPSERT = (
+    f"INSERT INTO user_harems ({', '.join(HAREM_FIELDS)}) VALUES ({', '.join('?' * len(HAREM_FIELDS))}) "
+    "ON CONFLICT(user_id, character_id) WHERE character_id IS NOT NULL DO UPDATE SET "
+    "count = count + excluded.count, caught_at = MAX(caught_at, excluded.caught_at), "
+    "first_caught_at = MIN(COALESCE(first_caught_at, excluded.first_caught_at), excluded.first_caught_at)"
+)
+
+
+def _character_doc(row):
+    doc = {
+        "_id": row[0], "name": row[1], "name_lower": row[2], "image_url": row[3],
+        "rarity": row[4], "anime": row[5], "emoji": row[6],
+    }
+    if row[7] is not None:
+        doc["file_id"] = row[7]
+    return doc
+
+
+def _sql_time(value):
+    """datetime ကို ISO string အဖြစ် သိမ်းပါ။ (String အစဉ် = အချိန်အစဉ်၊ Legacy string နဲ့လည်း ပြန်ပြောင်းရင် တူ)"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _row_doc(row, fields):
+    return {"_id": row[0], **dict(zip(fields, row[1:]))}
+
+
+def _harem_doc(row, fields):
+    doc = _row_doc(row, fields)
+    for field in ("caught_at", "first_caught_at"):
+        if isinstance(doc.get(field), str):
+            doc[field] = datetime.fromisoformat(doc[field])
+    return doc
+
+
+def _harem_row(record):
+    return tuple(_sql_time(record.get(field)) for field in HAREM_FIELDS)
+
+
+class SQLiteStorage(GameStorage):
+    """SQLite Backend"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        for table, column, column_type in ADDED_COLUMNS:
+            if column not in [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: Autocommit (Transaction လိုရင် _write() နဲ့ BEGIN IMMEDIATE)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _write(self, work):
+        """work(conn) ကို Write Transaction တစ်ခုထဲမှာ run ပါ။ (Statement အများကြီးကို Atomic)"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def ensure_indexes(self):
+        conn = self._conn()
+        for name, table, columns, unique, where in INDEX_SPECS:
+            try:
+                conn.execute(
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+                    + (f" WHERE {where}" if where else "")
+                )
+            except sqlite3.Error as e:
+                print(f"❌ Index '{name}' ({table}) ဆောက်ရာတွင် Error: {e}")
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    # --- Groups ---
+
+    def add_group(self, chat_id, group_name, joined_at):
+        self._conn().execute(
+            "INSERT INTO active_groups (group_id, name, joined_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(group_id) DO UPDATE SET name = excluded.name, joined_at = excluded.joined_at",
+            (chat_id, group_name, joined_at)
+        )
+
+    def set_group_last_catcher(self, group_id, user_name):
+        self._conn().execute("UPDATE active_groups SET last_caught_by = ? WHERE group_id = ?", (user_name, group_id))
+
+    def get_group_last_catcher(self, group_id):
+        row = self._conn().execute("SELECT last_caught_by FROM active_groups WHERE group_id = ?", (group_id,)).fetchone()
+        return row[0] if row else None
+
+    def remove_group(self, chat_id):
+        def work(conn):
+            conn.execute("DELETE FROM active_groups WHERE group_id = ?", (chat_id,))
+            conn.execute("DELETE FROM group_counters WHERE group_id = ?", (chat_id,))
+            conn.execute("DELETE FROM group_spawns WHERE group_id = ?", (chat_id,))
+            conn.execute("DELETE FROM leaderboards WHERE scope = ?", (leaderboard_scope(group_id=chat_id),))
+        self._write(work)
+
+    def get_all_groups(self):
+        return [row[0] for row in self._conn().execute("SELECT group_id FROM active_groups")]
+
+    def get_group_ids_page(self, after=None, limit=500):
+        if after is None:
+            rows = self._conn().execute("SELECT group_id FROM active_groups ORDER BY group_id LIMIT ?", (limit,))
+        else:
+            rows = self._conn().execute(
+                "SELECT group_id FROM active_groups WHERE group_id > ? ORDER BY group_id LIMIT ?", (after, limit)
+            )
+        return [row[0] for row in rows]
+
+    def load_group_counter(self, chat_id):
+        row = self._conn().execute(
+            "SELECT group_id, count, last_user_id, streak FROM group_counters WHERE group_id = ?", (chat_id,)
+        ).fetchone()
+        return {"_id": row[0], "count": row[1], "last_user_id": row[2], "streak": row[3]} if row else None
+
+    def save_group_counters(self, rows):
+        self._write(lambda conn: conn.executemany(
+            "INSERT OR REPLACE INTO group_counters (group_id, count, last_user_id, streak) VALUES (?, ?, ?, ?)",
+            [(chat_id, count, last_user_id, streak) for chat_id, (count, last_user_id, streak) in rows.items()]
+        ))
+        return len(rows)
+
+    # --- Characters ---
+
+    @staticmethod
+    def _adjust_anime(conn, anime, delta):
+        conn.execute(
+            "INSERT INTO anime_counters (anime, count) VALUES (?, ?) "
+            "ON CONFLICT(anime) DO UPDATE SET count = count + excluded.count",
+            (anime or "", delta) # (Anime မရှိရင် "" - user_anime_counters နဲ့ တူအောင်)
+        )
+
+    def _upsert(self, conn, fields):
+        """(_id, existed) - Write Transaction ထဲကနေ ခေါ်ပါ။"""
+        row = conn.execute("SELECT id, anime FROM characters WHERE name_lower = ?", (fields["name_lower"],)).fetchone()
+        values = (fields["name"], fields["image_url"], fields["rarity"], fields["anime"], fields["emoji"])
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO characters (name, image_url, rarity, anime, emoji, name_lower) VALUES (?, ?, ?, ?, ?, ?)",
+                values + (fields["name_lower"],)
+            )
+            self._adjust_anime(conn, fields["anime"], 1)
+            return cursor.lastrowid, False
+        conn.execute(
+            # (ပုံ ပြောင်းမှ Telegram file_id အဟောင်းကို ဖျက်ပါ - SET ထဲက image_url က Update မလုပ်ခင် Value)
+            "UPDATE characters SET file_id = CASE WHEN image_url IS ? THEN file_id END, "
+            "name = ?, image_url = ?, rarity = ?, anime = ?, emoji = ? WHERE id = ?",
+            (fields["image_url"],) + values + (row[0],)
+        )
+        if row[1] != fields["anime"]:
+            self._adjust_anime(conn, row[1], -1)
+            self._adjust_anime(conn, fields["anime"], 1)
+        return row[0], True
+
+    def add_character(self, fields):
+        return self._write(lambda conn: self._upsert(conn, fields)[0])
+
+    def bulk_upsert_characters(self, rows):
+        def work(conn):
+            inserted, updated = 0, 0
+            for fields in rows:
+                if self._upsert(conn, fields)[1]:
+                    updated += 1
+                else:
+                    inserted += 1
+            return inserted, updated
+        return self._write(work)
+
+    def iter_characters(self):
+        return [_character_doc(row) for row in self._conn().execute(f"SELECT {CHARACTER_COLUMNS} FROM characters")]
+
+    def set_character_file_id(self, char_id, file_id):
+        self._conn().execute("UPDATE characters SET file_id = ? WHERE id = ?", (file_id, char_id))
+
+    def clear_character_file_id(self, char_id):
+        self._conn().execute("UPDATE characters SET file_id = NULL WHERE id = ?", (char_id,))
+
+    def get_characters_without_file_id(self):
+        return [
+            {"_id": row[0], "name": row[1], "image_url": row[2]}
+            for row in self._conn().execute("SELECT id, name, image_url FROM characters WHERE file_id IS NULL")
+        ]
+
+    # --- Spawns ---
+
+    def set_active_spawn(self, group_id, character_object, spawned_at):
+        if character_object is None:
+            self._conn().execute("DELETE FROM group_spawns WHERE group_id = ?", (group_id,))
+            return
+        self._conn().execute(
+            "INSERT OR REPLACE INTO group_spawns (group_id, name_lower, active_character, spawned_at) VALUES (?, ?, ?, ?)",
+            (group_id, character_object.get("name_lower"), json.dumps(character_object, default=str), str(spawned_at))
+        )
+
+    def get_active_spawn(self, group_id):
+        row = self._conn().execute("SELECT active_character FROM group_spawns WHERE group_id = ?", (group_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim_spawn(self, group_id, name_lower):
+        # (DELETE ... RETURNING - တပြိုင်နက် ဖမ်းကြရင် တစ်ယောက်တည်းသာ Row ရပါမည်)
+        row = self._conn().execute(
+            "DELETE FROM group_spawns WHERE group_id = ? AND name_lower = ? RETURNING active_character",
+            (group_id, name_lower)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def expire_spawns(self, cutoff, limit):
+        rows = self._conn().execute(
+            "DELETE FROM group_spawns WHERE group_id IN "
+            "(SELECT group_id FROM group_spawns WHERE spawned_at <= ? ORDER BY spawned_at LIMIT ?) "
+            "RETURNING group_id, active_character, spawned_at",
+            (str(cutoff), limit)
+        ).fetchall()
+        # (RETURNING က အစဉ် မသေချာလို့ အဟောင်းဆုံးက အရင် ပြန်စီပါ)
+        return [(row[0], json.loads(row[1])) for row in sorted(rows, key=lambda row: (row[2], row[0]))]
+
+    # --- Harems ---
+
+    def insert_catch(self, record):
+        def work(conn):
+            caught_at = _sql_time(record["caught_at"])
+            count = conn.execute(
+                HAREM_UPSERT + ", user_name = excluded.user_name RETURNING count",
+                (record["user_id"], record.get("user_name"), record["character_id"], 1, caught_at, caught_at)
+            ).fetchone()[0]
+            if count == 1:
+                # Character အသစ်ဆိုမှ Collection Progress တိုးပါ
+                conn.execute(
+                    "INSERT INTO user_anime_counters (user_id, anime, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT(user_id, anime) DO UPDATE SET count = count + 1",
+                    (record["user_id"], record.get("character_anime") or "")
+                )
+            conn.executemany(
+                "INSERT INTO leaderboards (scope, user_id, user_name, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(scope, user_id) DO UPDATE SET count = count + 1, user_name = excluded.user_name",
+                [(scope, record["user_id"], record.get("user_name")) for scope in leaderboard_scopes(record)]
+            )
+        self._write(work)
+
+    def insert_harem_records(self, records):
+        self._write(lambda conn: conn.executemany(
+            HAREM_UPSERT,
+            [_harem_row({"count": 1, "first_caught_at": record["caught_at"], **record}) for record in records]
+        ))
+        return len(records)
+
+    def get_user_harem(self, user_id):
+        rows = self._conn().execute(
+            f"SELECT {HAREM_COLUMNS} FROM user_harems WHERE user_id = ? ORDER BY caught_at DESC, id DESC", (user_id,)
+        )
+        return [_harem_doc(row, HAREM_FIELDS) for row in rows]
+
+    def get_user_harem_page(self, user_id, after, character_ids, limit):
+        where = ["user_id = ?"]
+        params = [user_id]
+        if character_ids is not None:
+            where.append("character_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(character_ids)))
+        if after is not None:
+            caught_at, last_id = _sql_time(after[0]), after[1]
+            where.append("(caught_at < ? OR (caught_at = ? AND id < ?))")
+            params.extend([caught_at, caught_at, last_id])
+        params.append(limit + 1)
+        rows = self._conn().execute(
+            f"SELECT {HAREM_PAGE_COLUMNS} FROM user_harems WHERE {' AND '.join(where)} "
+            "ORDER BY caught_at DESC, id DESC LIMIT ?",
+            params
+        )
+        return page_with_cursor([_harem_doc(row, HAREM_PAGE_FIELDS) for row in rows], limit)
+
+    def get_anime_collection_progress(self, user_id, anime_name):
+        conn = self._conn()
+        anime = anime_name or "" # (Counter နှစ်ခုလုံး Anime မရှိရင် "" နဲ့ သိမ်းထားပါ)
+        user_row = conn.execute(
+            "SELECT count FROM user_anime_counters WHERE user_id = ? AND anime = ?", (user_id, anime)
+        ).fetchone()
+        total_row = conn.execute("SELECT count FROM anime_counters WHERE anime = ?", (anime,)).fetchone()
+        return (user_row[0] if user_row else 0), (total_row[0] if total_row else 0)
+
+    def rebuild_collection_counters(self):
+        def work(conn):
+            conn.execute("DELETE FROM anime_counters")
+            conn.execute("INSERT INTO anime_counters (anime, count) SELECT COALESCE(anime, ''), COUNT(*) FROM characters GROUP BY 1")
+            conn.execute("DELETE FROM user_anime_counters")
+            conn.execute(
+                "INSERT INTO user_anime_counters (user_id, anime, count) "
+                "SELECT h.user_id, COALESCE(c.anime, h.character_anime, ''), COUNT(DISTINCT COALESCE(h.character_id, h.character_name)) "
+                "FROM user_harems AS h LEFT JOIN characters AS c ON c.id = h.character_id GROUP BY 1, 2"
+            )
+            return (
+                conn.execute("SELECT COUNT(*) FROM anime_counters").fetchone()[0]
+                + conn.execute("SELECT COUNT(*) FROM user_anime_counters").fetchone()[0]
+            )
+        return self._write(work)
+
+    def count_user_characters(self, user_id, character_ids):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM user_harems WHERE user_id = ? AND character_id IN (SELECT value FROM json_each(?))",
+            (user_id, json.dumps(list(character_ids)))
+        ).fetchone()[0]
+
+    # --- Harem Migration (Legacy -> Compact) ---
+
+    def migrate_legacy_harems(self, character_ids_by_name, after, limit):
+        def work(conn):
+            rows = conn.execute(
+                "SELECT id, user_id, user_name, character_name, caught_at FROM user_harems "
+                "WHERE character_id IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (after or 0, limit)
+            ).fetchall()
+            if not rows:
+                return None
+            groups = {} # (user_id, character_id) -> [row, ...]
+            for row in rows:
+                character_id = character_ids_by_name.get((row[3] or "").lower())
+                if character_id is not None:
+                    groups.setdefault((row[1], character_id), []).append(row)
+            # (Transaction တစ်ခုတည်းမို့ ပြတ်သွားရင် Chunk တစ်ခုလုံး Rollback - ပြန် run လို့ရ)
+            conn.executemany(HAREM_UPSERT, [
+                _harem_row({
+                    "user_id": user_id, "user_name": group[-1][2], "character_id": character_id, "count": len(group),
+                    "caught_at": max(datetime.fromisoformat(row[4]) for row in group),
+                    "first_caught_at": min(datetime.fromisoformat(row[4]) for row in group),
+                })
+                for (user_id, character_id), group in groups.items()
+            ])
+            converted = [row[0] for group in groups.values() for row in group]
+            conn.execute("DELETE FROM user_harems WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(converted),))
+            return rows[-1][0], len(converted), len(rows) - len(converted)
+        return self._write(work)
+
+    def finish_harem_migration(self):
+        conn = self._conn()
+        for name in LEGACY_HAREM_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def harem_storage_stats(self):
+        conn = self._conn()
+        stats = {
+            "documents": conn.execute("SELECT COUNT(*) FROM user_harems").fetchone()[0],
+            "legacy_documents": conn.execute("SELECT COUNT(*) FROM user_harems WHERE character_id IS NULL").fetchone()[0],
+            "data_bytes": None,
+            "index_bytes": None,
+        }
+        try:
+            # (dbstat Virtual Table ပါတဲ့ SQLite Build မှာပဲ)
+            stats["data_bytes"] = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'user_harems'").fetchone()[0]
+            stats["index_bytes"] = conn.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'user_harems')"
+            ).fetchone()[0]
+        except sqlite3.Error:
+            pass
+        return stats
+
+    # --- Leaderboards ---
+
+    def get_leaderboard(self, scope, limit):
+        rows = self._conn().execute(
+            "SELECT user_id, user_name, count FROM leaderboards WHERE scope = ? ORDER BY count DESC LIMIT ?", (scope, limit)
+        )
+        return [{"user_id": row[0], "user_name": row[1], "count": row[2]} for row in rows]
+
+    def rebuild_leaderboards(self):
+        def work(conn):
+            # group Scope တွေက Harem ကနေ ပြန်မတွက်နိုင်လို့ ချန်ထားပါ
+            conn.execute("DELETE FROM leaderboards WHERE scope NOT LIKE ?", (GROUP_SCOPE_PREFIX + "%",))
+            for scope_sql, where in LEADERBOARD_SCOPE_SQL:
+                # user_name က User ရဲ့ နောက်ဆုံး Row (MAX(id)) က နာမည်
+                conn.execute(
+                    "INSERT INTO leaderboards (scope, user_id, user_name, count) "
+                    "SELECT g.scope, g.user_id, last.user_name, g.count FROM ("
+                    f"SELECT {scope_sql} AS scope, h.user_id, SUM(COALESCE(h.count, 1)) AS count, MAX(h.id) AS last_id "
+                    f"FROM user_harems AS h LEFT JOIN characters AS c ON c.id = h.character_id WHERE {where} GROUP BY 1, h.user_id"
+                    ") AS g JOIN user_harems AS last ON last.id = g.last_id"
+                )
+            return conn.execute("SELECT COUNT(*) FROM leaderboards").fetchone()[0]
+        return self._write(work)
+
+    # --- Admin ---
+
+    def explain_queries(self):
+        checks = [
+            ("add_character", "SELECT id, anime FROM characters WHERE name_lower = ?", ("x",)),
+            ("get_user_harem", "SELECT * FROM user_harems WHERE user_id = ? ORDER BY caught_at DESC, id DESC", (0,)),
+            ("get_user_harem_page", f"SELECT {HAREM_PAGE_COLUMNS} FROM user_harems WHERE user_id = ? AND character_id IN (SELECT value FROM json_each(?)) ORDER BY caught_at DESC, id DESC LIMIT 21", (0, "[1]")),
+            ("get_user_anime_collection_count", "SELECT COUNT(*) FROM user_harems WHERE user_id = ? AND character_id IN (SELECT value FROM json_each(?))", (0, "[1]")),
+            ("get_active_spawn", "SELECT active_character FROM group_spawns WHERE group_id = ?", (0,)),
+            ("get_group_last_catcher", "SELECT last_caught_by FROM active_groups WHERE group_id = ?", (0,)),
+            ("get_leaderboard", "SELECT user_id, user_name, count FROM leaderboards WHERE scope = ? ORDER BY count DESC LIMIT 10", ("global",)),
+            ("expire_spawns", "SELECT group_id FROM group_spawns WHERE spawned_at <= ? ORDER BY spawned_at LIMIT 100", ("",)),
+        ]
+        report = []
+        conn = self._conn()
+        for function_name, sql, params in checks:
+            try:
+                stages = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                # "SCAN <table>" (Index မပါ) ဆိုရင် Table တစ်ခုလုံး ဖတ်နေပါတယ်
+                index_backed = not any(s.startswith("SCAN") and "INDEX" not in s for s in stages)
+            except sqlite3.Error as e:
+                stages = [f"ERROR: {e}"]
+                index_backed = False
+            report.append((function_name, index_backed, stages))
+        return report
+
+    def wipe(self):
+        # Table ကို Drop ပြီး Schema / Index ပြန်ဆောက်ပါ (Row တစ်ခုချင်း ဖျက်ရင် Index တွေပါ ပြင်ရလို့)
+        def work(conn):
+            wiped = []
+            for table in TABLES:
+                count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                conn.execute(f"DROP TABLE {table}")
+                wiped.append((table, count))
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            return wiped
+        wiped = self._write(work)
+        self.ensure_indexes()
+        return wiped
+
+    # --- Backup / Restore ---
+
+    def backup_collections(self):
+        return list(TABLES)
+
+    def iter_documents(self, collection_name, batch_size):
+        cursor = self._conn().execute(f"SELECT * FROM {collection_name}")
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [dict(zip(columns, row)) for row in rows]
+
+    def restore_documents(self, collection_name, docs):
+        if not docs:
+            return 0
+        columns = list(docs[0])
+        sql = f"INSERT INTO {collection_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        self._write(lambda conn: conn.executemany(sql, [tuple(doc.get(column) for column in columns) for doc in docs]))
+        return len(docs)
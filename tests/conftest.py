@@ -0,0 +1,47 @@
+# tests/conftest.py
+# DB Server မလိုတဲ့ memory / sqlite Backend နဲ့ပဲ run ပါ။ (telegram / pymongo မလိုပါ)
+
+import os
+import sys
+
+# game_database ကို import မလုပ်ခင် (Default က mongo - MONGO_URL မရှိရင် exit)
+os.environ.setdefault("GAME_DB_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import game_database
+from storage_memory import MemoryStorage
+from storage_sqlite import SQLiteStorage
+
+BACKENDS = ["memory", "sqlite"]
+
+
+def make_storage(backend, tmp_path):
+    if backend == "memory":
+        return MemoryStorage()
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    return SQLiteStorage(str(tmp_path / "game.db"))
+
+
+@pytest.fixture(params=BACKENDS)
+def storage(request, tmp_path):
+    """Backend တစ်ခုချင်းစီ အသစ် (Index ပါ ဆောက်ပြီး)"""
+    store = make_storage(request.param, tmp_path)
+    store.ensure_indexes()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def gamedb(storage, monkeypatch):
+    """storage ကို game_database ရဲ့ store အဖြစ် သုံးပြီး Cache / Catalog Snapshot တွေ ရှင်းထားပါ။"""
+    monkeypatch.setattr(game_database, "store", storage)
+    game_database.spawn_cache.clear()
+    game_database.leaderboard_cache.clear()
+    game_database._file_id_overrides.clear()
+    game_database._bump_catalog_version()
+    yield game_database
+    game_database.spawn_cache.clear()
+    game_database.leaderboard_cache.clear()
+    game_database._bump_catalog_version()
@@ -0,0 +1,67 @@
+# tests/test_claim_spawn.py
+# တပြိုင်နက် ဖမ်းကြရင် တစ်ယောက်တည်းသာ နိုင်ရမည် (claim_spawn က Atomic)
+
+import asyncio
+import threading
+
+import game_database_async
+
+N = 20
+GROUP_ID = -1001
+
+
+def _spawn(gamedb):
+    gamedb.add_group(GROUP_ID, "Test Group")
+    gamedb.add_character("Rem", "https://example.com/rem.png", "Rare", "Re:Zero", "💙")
+    character_object = gamedb.get_random_character(GROUP_ID)
+    gamedb.set_active_spawn(GROUP_ID, character_object)
+    return character_object
+
+
+def _harem_entries(gamedb):
+    return sum(len(gamedb.get_user_harem(user_id)) for user_id in range(N))
+
+
+def test_threads_claim_spawn_single_winner(gamedb):
+    _spawn(gamedb)
+    barrier = threading.Barrier(N)
+    results = [None] * N
+
+    def guess(i):
+        barrier.wait()
+        results[i] = gamedb.claim_spawn(GROUP_ID, "rem")
+
+    threads = [threading.Thread(target=guess, args=(i,)) for i in range(N)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [result for result in results if result is not None]
+    assert len(winners) == 1
+    assert winners[0]["name"] == "Rem"
+    assert gamedb.get_active_spawn(GROUP_ID) is None
+
+
+def test_tasks_claim_and_record_catch_single_winner(gamedb):
+    _spawn(gamedb)
+
+    async def race():
+        return await asyncio.gather(*(
+            game_database_async.claim_and_record_catch(GROUP_ID, user_id, f"user{user_id}", "Rem")
+            for user_id in range(N)
+        ))
+
+    results = asyncio.run(race())
+
+    winners = [user_id for user_id, result in enumerate(results) if result is not None]
+    assert len(winners) == 1
+    assert _harem_entries(gamedb) == 1
+    assert gamedb.get_user_harem(winners[0])[0]["count"] == 1
+    assert gamedb.get_group_last_catcher(GROUP_ID) == f"user{winners[0]}"
+
+
+def test_wrong_name_does_not_claim(gamedb):
+    _spawn(gamedb)
+    assert gamedb.claim_spawn(GROUP_ID, "emilia") is None
+    assert gamedb.get_active_spawn(GROUP_ID) is not None
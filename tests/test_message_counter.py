@@ -0,0 +1,47 @@
+# tests/test_message_counter.py
+
+from message_counter import MessageCounterStore
+
+SPAWN_COUNT = 3
+
+
+def _count_until_spawn(counters, chat_id):
+    for user_id in range(SPAWN_COUNT):
+        counted, should_spawn = counters.register_message(chat_id, user_id, SPAWN_COUNT)
+        assert counted
+    return should_spawn
+
+
+def test_spawn_pending_until_finished():
+    counters = MessageCounterStore()
+    counters.load(-1, None)
+    assert _count_until_spawn(counters, -1)
+
+    counters.start_spawn(-1)
+    assert counters.is_spawn_pending(-1)
+    assert counters.get_count(-1) == 0
+
+    counters.finish_spawn(-1)
+    assert not counters.is_spawn_pending(-1)
+    assert counters.get_count(-1) == 0
+
+
+def test_failed_spawn_fires_again_on_next_message():
+    counters = MessageCounterStore()
+    counters.load(-1, None)
+    _count_until_spawn(counters, -1)
+    counters.start_spawn(-1)
+    counters.take_dirty()
+
+    counters.fail_spawn(-1, SPAWN_COUNT)
+    assert not counters.is_spawn_pending(-1)
+    assert counters.take_dirty() == {-1: (SPAWN_COUNT - 1, None, 0)} # (Restart ပြီးလည်း ပြန် Spawn)
+    assert counters.register_message(-1, 42, SPAWN_COUNT) == (True, True)
+
+
+def test_drop_clears_spawn_pending():
+    counters = MessageCounterStore()
+    counters.load(-1, None)
+    counters.start_spawn(-1)
+    counters.drop(-1)
+    assert not counters.is_spawn_pending(-1)
@@ -0,0 +1,113 @@
+# tests/test_spawn_flow.py
+# handle_group_message -> Send Queue -> set_active_spawn (Telegram Bot ကို Fake နဲ့)
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telegram")
+os.environ.setdefault("GAME_BOT_TOKEN", "1:test")
+os.environ.setdefault("OWNER_ID", "1")
+
+from telegram.error import TimedOut
+
+import character
+from message_counter import MessageCounterStore
+from send_queue import SendScheduler
+
+GROUP_ID = -1001
+
+
+class FakeBot:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_photo(self, chat_id, photo, caption, **kwargs):
+        self.calls += 1
+        await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise TimedOut()
+        return SimpleNamespace(photo=[])
+
+
+@pytest.fixture
+def bot_env(gamedb, monkeypatch):
+    gamedb.add_character("Rem", "https://example.com/rem.png", "Rare", "Re:Zero", "")
+    monkeypatch.setattr(character, "message_counters", MessageCounterStore(anti_spam_limit=character.ANTI_SPAM_LIMIT))
+    monkeypatch.setattr(character, "outbox", SendScheduler(global_rate=1000, global_burst=1000, group_rate=1000, group_burst=1000, max_retries=2))
+    return gamedb
+
+
+async def _messages(bot, count, first_user=0):
+    context = SimpleNamespace(bot=bot)
+    for i in range(count):
+        update = SimpleNamespace(
+            message=object(), effective_user=SimpleNamespace(id=first_user + i), effective_chat=SimpleNamespace(id=GROUP_ID)
+        )
+        await character.handle_group_message(update, context)
+
+
+async def _drain():
+    while character.outbox.depth():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+def test_no_second_spawn_while_first_is_queued(bot_env):
+    async def run():
+        await character.outbox.start()
+        bot = FakeBot()
+        bot.gate.clear() # (ပထမ ပုံ မပို့ရသေး)
+        await _messages(bot, character.SPAWN_MESSAGE_COUNT)
+        await asyncio.sleep(0.01)
+        assert character.message_counters.is_spawn_pending(GROUP_ID)
+
+        await _messages(bot, character.SPAWN_MESSAGE_COUNT * 2, first_user=100)
+        bot.gate.set()
+        await _drain()
+        await character.outbox.stop()
+        return bot
+
+    bot = asyncio.run(run())
+    assert bot.calls == 1
+    assert bot_env.get_active_spawn(GROUP_ID)["name"] == "Rem"
+    assert not character.message_counters.is_spawn_pending(GROUP_ID)
+    assert character.message_counters.get_count(GROUP_ID) == 0
+
+
+def test_timed_out_spawn_is_retried(bot_env):
+    async def run():
+        await character.outbox.start()
+        bot = FakeBot(failures=1)
+        await _messages(bot, character.SPAWN_MESSAGE_COUNT)
+        await _drain()
+        await character.outbox.stop()
+        return bot
+
+    bot = asyncio.run(run())
+    assert bot.calls == 2
+    assert bot_env.get_active_spawn(GROUP_ID)["name"] == "Rem"
+
+
+def test_failed_spawn_is_not_lost(bot_env):
+    async def run():
+        await character.outbox.start()
+        bot = FakeBot(failures=100)
+        await _messages(bot, character.SPAWN_MESSAGE_COUNT)
+        await _drain()
+        assert bot_env.get_active_spawn(GROUP_ID) is None
+        assert not character.message_counters.is_spawn_pending(GROUP_ID)
+
+        bot.failures = 0
+        await _messages(bot, 1, first_user=100) # (နောက် Message တစ်ခုနဲ့ ပြန် Spawn)
+        await _drain()
+        await character.outbox.stop()
+
+    asyncio.run(run())
+    assert bot_env.get_active_spawn(GROUP_ID)["name"] == "Rem"
@@ -0,0 +1,384 @@
+# tests/test_storage_contract.py
+# Backend တိုင်း (storage_base.GameStorage) တူညီစွာ အလုပ်လုပ်ရမည့် Contract
+# (storage fixture က memory / sqlite နှစ်ခုလုံးနဲ့ run - conftest.py)
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import backup
+from conftest import make_storage
+from storage_base import character_fields, harem_record
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def add(storage, name, rarity="Common", anime="Test Anime"):
+    fields = character_fields({"name": name, "image_url": f"https://example.com/{name}.png", "rarity": rarity, "anime": anime, "emoji": ""})
+    char_id = storage.add_character(fields)
+    return {"_id": char_id, **fields}
+
+
+def catch(storage, user_id, character_object, minutes=0, group_id=None):
+    storage.insert_catch(harem_record(user_id, f"user{user_id}", character_object, T0 + timedelta(minutes=minutes), group_id))
+
+
+# --- Characters ---
+
+def test_add_character_upserts_by_name(storage):
+    first = add(storage, "Rem")
+    again = add(storage, "Rem", rarity="Legendary")
+
+    characters = list(storage.iter_characters())
+    assert len(characters) == 1
+    assert again["_id"] == first["_id"]
+    assert characters[0]["rarity"] == "Legendary"
+
+
+def _file_id(storage, char_id):
+    return next(doc for doc in storage.iter_characters() if doc["_id"] == char_id).get("file_id")
+
+
+def test_upsert_clears_file_id_only_when_image_changes(storage):
+    rem, ram = add(storage, "Rem"), add(storage, "Ram")
+    storage.set_character_file_id(rem["_id"], "file-rem")
+    storage.set_character_file_id(ram["_id"], "file-ram")
+
+    add(storage, "Rem", rarity="Legendary") # (ပုံ မပြောင်း)
+    storage.bulk_upsert_characters([
+        character_fields({"name": "Ram", "image_url": "https://example.com/ram-new.png", "rarity": "Rare", "anime": "Test Anime", "emoji": "💗"}),
+    ])
+
+    assert _file_id(storage, rem["_id"]) == "file-rem"
+    assert not _file_id(storage, ram["_id"])
+    assert [doc["_id"] for doc in storage.get_characters_without_file_id()] == [ram["_id"]]
+
+
+def test_anime_total_counts_distinct_characters(storage):
+    add(storage, "Rem", anime="Re:Zero")
+    add(storage, "Ram", anime="Re:Zero")
+    add(storage, "Rem", anime="Re:Zero")
+    assert storage.get_anime_collection_progress(1, "Re:Zero") == (0, 2)
+
+
+# --- Spawns ---
+
+def test_claim_spawn_requires_name_and_is_single_use(storage):
+    rem = add(storage, "Rem")
+    storage.set_active_spawn(-1, rem, T0)
+
+    assert storage.claim_spawn(-1, "ram") is None
+    assert storage.get_active_spawn(-1)["_id"] == rem["_id"]
+    assert storage.claim_spawn(-1, "rem")["_id"] == rem["_id"]
+    assert storage.claim_spawn(-1, "rem") is None
+    assert storage.get_active_spawn(-1) is None
+
+
+def test_set_active_spawn_none_clears(storage):
+    storage.set_active_spawn(-1, add(storage, "Rem"), T0)
+    storage.set_active_spawn(-1, None, T0)
+    assert storage.get_active_spawn(-1) is None
+
+
+# --- Harems ---
+
+def test_insert_catch_keeps_one_entry_per_character(storage):
+    rem, ram = add(storage, "Rem", anime="Re:Zero"), add(storage, "Ram", anime="Re:Zero")
+    catch(storage, 1, rem, minutes=0)
+    catch(storage, 1, ram, minutes=1)
+    catch(storage, 1, rem, minutes=2)
+
+    harem = storage.get_user_harem(1)
+    assert [doc["character_id"] for doc in harem] == [rem["_id"], ram["_id"]] # (caught_at အသစ်ဆုံးက အရင်)
+    assert harem[0]["count"] == 2
+    assert harem[0]["first_caught_at"] == T0
+    assert harem[0]["caught_at"] == T0 + timedelta(minutes=2)
+    assert storage.get_anime_collection_progress(1, "Re:Zero") == (2, 2)
+    assert storage.count_user_characters(1, [rem["_id"], ram["_id"]]) == 2
+
+
+def test_insert_harem_records_merges_duplicates(storage):
+    rem = add(storage, "Rem")
+    catch(storage, 1, rem, minutes=5)
+    storage.insert_harem_records([
+        {"user_id": 1, "user_name": "user1", "character_id": rem["_id"], "count": 2, "caught_at": T0, "first_caught_at": T0},
+        {"user_id": 1, "user_name": "user1", "character_id": rem["_id"], "count": 1, "caught_at": T0 + timedelta(minutes=9), "first_caught_at": T0},
+    ])
+
+    harem = storage.get_user_harem(1)
+    assert len(harem) == 1
+    assert harem[0]["count"] == 4
+    assert harem[0]["caught_at"] == T0 + timedelta(minutes=9)
+    assert harem[0]["first_caught_at"] == T0
+
+
+def test_collection_progress_for_character_without_anime(storage):
+    catch(storage, 1, add(storage, "Nameless", anime=""))
+    assert storage.get_anime_collection_progress(1, "") == (1, 1)
+    storage.rebuild_collection_counters()
+    assert storage.get_anime_collection_progress(1, "") == (1, 1)
+
+
+def test_harem_page_with_cursor_walks_every_entry_once(storage):
+    characters = [add(storage, f"Char{i:02d}") for i in range(7)]
+    for i, character_object in enumerate(characters):
+        catch(storage, 1, character_object, minutes=i % 3) # (caught_at တူတာတွေ - _id နဲ့ ခွဲရ)
+    catch(storage, 2, characters[0])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        docs, cursor = storage.get_user_harem_page(1, cursor, None, 3)
+        seen.extend(doc["character_id"] for doc in docs)
+        pages += 1
+        assert len(docs) <= 3
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(c["_id"] for c in characters)
+    assert seen == [doc["character_id"] for doc in storage.get_user_harem(1)]
+
+
+def test_harem_page_filters_by_character_ids(storage):
+    rem, ram, emilia = add(storage, "Rem"), add(storage, "Ram"), add(storage, "Emilia")
+    for minutes, character_object in enumerate((rem, ram, emilia)):
+        catch(storage, 1, character_object, minutes=minutes)
+
+    docs, cursor = storage.get_user_harem_page(1, None, [rem["_id"], emilia["_id"]], 10)
+    assert [doc["character_id"] for doc in docs] == [emilia["_id"], rem["_id"]]
+    assert cursor is None
+
+
+# --- Leaderboards ---
+
+def test_leaderboards_count_every_catch_per_scope(storage):
+    rem, ram = add(storage, "Rem", rarity="Legendary"), add(storage, "Ram", rarity="Rare")
+    catch(storage, 1, rem, group_id=-1)
+    catch(storage, 1, rem, minutes=1, group_id=-1)
+    catch(storage, 2, ram, group_id=-2)
+    catch(storage, 2, rem, minutes=1, group_id=-2)
+    catch(storage, 2, ram, minutes=2, group_id=-1)
+
+    def board(scope):
+        return [(entry["user_id"], entry["count"]) for entry in storage.get_leaderboard(scope, 10)]
+
+    assert board("global") == [(2, 3), (1, 2)]
+    assert board("group:-1") == [(1, 2), (2, 1)]
+    assert board("group:-2") == [(2, 2)]
+    assert board("rarity:legendary") == [(1, 2), (2, 1)]
+    assert board("rarity:rare") == [(2, 2)]
+    assert storage.get_leaderboard("global", 1)[0]["user_name"] == "user2"
+
+
+def test_rebuild_leaderboards_matches_incremental_counts(storage):
+    rem, ram = add(storage, "Rem", rarity="Legendary"), add(storage, "Ram", rarity="Rare")
+    for minutes, (user_id, character_object) in enumerate([(1, rem), (1, rem), (2, ram), (3, rem), (3, ram)]):
+        catch(storage, user_id, character_object, minutes=minutes)
+    scopes = ("global", "rarity:legendary", "rarity:rare")
+    before = {scope: storage.get_leaderboard(scope, 10) for scope in scopes}
+
+    storage.rebuild_leaderboards()
+
+    for scope in scopes:
+        # (Count တူရင် အစဉ် မသတ်မှတ်ထားလို့ Set နဲ့ စစ်ပါ)
+        assert {(e["user_id"], e["count"]) for e in storage.get_leaderboard(scope, 10)} == \
+            {(e["user_id"], e["count"]) for e in before[scope]}
+
+
+def test_remove_group_drops_its_leaderboard(storage):
+    storage.add_group(-1, "Test Group", T0.isoformat())
+    catch(storage, 1, add(storage, "Rem"), group_id=-1)
+    storage.remove_group(-1)
+    assert storage.get_leaderboard("group:-1", 10) == []
+    assert storage.get_leaderboard("global", 10)[0]["count"] == 1
+
+
+# --- Compact Harem ---
+
+def test_rebuild_leaderboards_keeps_group_scopes(storage):
+    # Compact Entry မှာ Group မပါလို့ group Scope တွေကို Reconcile က မထိရပါ
+    rem = add(storage, "Rem", rarity="Legendary")
+    catch(storage, 1, rem, group_id=-1)
+    catch(storage, 1, rem, minutes=1, group_id=-2)
+    catch(storage, 2, rem, minutes=2, group_id=-2)
+
+    assert [set(doc) & {"group_id", "groups"} for doc in storage.get_user_harem(1)] == [set()]
+    storage.rebuild_leaderboards()
+
+    assert [(e["user_id"], e["count"]) for e in storage.get_leaderboard("group:-1", 10)] == [(1, 1)]
+    assert {(e["user_id"], e["count"]) for e in storage.get_leaderboard("group:-2", 10)} == {(1, 1), (2, 1)}
+    assert [(e["user_id"], e["count"]) for e in storage.get_leaderboard("global", 10)] == [(1, 2), (2, 1)]
+
+
+def test_rebuild_collection_counters_from_compact_entries(storage):
+    rem, ram = add(storage, "Rem", anime="Re:Zero"), add(storage, "Ram", anime="Re:Zero")
+    storage.insert_harem_records([
+        {"user_id": 1, "user_name": "user1", "character_id": rem["_id"], "count": 3, "caught_at": T0, "first_caught_at": T0},
+        {"user_id": 1, "user_name": "user1", "character_id": ram["_id"], "count": 1, "caught_at": T0, "first_caught_at": T0},
+        {"user_id": 2, "user_name": "user2", "character_id": rem["_id"], "count": 1, "caught_at": T0, "first_caught_at": T0},
+    ])
+    assert storage.get_anime_collection_progress(1, "Re:Zero") == (0, 2) # (insert_harem_records က Counter မပြင်)
+
+    storage.rebuild_collection_counters()
+    assert storage.get_anime_collection_progress(1, "Re:Zero") == (2, 2)
+    assert storage.get_anime_collection_progress(2, "Re:Zero") == (1, 2)
+
+    storage.rebuild_collection_counters() # (ထပ်ခေါ်လည်း နှစ်ခါ မတိုး)
+    assert storage.get_anime_collection_progress(1, "Re:Zero") == (2, 2)
+
+
+# --- Spawn Expiry ---
+
+def test_expire_spawns_oldest_first_within_limit(storage):
+    rem, ram, emilia = add(storage, "Rem"), add(storage, "Ram"), add(storage, "Emilia")
+    storage.set_active_spawn(-1, rem, T0 + timedelta(minutes=2))
+    storage.set_active_spawn(-2, ram, T0)
+    storage.set_active_spawn(-3, emilia, T0 + timedelta(minutes=1))
+    storage.set_active_spawn(-4, rem, T0 + timedelta(minutes=10)) # (မကျော်သေး)
+    cutoff = T0 + timedelta(minutes=5)
+
+    first = storage.expire_spawns(cutoff, 2)
+    assert [(group_id, obj["name"]) for group_id, obj in first] == [(-2, "Ram"), (-3, "Emilia")]
+    assert [group_id for group_id, _ in storage.expire_spawns(cutoff, 10)] == [-1]
+    assert storage.expire_spawns(cutoff, 10) == []
+    assert storage.get_active_spawn(-4)["name"] == "Rem"
+
+
+def test_expired_spawn_cannot_be_claimed(storage):
+    storage.set_active_spawn(-1, add(storage, "Rem"), T0)
+    assert len(storage.expire_spawns(T0, 10)) == 1
+    assert storage.claim_spawn(-1, "rem") is None
+
+
+def test_expire_spawns_skips_claimed_spawn(storage):
+    storage.set_active_spawn(-1, add(storage, "Rem"), T0)
+    assert storage.claim_spawn(-1, "rem") is not None
+    assert storage.expire_spawns(T0, 10) == []
+
+
+# --- Backup / Restore ---
+
+def _populate(storage):
+    rem, ram = add(storage, "Rem", rarity="Legendary", anime="Re:Zero"), add(storage, "Ram", anime="Re:Zero")
+    storage.add_group(-1, "Test Group", T0.isoformat())
+    storage.set_group_last_catcher(-1, "user1")
+    storage.save_group_counters({-1: (42, 1, 3)})
+    storage.set_active_spawn(-1, ram, T0)
+    for minutes, (user_id, character_object) in enumerate([(1, rem), (1, ram), (1, rem), (2, rem)]):
+        catch(storage, user_id, character_object, minutes=minutes, group_id=-1)
+    return rem, ram
+
+
+def _dump(storage):
+    return {name: [doc for batch in storage.iter_documents(name, 2) for doc in batch] for name in storage.backup_collections()}
+
+
+def test_iter_documents_batches_whole_collection(storage):
+    _populate(storage)
+    batches = list(storage.iter_documents("user_harems", 2))
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+def test_backup_restore_round_trip(storage, tmp_path):
+    rem, ram = _populate(storage)
+    path = str(tmp_path / "game.jsonl.gz")
+    counts = backup.write_backup(storage, path, batch_size=2)
+    assert counts["user_harems"] == 3
+
+    restored = make_storage(storage.name, tmp_path / "restored")
+    restored.ensure_indexes()
+    try:
+        restored.add_character(character_fields({"name": "Stale", "image_url": "", "rarity": "", "anime": "", "emoji": ""}))
+        backup.restore_backup(restored, path, chunk_size=2)
+
+        assert _dump(restored) == _dump(storage)
+        assert restored.get_user_harem(1) == storage.get_user_harem(1)
+        assert restored.get_active_spawn(-1)["_id"] == ram["_id"]
+        assert restored.get_group_last_catcher(-1) == "user1"
+        assert restored.load_group_counter(-1)["count"] == 42
+        assert restored.get_leaderboard("group:-1", 10) == storage.get_leaderboard("group:-1", 10)
+        assert restored.get_anime_collection_progress(1, "Re:Zero") == (2, 2) # (finish_restore က Counter ပြန်တွက်)
+
+        # Restore ပြီးမှ ထည့်တဲ့ Document တွေရဲ့ _id မထပ်ရပါ
+        emilia = add(restored, "Emilia")
+        assert emilia["_id"] not in (rem["_id"], ram["_id"])
+        catch(restored, 3, emilia)
+        assert len(restored.get_user_harem(3)) == 1
+    finally:
+        restored.close()
+
+
+def test_restore_rejects_other_backend(storage, tmp_path):
+    path = str(tmp_path / "game.jsonl.gz")
+    backup.write_backup(storage, path)
+    other = make_storage("sqlite" if storage.name == "memory" else "memory", tmp_path / "other")
+    try:
+        with pytest.raises(backup.BackupError):
+            backup.restore_backup(other, path)
+    finally:
+        other.close()
+
+
+# --- file_id Override (gamedb fixture) ---
+
+def test_reimport_keeps_cached_file_ids_for_unchanged_images(gamedb):
+    rows = [{"name": name, "image_url": f"https://example.com/{name}.png", "rarity": "Rare", "anime": "A", "emoji": ""} for name in ("Rem", "Ram")]
+    gamedb.bulk_upsert_characters(rows)
+    catalog = gamedb.get_catalog()
+    rem_id, ram_id = catalog.by_name_lower["rem"], catalog.by_name_lower["ram"]
+    gamedb.set_character_file_id(rem_id, "file-rem")
+    gamedb.set_character_file_id(ram_id, "file-ram")
+
+    rows[0]["rarity"] = "Legendary"
+    rows[1]["image_url"] = "https://example.com/ram-new.png"
+    gamedb.bulk_upsert_characters(rows)
+
+    catalog = gamedb.get_catalog()
+    assert gamedb._character_object(catalog.get(rem_id))["file_id"] == "file-rem"
+    assert "file_id" not in gamedb._character_object(catalog.get(ram_id))
+
+
+# --- Search / Browse (gamedb fixture - Backend က ဆွဲထားတဲ့ Catalog Snapshot ကနေ) ---
+
+def test_search_matches_word_prefixes_ignoring_case_and_accents(gamedb):
+    for name, anime in [("Uzumaki Naruto", "Naruto"), ("Naruto Uzumaki (Hokage)", "Boruto"), ("Émilia", "Re:Zero"), ("Rem", "Re:Zero")]:
+        gamedb.add_character(name, "", "Rare", anime, "")
+
+    total, characters = gamedb.search_characters("NARU")
+    assert total == 2
+    assert {c["name"] for c in characters} == {"Naruto Uzumaki (Hokage)", "Uzumaki Naruto"}
+    assert gamedb.search_characters("hokage")[0] == 1
+    assert [c["name"] for c in gamedb.search_characters("emi")[1]] == ["Émilia"]
+    assert gamedb.search_characters("zzz") == (0, [])
+
+
+def test_browse_pages_by_name_and_sees_new_characters(gamedb):
+    for i in range(5):
+        gamedb.add_character(f"Char{i}", "", "Rare" if i % 2 else "Common", "Anime A" if i < 3 else "Anime B", "")
+
+    total, page = gamedb.browse_characters(offset=2, limit=2)
+    assert total == 5
+    assert [c["name"] for c in page] == ["Char2", "Char3"]
+    assert [c["name"] for c in gamedb.browse_characters(anime="Anime A", rarity="Common")[1]] == ["Char0", "Char2"]
+
+    gamedb.add_character("Char5", "", "Common", "Anime B", "") # (Catalog Version တိုးလို့ Snapshot အသစ်)
+    assert gamedb.browse_characters(anime="Anime B")[0] == 3
+    assert gamedb.search_characters("char5")[0] == 1
+
+
+# --- Broadcast (Group ID Paging) ---
+
+def test_group_ids_page_walks_all_groups_in_order(storage):
+    group_ids = [-1005, -1001, -1003, -1002, -1004]
+    for group_id in group_ids:
+        storage.add_group(group_id, f"Group {group_id}", T0.isoformat())
+    storage.remove_group(-1003)
+
+    seen, after = [], None
+    while True:
+        page = storage.get_group_ids_page(after, 2)
+        if not page:
+            break
+        seen.extend(page)
+        after = page[-1]
+    assert seen == sorted(set(group_ids) - {-1003})
@@ -0,0 +1,222 @@
+# tests/test_storage_mongo.py
+# Mongo Server မလိုအောင် Collection ကို Dict နဲ့ အစားထိုးပြီး Query အစဉ် (Race) ကို စစ်ပါ။
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+from storage_mongo import MongoStorage
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _get(doc, path):
+    for part in path.split("."): # ("active_character.name_lower")
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = _get(doc, field)
+        if isinstance(condition, dict) and "$lte" in condition:
+            if value is None or not value <= condition["$lte"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs, on_fetch):
+        self.docs = docs
+        self.on_fetch = on_fetch
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        docs = [dict(doc) for doc in self.docs]
+        self.on_fetch() # (find ပြီး ဖျက်ခင် ကြားထဲမှာ တခြား Request ဝင်လာသလို)
+        return iter(docs)
+
+
+class FakeSpawnCollection:
+    """group_spawns ရဲ့ find / find_one_and_delete (Atomic) ကိုပဲ"""
+
+    def __init__(self):
+        self.docs = {}
+        self.on_fetch = lambda: None
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs.values() if _matches(doc, query)], self.on_fetch)
+
+    def find_one_and_delete(self, query, projection=None):
+        for group_id, doc in list(self.docs.items()):
+            if _matches(doc, query):
+                return self.docs.pop(group_id)
+        return None
+
+
+@pytest.fixture
+def mongo():
+    storage = MongoStorage.__new__(MongoStorage) # (Client မဖွင့်ဘဲ)
+    storage.group_spawns_collection = FakeSpawnCollection()
+    return storage
+
+
+def _spawn(mongo, group_id, name, spawned_at):
+    mongo.group_spawns_collection.docs[group_id] = {
+        "_id": group_id, "active_character": {"name": name, "name_lower": name.lower()}, "spawned_at": spawned_at,
+    }
+
+
+def test_expire_spawns_skips_spawn_claimed_after_find(mongo):
+    _spawn(mongo, -1, "Rem", T0)
+    _spawn(mongo, -2, "Ram", T0 + timedelta(seconds=1))
+    claimed = []
+    mongo.group_spawns_collection.on_fetch = lambda: claimed.append(mongo.claim_spawn(-1, "rem"))
+
+    expired = mongo.expire_spawns(T0 + timedelta(minutes=1), 10)
+
+    assert claimed[0]["name"] == "Rem"
+    assert [(group_id, obj["name"]) for group_id, obj in expired] == [(-2, "Ram")]
+
+
+def test_expire_spawns_skips_spawn_replaced_after_find(mongo):
+    _spawn(mongo, -1, "Rem", T0)
+    mongo.group_spawns_collection.on_fetch = lambda: _spawn(mongo, -1, "Emilia", T0 + timedelta(seconds=30))
+
+    assert mongo.expire_spawns(T0 + timedelta(minutes=1), 10) == []
+    assert mongo.group_spawns_collection.docs[-1]["active_character"]["name"] == "Emilia"
+
+
+# --- Collection Counter Rebuild ---
+
+class FakeAggregateCollection:
+    def __init__(self, rows, on_aggregate=lambda: None):
+        self.rows = rows
+        self.on_aggregate = on_aggregate
+
+    def aggregate(self, pipeline, **kwargs):
+        self.on_aggregate() # (Aggregate နေတုန်း Catch ဝင်လာသလို)
+        return iter(self.rows)
+
+
+class FakeCounterCollection:
+    """collection_counters ရဲ့ update_many / bulk_write / delete_many ($set / $unset / $inc / Replace)"""
+
+    def __init__(self, docs):
+        self.docs = {self._key(doc["_id"]): dict(doc) for doc in docs}
+
+    @staticmethod
+    def _key(value):
+        return tuple(sorted(value.items())) if isinstance(value, dict) else value
+
+    def update_many(self, query, update):
+        assert query == {}
+        for doc in self.docs.values():
+            doc.update(update["$set"])
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            key = self._key(op._filter["_id"])
+            if isinstance(op, pymongo.ReplaceOne):
+                self.docs[key] = {"_id": op._filter["_id"], **op._doc}
+                continue
+            doc = self.docs.setdefault(key, {"_id": op._filter["_id"], "count": 0})
+            doc["count"] += op._doc["$inc"]["count"]
+            for field in op._doc.get("$unset", {}):
+                doc.pop(field, None)
+
+    def delete_many(self, query):
+        (field, value), = query.items()
+        self.docs = {key: doc for key, doc in self.docs.items() if doc.get(field) != value}
+
+    def count(self, _id):
+        doc = self.docs.get(self._key(_id))
+        return doc["count"] if doc else None
+
+
+def test_rebuild_collection_counters_keeps_counters_created_during_rebuild(mongo):
+    from storage_mongo import _counter_inc, _user_anime_counter_key
+
+    counters = FakeCounterCollection([
+        {"_id": {"a": "Re:Zero"}, "count": 5},          # (ပြန်တွက်ရင် 2)
+        {"_id": {"a": "Gone"}, "count": 1},             # (Character မရှိတော့ - ဖျက်ရမည်)
+        {"_id": {"u": 1, "a": "Re:Zero"}, "count": 9},  # (ပြန်တွက်ရင် 1)
+    ])
+    mongo.collection_counters_collection = counters
+    mongo.characters_collection = FakeAggregateCollection([{"_id": "Re:Zero", "count": 2}])
+    # User 2 ရဲ့ ပထမဆုံး Re:Zero Catch က Harem Aggregate ပြီးမှ ဝင်လာ (Rebuild ထဲ မပါ)
+    mongo.user_harems_collection = FakeAggregateCollection(
+        [{"_id": {"u": 1, "a": "Re:Zero"}, "count": 1}],
+        on_aggregate=lambda: counters.bulk_write([_counter_inc(_user_anime_counter_key(2, "Re:Zero"))])
+    )
+
+    assert mongo.rebuild_collection_counters() == 2
+    assert counters.count({"a": "Re:Zero"}) == 2
+    assert counters.count({"a": "Gone"}) is None
+    assert counters.count({"u": 1, "a": "Re:Zero"}) == 1
+    assert counters.count({"u": 2, "a": "Re:Zero"}) == 1
+    assert all("stale" not in doc for doc in counters.docs.values())
+
+
+# --- Leaderboard Reconcile ---
+
+class RecordingCollection:
+    def __init__(self):
+        self.pipelines = []
+        self.deleted = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return iter(())
+
+    def bulk_write(self, ops, ordered=True):
+        pass
+
+    def delete_many(self, query):
+        self.deleted.append(query)
+
+
+def test_rebuild_leaderboards_takes_latest_user_name(mongo):
+    mongo.user_harems_collection = RecordingCollection()
+    mongo.leaderboards_collection = RecordingCollection()
+    mongo.rebuild_leaderboards()
+
+    for pipeline in mongo.user_harems_collection.pipelines:
+        stages = [next(iter(stage)) for stage in pipeline]
+        assert stages[0] == "$sort" and next(iter(pipeline[0]["$sort"])) == "caught_at"
+        assert "$sort" not in stages[1:stages.index("$group")] # ($last မတိုင်ခင် အစဉ် မပြောင်း)
+    assert mongo.leaderboards_collection.deleted[0]["scope"] == {"$not": {"$regex": "^group:"}}
+
+
+# --- Harem Seed ---
+
+class BulkRecordingCollection:
+    def __init__(self):
+        self.ops = []
+
+    def bulk_write(self, ops, ordered=True):
+        self.ops.extend(ops)
+
+
+def test_insert_harem_records_upserts_and_merges_counts(mongo):
+    mongo.user_harems_collection = BulkRecordingCollection()
+    assert mongo.insert_harem_records([
+        {"user_id": 1, "user_name": "user1", "character_id": 7, "count": 3, "caught_at": T0, "first_caught_at": T0},
+    ]) == 1
+
+    op, = mongo.user_harems_collection.ops
+    assert isinstance(op, pymongo.UpdateOne) and op._upsert
+    assert op._filter == {"user_id": 1, "character_id": 7}
+    assert op._doc["$inc"] == {"count": 3}
+    assert op._doc["$max"] == {"caught_at": T0} and op._doc["$min"] == {"first_caught_at": T0}
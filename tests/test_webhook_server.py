@@ -0,0 +1,40 @@
+# tests/test_webhook_server.py
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("telegram")
+
+from webhook_server import HTTPServer
+
+
+async def _request(routes, method, path, body=b""):
+    server = HTTPServer(routes, host="127.0.0.1", port=0)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        status_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        writer.close()
+        return status_line
+    finally:
+        await server.stop()
+
+
+@pytest.mark.parametrize("status, reason", [(200, "OK"), (503, "Service Unavailable")])
+def test_status_line_has_reason_phrase(status, reason):
+    async def handle(headers, body):
+        return status, "text/plain", b""
+
+    status_line = asyncio.run(_request({("POST", "/telegram"): handle}, "POST", "/telegram", b"{}"))
+    assert status_line == f"HTTP/1.1 {status} {reason}"
+
+
+def test_unknown_path_is_404():
+    async def handle(headers, body):
+        return 200, "text/plain", b""
+
+    assert asyncio.run(_request({("POST", "/telegram"): handle}, "GET", "/other")) == "HTTP/1.1 404 Not Found"
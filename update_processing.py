@@ -0,0 +1,55 @@
+# update_processing.py
+
+import asyncio
+
+from telegram.ext import BaseUpdateProcessor
+
+
+def update_chat_id(update):
+    """Update တစ်ခုရဲ့ Chat ID (Chat မပါတဲ့ Update ဆိုရင် None)"""
+    chat = getattr(update, "effective_chat", None)
+    return chat.id if chat else None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Chat မတူတဲ့ Update တွေကို တပြိုင်နက် (concurrency အထိ) run ပြီး
+    Chat တစ်ခုတည်းက Update တွေကိုတော့ ရောက်တဲ့ အစဉ်အတိုင်း တစ်ခုချင်း run ပါ။
+    (handle_group_message ရဲ့ Count နဲ့ /catch တွေ အစဉ်မလွဲအောင်)
+
+    Chat Lock ကို စောင့်နေတဲ့ Update တွေက concurrency slot မယူအောင်
+    Lock ရပြီးမှ ကိုယ်ပိုင် Semaphore ကို ယူပါ။ (Base class ရဲ့ limit က စောင့်ဆိုင်းနိုင်တဲ့ အများဆုံး အရေအတွက်)
+    """
+
+    def __init__(self, concurrency, max_pending=4096):
+        super().__init__(max_concurrent_updates=max_pending)
+        self.concurrency = concurrency
+        self._running = asyncio.Semaphore(concurrency)
+        self._chat_locks = {} # chat_id -> [asyncio.Lock, waiting_count]
+
+    async def do_process_update(self, update, coroutine):
+        chat_id = update_chat_id(update)
+        if chat_id is None:
+            async with self._running:
+                await coroutine
+            return
+
+        entry = self._chat_locks.get(chat_id)
+        if entry is None:
+            entry = self._chat_locks[chat_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with self._running:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                # စောင့်နေသူ မရှိတော့ရင် Lock ကို ဖယ်ပါ (Group အများကြီး ဖြစ်လည်း Memory မတက်အောင်)
+                self._chat_locks.pop(chat_id, None)
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,123 @@
+# webhook_server.py
+
+import asyncio
+import hmac
+import json
+
+from telegram import Update
+
+MAX_BODY_SIZE = 1024 * 1024 # Telegram Update တစ်ခုက ဒီလောက်ထိ မကြီးပါ
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable", # (Sharded Ingress - Worker Queue ပြည့်နေ)
+}
+
+
+class HTTPServer:
+    """
+    Dependency မလိုတဲ့ HTTP/1.1 Server အသေးလေး (asyncio)
+    routes: {(method, path): async handler(headers, body) -> (status, content_type, body_bytes)}
+    """
+
+    def __init__(self, routes, host="0.0.0.0", port=8443):
+        self.routes = routes
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"🌐 HTTP server listening on {self.host}:{self.port} ({', '.join(p for _, p in self.routes)})")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _version = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, "text/plain", b"bad request line", close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, "text/plain", b"too large", close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                path = target.split("?", 1)[0]
+                handler = self.routes.get((method.upper(), path))
+                if handler is None:
+                    known_path = any(p == path for _, p in self.routes)
+                    status, content_type, payload = (405 if known_path else 404), "text/plain", b""
+                else:
+                    try:
+                        status, content_type, payload = await handler(headers, body)
+                    except Exception as e:
+                        print(f"HTTP handler error ({method} {path}): {e}")
+                        status, content_type, payload = 500, "text/plain", b""
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, content_type, payload, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, close=False):
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+
+def telegram_webhook_route(application, secret_token=None):
+    """
+    Telegram (ဒါမှမဟုတ် replay_updates.py) က POST လုပ်တဲ့ Update JSON ကို
+    Application ရဲ့ update_queue ထဲ ထည့်ပေးတဲ့ handler
+    """
+
+    async def handle(headers, body):
+        if secret_token:
+            received = headers.get("x-telegram-bot-api-secret-token", "")
+            if not hmac.compare_digest(received, secret_token):
+                return 403, "text/plain", b""
+        try:
+            data = json.loads(body)
+            update = Update.de_json(data, application.bot)
+        except Exception as e:
+            print(f"Invalid update payload: {e}")
+            return 400, "text/plain", b""
+        await application.update_queue.put(update)
+        return 200, "text/plain", b""
+
+    return handle